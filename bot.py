@@ -68,6 +68,9 @@ nest_asyncio.apply()
 
 # Import sync manager for automatic dataset updates
 from data.sync_manager import get_sync_manager
+from data.google_async import shutdown_google_executor
+from data.webhook_receiver import get_webhook_receiver
+from data.local_store import run_replicator, replicate_all
 
 # === Load Data and Initialize Global State ===
 load_datasets()
@@ -400,14 +403,28 @@ async def main():
         print(f"🔄 Starting auto-sync in {mode} mode (interval: {config.AUTO_SYNC_INTERVAL}s)...")
         sync_manager = get_sync_manager(check_interval=config.AUTO_SYNC_INTERVAL)
         sync_manager.detector.webhook_enabled = config.WEBHOOK_ENABLED
+        # Receive Drive push notifications before the watch channels are registered
+        # (the receiver also serves the Prometheus metrics endpoint)
+        if (config.WEBHOOK_ENABLED and config.WEBHOOK_URL) or config.METRICS_ENABLED:
+            try:
+                await get_webhook_receiver(sync_manager.detector).start()
+            except OSError as e:
+                print(f"⚠️ Could not start webhook receiver, relying on polling: {e}")
+                sync_manager.detector.webhook_enabled = False
         # Start sync manager in background
         asyncio.create_task(sync_manager.start())
         print("✅ Auto-sync started in background")
     else:
         print("ℹ️ Auto-sync disabled (set AUTO_SYNC_ENABLED=true to enable)")
     
+    # Mirror the local store (users, game scores, control tables) to Drive/Sheets
+    asyncio.create_task(run_replicator())
+
     await app.run_polling()
     print("Returned from app.run_polling() [async]")
+    # Replicate pending local changes, then let queued Google API writes finish
+    replicate_all()
+    shutdown_google_executor()
 
 def run_bot():
     """Starts the bot with lock and stop signal logic."""
@@ -28,6 +28,7 @@ class Config:
         self.COMFILE_ID = self.secrets.get("COMFILE_ID")
         self.GAME_SCORE = self.secrets.get("GAME_SCORE")
         self.U_DATABASE = self.secrets.get("U_DATABASE")
+        self.DISABLED_DB = self.secrets.get("DISABLED_DB")  # Feature control / AI model assignment workbook
         # Service account info (for Google APIs)
         self.service_account_data = self._load_service_account_data()
         self.KEY_PATH = "/tmp/service_account.json"
@@ -36,9 +37,57 @@ class Config:
         # Auto-sync settings
         self.AUTO_SYNC_ENABLED = os.environ.get("AUTO_SYNC_ENABLED", "true").lower() == "true"
         self.AUTO_SYNC_INTERVAL = int(os.environ.get("AUTO_SYNC_INTERVAL", 10))  # seconds (default: 10 for fast polling)
+        self.AUTO_SYNC_MAX_INTERVAL = int(os.environ.get("AUTO_SYNC_MAX_INTERVAL", 120))  # polling backs off to this while files are quiet
+        # Dataset reloads: merge changes until quiet this long, but never wait longer than SYNC_MAX_DELAY
+        self.SYNC_QUIET_WINDOW = float(os.environ.get("SYNC_QUIET_WINDOW", 2))  # seconds
+        self.SYNC_MAX_DELAY = float(os.environ.get("SYNC_MAX_DELAY", 30))  # seconds
+        self.SYNC_MAX_CONCURRENT_RELOADS = int(os.environ.get("SYNC_MAX_CONCURRENT_RELOADS", 1))
+        self.SYNC_METRICS_WINDOW = int(os.environ.get("SYNC_METRICS_WINDOW", 24 * 3600))  # seconds of history kept for sync latency/cost histograms
         # Webhook settings (for instant change detection)
         self.WEBHOOK_ENABLED = os.environ.get("WEBHOOK_ENABLED", "true").lower() == "true"
         self.WEBHOOK_URL = os.environ.get("WEBHOOK_URL", None)  # Optional: https://yourapp.streamlit.app/webhook
+        # Local receiver that WEBHOOK_URL must route to (its path is taken from WEBHOOK_URL)
+        self.WEBHOOK_HOST = os.environ.get("WEBHOOK_HOST", "0.0.0.0")
+        self.WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", 8080))
+        self.WEBHOOK_DEBOUNCE = float(os.environ.get("WEBHOOK_DEBOUNCE", 5))  # seconds to coalesce notification bursts
+        self.WEBHOOK_POLLING_INTERVAL = int(os.environ.get("WEBHOOK_POLLING_INTERVAL", 300))  # safety-net polling while webhooks are active
+        # Prometheus text endpoint, served by the webhook receiver (METRICS_ENABLED starts it without webhooks)
+        self.METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "false").lower() == "true"
+        self.METRICS_PATH = os.environ.get("METRICS_PATH", "/metrics")
+        # Local notation/lyrics PDF cache
+        self.NOTATION_CACHE_DIR = os.environ.get(
+            "NOTATION_CACHE_DIR",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmp", "notation_cache")
+        )
+        self.NOTATION_CACHE_MAX_MB = int(os.environ.get("NOTATION_CACHE_MAX_MB", 200))
+        self.NOTATION_PREFETCH_COUNT = int(os.environ.get("NOTATION_PREFETCH_COUNT", 50))  # most requested files warmed at startup
+        # Telegram file_id reuse for repeat sends
+        self.TELEGRAM_FILE_CACHE_PATH = os.environ.get(
+            "TELEGRAM_FILE_CACHE_PATH",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmp", "telegram_file_ids.json")
+        )
+        # Persisted notation folder indexes, updated incrementally from the Drive changes feed
+        self.FOLDER_INDEX_DIR = os.environ.get(
+            "FOLDER_INDEX_DIR",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmp", "folder_index")
+        )
+        self.FOLDER_INDEX_SYNC_INTERVAL = int(os.environ.get("FOLDER_INDEX_SYNC_INTERVAL", 600))  # seconds
+        # Google API client: worker threads for blocking calls and per-request retries
+        self.GOOGLE_API_WORKERS = int(os.environ.get("GOOGLE_API_WORKERS", 8))
+        self.GOOGLE_API_RETRIES = int(os.environ.get("GOOGLE_API_RETRIES", 3))
+        # User database saves inside this window are coalesced into one write (seconds)
+        self.USER_DB_SAVE_WINDOW = float(os.environ.get("USER_DB_SAVE_WINDOW", 5))
+        self.USER_DB_BATCH_SIZE = int(os.environ.get("USER_DB_BATCH_SIZE", 500))  # max ranges per batchUpdate request
+        # Local SQLite store (source of truth) and how often it is mirrored to Sheets/Drive
+        self.LOCAL_DB_PATH = os.environ.get(
+            "LOCAL_DB_PATH",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmp", "bot_state.db")
+        )
+        self.SHEETS_REPLICATION_INTERVAL = int(os.environ.get("SHEETS_REPLICATION_INTERVAL", 30))  # seconds
+        # Safety-net refresh of feature flags / AI model assignments; changes are pushed by the sync manager
+        self.CONTROL_TABLE_TTL = int(os.environ.get("CONTROL_TABLE_TTL", 6 * 3600))  # seconds
+        # Organist roster workbook: cached copy is re-checked against its Drive version after this long
+        self.ROSTER_REVALIDATE_INTERVAL = int(os.environ.get("ROSTER_REVALIDATE_INTERVAL", 30))  # seconds
 
     def _load_service_account_data(self):
         # Try to load private key directly first
@@ -9,9 +9,11 @@ import logging
 import streamlit as st
 from typing import Dict, Optional, Tuple
 from datetime import datetime
-import io
+import threading
+from config import get_config
 from data.drive import get_drive_service
-from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload
+from data.drive_fetch import fetch_drive_file, read_all_sheets
+from data.local_store import get_local_store
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +26,18 @@ class AIModelConfig:
             logger.error("DISABLED_DB file ID not found in secrets")
             raise ValueError("DISABLED_DB configuration missing")
 
-        self.drive_service = get_drive_service()
         self._cache = None
         self._cache_timestamp = None
+        self._cache_is_fallback = False
+        self._write_lock = threading.Lock()
+        self._drive_version = None  # fingerprint of the workbook last loaded from Drive
         
-        # Cache timeout in seconds (5 minutes)
-        self.cache_timeout = 300
+        # Changes to the sheet are pushed by the sync manager (see refresh_control_tables);
+        # the timed refresh is only a safety net, so it runs every few hours
+        self.cache_timeout = get_config().CONTROL_TABLE_TTL
+
+        # Retry interval in seconds (5 minutes) while Drive is unreachable on first run
+        self.fallback_retry = 300
 
         # Default model assignments
         self.default_assignments = {
@@ -60,105 +68,98 @@ class AIModelConfig:
             }
         }
     
-    def _load_from_drive(self) -> pd.DataFrame:
-        """Load AI model configuration from Google Drive Excel sheet"""
-        try:
-            # Check cache first
-            if self._cache is not None and self._cache_timestamp is not None:
-                cache_age = (datetime.now() - self._cache_timestamp).total_seconds()
-                if cache_age < self.cache_timeout:
-                    logger.debug("Using cached AI model config data")
-                    return self._cache
+    @property
+    def drive_service(self):
+        """Pooled Drive client for the calling thread"""
+        return get_drive_service()
+
+    def _load(self) -> pd.DataFrame:
+        """Load AI model configuration from the local store (seeded from Drive on first run)"""
+        if self._cache is not None:
+            if not self._cache_is_fallback:
+                return self._cache
+            cache_age = (datetime.now() - self._cache_timestamp).total_seconds()
+            if cache_age < self.fallback_retry:
+                return self._cache
+
+        local = get_local_store()
+        df = local.get_table('AIModelConfig')
+        if df is None:
+            df = self._load_from_drive()
+            if df is not None:
+                local.put_table('AIModelConfig', df, dirty=False)
 
-            logger.info("Loading AI model configuration from Google Drive...")
+        if df is None:
+            self._set_table(self._create_default_dataframe(), fallback=True)
+        else:
+            self._set_table(df)
+        return self._cache
+
+    def _save(self, df: pd.DataFrame) -> bool:
+        """Save AI model configuration locally; the replicator mirrors it to Google Drive"""
+        try:
+            with self._write_lock:
+                get_local_store().put_table('AIModelConfig', df)
+                self._set_table(df)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving AI model config: {e}")
+            return False
 
-            # Download from Google Drive
-            request = self.drive_service.files().export_media(
-                fileId=self.disabled_db_id,
-                mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            file_data = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_data, request)
+    def _set_table(self, df: pd.DataFrame, fallback: bool = False):
+        """Make `df` the current assignments table"""
+        self._cache = df
+        self._cache_timestamp = datetime.now()
+        self._cache_is_fallback = fallback
 
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
+    def refresh(self) -> bool:
+        """
+        Pull the AIModelConfig sheet from Drive (e.g. after edits from the admin
+        app) unless local changes are still waiting to be replicated
+        """
+        local = get_local_store()
+        if 'AIModelConfig' in local.dirty_tables():
+            return False
+        df = self._load_from_drive(if_changed=True)
+        if df is None:
+            return False
+        with self._write_lock:
+            if 'AIModelConfig' in local.dirty_tables():
+                return False  # an admin change landed while downloading
+            local.put_table('AIModelConfig', df, dirty=False)
+            self._set_table(df)
+        logger.info("Refreshed AI model assignments from Google Drive")
+        return True
+
+    def _load_from_drive(self, if_changed: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Load AI model configuration from Google Drive Excel sheet (None on failure,
+        or with if_changed=True when the workbook is unchanged since it was last loaded)
+        """
+        try:
+            logger.info("Loading AI model configuration from Google Drive...")
 
-            file_data.seek(0)
-            df_dict = pd.read_excel(file_data, sheet_name=None)  # Read all sheets
+            # Shared with FeatureController; only downloaded when the workbook changed
+            df_dict, version = fetch_drive_file(self.disabled_db_id, read_all_sheets)
+            if if_changed and version is not None and version == self._drive_version:
+                logger.info("AI model configuration unchanged on Google Drive")
+                return None
 
             # Get AIModelConfig sheet if it exists
             if 'AIModelConfig' in df_dict:
-                df = df_dict['AIModelConfig']
+                df = df_dict['AIModelConfig'].copy()
                 logger.info(f"Successfully loaded AI model config with {len(df)} assignments")
             else:
                 # Create default if sheet doesn't exist
                 logger.info("AIModelConfig sheet not found, creating default")
                 df = self._create_default_dataframe()
 
-            # Update cache
-            self._cache = df
-            self._cache_timestamp = datetime.now()
-
+            self._drive_version = version
             return df
 
         except Exception as e:
             logger.error(f"Error loading AI model config from Google Drive: {e}")
-            # Return default assignments as DataFrame
-            return self._create_default_dataframe()
-
-    def _save_to_drive(self, df: pd.DataFrame) -> bool:
-        """Save AI model configuration to Google Drive Excel sheet"""
-        try:
-            logger.info("Saving AI model configuration to Google Drive...")
-
-            # First, load all existing sheets
-            request = self.drive_service.files().export_media(
-                fileId=self.disabled_db_id,
-                mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            file_data = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_data, request)
-
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-
-            file_data.seek(0)
-            existing_sheets = pd.read_excel(file_data, sheet_name=None)
-
-            # Update the AIModelConfig sheet
-            existing_sheets['AIModelConfig'] = df
-
-            # Write all sheets back
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                for sheet_name, sheet_df in existing_sheets.items():
-                    sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
-            excel_buffer.seek(0)
-
-            # Upload to Google Drive
-            media = MediaIoBaseUpload(
-                excel_buffer,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-
-            # Update the existing file
-            self.drive_service.files().update(
-                fileId=self.disabled_db_id,
-                media_body=media
-            ).execute()
-
-            # Update cache
-            self._cache = df
-            self._cache_timestamp = datetime.now()
-
-            logger.info("Successfully saved AI model configuration to Google Drive")
-            return True
-
-        except Exception as e:
-            logger.error(f"Error saving AI model config to Google Drive: {e}")
-            return False
+            return None
 
     def _create_default_dataframe(self) -> pd.DataFrame:
         """Create default DataFrame structure for AI model assignments"""
@@ -184,7 +185,7 @@ class AIModelConfig:
             Model name: 'gemini', 'groq', or 'sarvam'
         """
         try:
-            df = self._load_from_drive()
+            df = self._load()
 
             # Find the user type in the DataFrame
             user_type_row = df[df['user_type'] == user_type]
@@ -218,7 +219,7 @@ class AIModelConfig:
             if model not in ['gemini', 'groq', 'sarvam']:
                 return False, f"Invalid model: {model}. Must be 'gemini', 'groq', or 'sarvam'"
 
-            df = self._load_from_drive()
+            df = self._load()
 
             # Find the user type in the DataFrame
             user_type_idx = df[df['user_type'] == user_type].index
@@ -241,13 +242,13 @@ class AIModelConfig:
                 df.loc[idx, 'modified_by_admin_id'] = str(admin_id)
                 df.loc[idx, 'notes'] = f'Changed to {model} by admin {admin_id}'
 
-            # Save to Google Drive
-            if self._save_to_drive(df):
+            # Save locally (replicated to Google Drive in the background)
+            if self._save(df):
                 model_info = self.available_models.get(model, {})
                 model_name = model_info.get('name', model)
                 return True, f"✅ {user_type.title()} users will now use **{model_name}**"
             else:
-                return False, "Failed to save configuration to Google Drive"
+                return False, "Failed to save configuration"
 
         except Exception as e:
             logger.error(f"Error setting model for user type: {e}")
@@ -256,7 +257,7 @@ class AIModelConfig:
     def get_all_assignments(self) -> Dict:
         """Get all current model assignments"""
         try:
-            df = self._load_from_drive()
+            df = self._load()
             assignments = {}
 
             for _, row in df.iterrows():
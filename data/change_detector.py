@@ -7,17 +7,32 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable
 import json
 import os
+import random
+import tempfile
+import time
 from googleapiclient.errors import HttpError
 from data.drive import get_drive_service
+from data.google_async import API_RETRIES, run_blocking
+from data.sync_metrics import get_sync_metrics
 from config import get_config
 
 logger = logging.getLogger(__name__)
 
 
+def _is_transient(error: HttpError) -> bool:
+    """Rate limits and server errors are worth retrying"""
+    return error.resp.status == 429 or error.resp.status >= 500
+
+
 class DriveChangeDetector:
     """
     Monitors Google Drive files for changes and triggers updates.
     Uses Google Drive API's changes endpoint to efficiently detect modifications.
+
+    The changes feed is account-wide, so one cursor serves every watched
+    file: each cycle reads the feed once (all pages) and dispatches the
+    changes to the registered files. Cost and latency do not depend on how
+    many files are watched.
     """
 
     def __init__(self, check_interval: int = 60):
@@ -28,8 +43,7 @@ class DriveChangeDetector:
             check_interval: Time in seconds between change checks (default: 60 seconds)
         """
         self.check_interval = check_interval
-        self.drive_service = None
-        self.page_tokens: Dict[str, str] = {}  # Store page tokens for each file
+        self.page_token: Optional[str] = None  # Shared cursor into the changes feed
         self.file_ids: List[str] = []
         self.callbacks: Dict[str, List[Callable]] = {}  # Callbacks to execute when file changes
         self.last_check = {}
@@ -37,27 +51,30 @@ class DriveChangeDetector:
         self.cache_file = os.path.join(os.path.dirname(__file__), '.drive_change_cache.json')
         
     def _load_cache(self):
-        """Load cached page tokens from disk"""
+        """Load the cached cursor from disk"""
         try:
             if os.path.exists(self.cache_file):
                 with open(self.cache_file, 'r') as f:
                     cache = json.load(f)
-                    self.page_tokens = cache.get('page_tokens', {})
+                    self.page_token = cache.get('page_token')
                     self.last_check = cache.get('last_check', {})
-                    logger.info(f"📦 Loaded change detection cache for {len(self.page_tokens)} files")
+                    logger.info(f"📦 Loaded change detection cursor ({'set' if self.page_token else 'none'})")
         except Exception as e:
             logger.warning(f"⚠️ Could not load change cache: {e}")
             
     def _save_cache(self):
-        """Save page tokens to disk"""
+        """Save the cursor to disk atomically (write a temp file, then rename)"""
         try:
             cache = {
-                'page_tokens': self.page_tokens,
+                'page_token': self.page_token,
                 'last_check': self.last_check,
                 'updated_at': datetime.now().isoformat()
             }
-            with open(self.cache_file, 'w') as f:
+            directory = os.path.dirname(self.cache_file) or "."
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, 'w') as f:
                 json.dump(cache, f, indent=2)
+            os.replace(tmp_path, self.cache_file)
         except Exception as e:
             logger.warning(f"⚠️ Could not save change cache: {e}")
 
@@ -78,81 +95,78 @@ class DriveChangeDetector:
             self.callbacks[file_id] = []
         self.callbacks[file_id].append(callback)
 
-    def _get_start_page_token(self, file_id: str) -> str:
-        """Get the starting page token for a file"""
+    def _get_start_page_token(self) -> Optional[str]:
+        """Get the current start page token of the changes feed"""
         try:
-            if not self.drive_service:
-                self.drive_service = get_drive_service()
-                
-            # Get start page token for the entire drive
-            response = self.drive_service.changes().getStartPageToken().execute()
+            response = get_drive_service().changes().getStartPageToken().execute(num_retries=API_RETRIES)
             return response.get('startPageToken')
         except HttpError as e:
             logger.error(f"❌ Error getting start page token: {e}")
             return None
 
-    def _check_file_changes(self, file_id: str) -> bool:
+    def _read_changes(self, page_token: str):
         """
-        Check if a specific file has been modified.
-        
+        Read the changes feed from `page_token` to its end (blocking).
+
         Returns:
-            True if file has changed, False otherwise
+            (changed, new_token): {file_id: (name, modifiedTime)} for watched
+            files, and the cursor to continue from next time
         """
-        try:
-            if not self.drive_service:
-                self.drive_service = get_drive_service()
-
-            # Initialize page token if not exists
-            if file_id not in self.page_tokens:
-                self.page_tokens[file_id] = self._get_start_page_token(file_id)
-                self._save_cache()
-                return False  # First run, no changes to report
-
-            page_token = self.page_tokens[file_id]
-            if not page_token:
-                return False
-
-            # Query for changes
-            response = self.drive_service.changes().list(
+        drive_service = get_drive_service()
+        watched = set(self.file_ids)
+        changed = {}
+        while page_token:
+            response = drive_service.changes().list(
                 pageToken=page_token,
                 spaces='drive',
+                pageSize=1000,
                 fields='nextPageToken,newStartPageToken,changes(fileId,file(modifiedTime,name))'
-            ).execute()
-
-            changes = response.get('changes', [])
-            file_changed = False
-
-            for change in changes:
-                if change.get('fileId') == file_id:
-                    file_info = change.get('file', {})
-                    modified_time = file_info.get('modifiedTime')
-                    file_name = file_info.get('name', 'Unknown')
-                    
-                    logger.info(f"🔄 Detected change in {file_name} (ID: {file_id[:8]}...) at {modified_time}")
-                    file_changed = True
-                    break
+            ).execute(num_retries=API_RETRIES)
+            get_sync_metrics().record_api_call('changes.list')
+
+            for change in response.get('changes', []):
+                file_id = change.get('fileId')
+                if file_id in watched:
+                    file_info = change.get('file') or {}
+                    changed[file_id] = (file_info.get('name', 'Unknown'), file_info.get('modifiedTime'))
 
-            # Update page token for next check
-            new_page_token = response.get('newStartPageToken') or response.get('nextPageToken')
-            if new_page_token:
-                self.page_tokens[file_id] = new_page_token
+            if 'newStartPageToken' in response:
+                return changed, response['newStartPageToken']
+            page_token = response.get('nextPageToken')
+        return changed, page_token
+
+    def _check_changes(self) -> List[str]:
+        """
+        Read the feed once and return the watched files that changed.
+        The cursor is advanced in memory; it is saved after the callbacks ran.
+        """
+        try:
+            if not self.page_token:
+                self.page_token = self._get_start_page_token()
                 self._save_cache()
+                return []  # First run, no changes to report
 
-            return file_changed
+            changed, new_token = self._read_changes(self.page_token)
+            for file_id, (file_name, modified_time) in changed.items():
+                logger.info(f"🔄 Detected change in {file_name} (ID: {file_id[:8]}...) at {modified_time}")
+                get_sync_metrics().record_detection(modified_time, source='changes')
+            if new_token:
+                self.page_token = new_token
+            return list(changed)
 
         except HttpError as e:
-            if e.resp.status == 404:
-                logger.error(f"❌ File {file_id} not found or not accessible")
+            if e.resp.status in (400, 410):
+                logger.warning("⚠️ Change cursor expired, starting from the current position")
+                self.page_token = self._get_start_page_token()
+                self._save_cache()
             elif e.resp.status == 429:
                 logger.warning(f"⚠️ Rate limit reached. Backing off...")
-                # Rate limit hit - this is extremely unlikely with our usage
-                # but handle it gracefully just in case
             else:
                 logger.error(f"❌ Error checking file changes: {e}")
-            return False
+            return []
         except Exception as e:
             logger.error(f"❌ Unexpected error checking changes: {e}")
-            return False
+            return []
 
     async def _execute_callbacks(self, file_id: str):
         """Execute all callbacks registered for a file"""
@@ -172,25 +186,22 @@ class DriveChangeDetector:
     async def _monitor_loop(self):
         """Main monitoring loop"""
         logger.info(f"🚀 Starting Drive change detector (checking every {self.check_interval}s)")
-        logger.info(f"📊 API Usage: ~{len(self.file_ids)} calls per {self.check_interval}s = ~{(len(self.file_ids) * 720):.0f} calls/day")
+        logger.info(f"📊 API Usage: 1 feed read per {self.check_interval}s for {len(self.file_ids)} files")
         self._load_cache()
         
         while self.running:
             try:
-                for file_id in self.file_ids:
-                    if not self.running:
-                        break
-                        
-                    has_changed = self._check_file_changes(file_id)
-                    
-                    if has_changed:
-                        logger.info(f"📥 File {file_id[:8]}... changed, triggering update...")
-                        await self._execute_callbacks(file_id)
-                        self.last_check[file_id] = datetime.now().isoformat()
-                        self._save_cache()
-                    
-                    # Small delay between file checks to spread API calls and avoid rate limiting
-                    await asyncio.sleep(2)
+                previous_token = self.page_token
+                changed = await run_blocking(self._check_changes)
+
+                for file_id in changed:
+                    logger.info(f"📥 File {file_id[:8]}... changed, triggering update...")
+                    await self._execute_callbacks(file_id)
+                    self.last_check[file_id] = datetime.now().isoformat()
+
+                # Persist the cursor only once the changes it covers were handled
+                if self.page_token != previous_token:
+                    self._save_cache()
                 
                 # Wait for next check cycle
                 await asyncio.sleep(self.check_interval)
@@ -225,7 +236,15 @@ class PollingChangeDetector:
     """
     Simpler alternative that uses file modification time polling.
     Less efficient but easier to set up (no webhook configuration needed).
+
+    All watched files are checked with one batched metadata request per
+    cycle, run off the event loop. The interval starts at `check_interval`,
+    grows while nothing changes (up to AUTO_SYNC_MAX_INTERVAL) and drops
+    back as soon as a change is seen.
     """
+
+    BATCH_LIMIT = 100  # Drive allows at most 100 calls per batch request
+    BACKOFF_FACTOR = 1.5
     
     def __init__(self, check_interval: int = 120):
         """
@@ -235,7 +254,8 @@ class PollingChangeDetector:
             check_interval: Time in seconds between polls (default: 120 seconds)
         """
         self.check_interval = check_interval
-        self.drive_service = None
+        self.max_interval = max(check_interval, get_config().AUTO_SYNC_MAX_INTERVAL)
+        self.current_interval = check_interval
         self.file_metadata: Dict[str, dict] = {}
         self.callbacks: Dict[str, List[Callable]] = {}
         self.running = False
@@ -266,33 +286,89 @@ class PollingChangeDetector:
             logger.info(f"📝 Registered file for polling: {name or file_id}")
         self.callbacks[file_id].append(callback)
 
-    def _get_file_modified_time(self, file_id: str) -> Optional[str]:
-        """Get the modification time of a file"""
+    def _get_modified_times(self, file_ids: List[str]) -> Dict[str, tuple]:
+        """
+        Get (modifiedTime, name) for several files with batched metadata requests.
+        Blocking; files whose lookup failed are left out.
+
+        BatchHttpRequest.execute() has no num_retries, so transient failures
+        (429/5xx for the whole batch or for single files, connection errors)
+        are retried here up to API_RETRIES times with randomized exponential
+        backoff, like execute(num_retries=API_RETRIES) does for single requests.
+        """
+        results = {}
+        drive_service = get_drive_service()
+        for start in range(0, len(file_ids), self.BATCH_LIMIT):
+            pending = file_ids[start:start + self.BATCH_LIMIT]
+            for attempt in range(API_RETRIES + 1):
+                if attempt:
+                    time.sleep(random.random() * 2 ** attempt)
+                retry = []
+
+                def _collect(request_id, response, exception):
+                    if exception is None:
+                        results[request_id] = (response.get('modifiedTime'), response.get('name'))
+                    elif isinstance(exception, HttpError) and _is_transient(exception):
+                        retry.append(request_id)
+                    else:
+                        logger.error(f"❌ Error getting file metadata for {request_id[:8]}...: {exception}")
+
+                batch = drive_service.new_batch_http_request(callback=_collect)
+                for file_id in pending:
+                    batch.add(
+                        drive_service.files().get(fileId=file_id, fields='modifiedTime,name'),
+                        request_id=file_id
+                    )
+                try:
+                    batch.execute()
+                except (HttpError, OSError) as e:
+                    if attempt == API_RETRIES or (isinstance(e, HttpError) and not _is_transient(e)):
+                        raise
+                    logger.warning(f"⚠️ Batched metadata request failed, retrying: {e}")
+                    continue
+                finally:
+                    get_sync_metrics().record_api_call('files.get', len(pending))
+                if not retry:
+                    break
+                logger.warning(f"⚠️ Rate limited or server error for {len(retry)} file(s), backing off...")
+                pending = retry
+        return results
+
+    async def mark_current(self, file_id: str):
+        """
+        Records a file's current modifiedTime as already handled, so the next
+        poll does not report a change that was delivered another way (webhook).
+        """
         try:
-            if not self.drive_service:
-                self.drive_service = get_drive_service()
-                
-            file_metadata = self.drive_service.files().get(
-                fileId=file_id,
-                fields='modifiedTime,name'
-            ).execute()
-            
-            return file_metadata.get('modifiedTime'), file_metadata.get('name')
+            results = await run_blocking(self._get_modified_times, [file_id])
         except HttpError as e:
-            if e.resp.status == 429:
-                logger.warning(f"⚠️ Rate limit reached for file {file_id[:8]}... Backing off...")
-                # Rate limit - extremely unlikely with our usage pattern
-            else:
-                logger.error(f"❌ Error getting file metadata: {e}")
-            return None, None
+            logger.warning(f"⚠️ Could not refresh polling state for {file_id[:8]}...: {e}")
+            return
+        modified_time, file_name = results.get(file_id, (None, None))
+        if not modified_time:
+            return
+        self.file_metadata[file_id] = {
+            'modifiedTime': modified_time,
+            'name': file_name,
+            'lastCheck': datetime.now().isoformat()
+        }
+        self._save_cache()
 
-    async def _check_and_update(self, file_id: str):
-        """Check if file has been modified since last check"""
+    async def _check_all(self) -> int:
+        """Check every registered file; runs callbacks for changed ones and returns how many changed"""
+        file_ids = list(self.callbacks.keys())
+        if not file_ids:
+            return 0
         try:
-            modified_time, file_name = self._get_file_modified_time(file_id)
-            
+            results = await run_blocking(self._get_modified_times, file_ids)
+        except HttpError as e:
+            logger.error(f"❌ Error getting file metadata: {e}")
+            return 0
+
+        changed = []
+        for file_id, (modified_time, file_name) in results.items():
             if not modified_time:
-                return False
+                continue
                 
             # Check if this is first run or if file has changed
             if file_id not in self.file_metadata:
@@ -301,59 +377,55 @@ class PollingChangeDetector:
                     'name': file_name,
                     'lastCheck': datetime.now().isoformat()
                 }
-                self._save_cache()
-                return False  # First run, don't trigger callbacks
+                continue  # First run, don't trigger callbacks
                 
-            cached_time = self.file_metadata[file_id]['modifiedTime']
-            
-            if modified_time != cached_time:
+            if modified_time != self.file_metadata[file_id]['modifiedTime']:
                 logger.info(f"🔄 File {file_name} (ID: {file_id[:8]}...) modified: {modified_time}")
-                
-                # Update cache
+                get_sync_metrics().record_detection(modified_time, source='polling')
                 self.file_metadata[file_id].update({
                     'modifiedTime': modified_time,
                     'name': file_name,
                     'lastCheck': datetime.now().isoformat()
                 })
-                self._save_cache()
-                
-                # Execute callbacks
-                for callback in self.callbacks.get(file_id, []):
-                    try:
-                        if asyncio.iscoroutinefunction(callback):
-                            await callback(file_id)
-                        else:
-                            callback(file_id)
-                        logger.info(f"✅ Executed callback for {file_name}")
-                    except Exception as e:
-                        logger.error(f"❌ Error executing callback: {e}")
-                        
-                return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Error checking file {file_id}: {e}")
-            return False
+                changed.append((file_id, file_name))
+
+        if changed or len(self.file_metadata) != len(file_ids):
+            self._save_cache()
+
+        for file_id, file_name in changed:
+            # Execute callbacks
+            for callback in self.callbacks.get(file_id, []):
+                try:
+                    if asyncio.iscoroutinefunction(callback):
+                        await callback(file_id)
+                    else:
+                        callback(file_id)
+                    logger.info(f"✅ Executed callback for {file_name}")
+                except Exception as e:
+                    logger.error(f"❌ Error executing callback: {e}")
+
+        return len(changed)
+
+    def _next_interval(self, changes: int) -> float:
+        """Back off while files are quiet, poll at full speed again after a change"""
+        if changes:
+            self.current_interval = self.check_interval
+        else:
+            self.current_interval = min(self.max_interval, self.current_interval * self.BACKOFF_FACTOR)
+        return self.current_interval
 
     async def _poll_loop(self):
         """Main polling loop"""
         num_files = len(self.callbacks)
-        calls_per_day = (60 * 60 * 24 // self.check_interval) * num_files
-        logger.info(f"🚀 Starting Drive polling detector (checking every {self.check_interval}s)")
-        logger.info(f"📊 Monitoring {num_files} files → ~{calls_per_day} API calls/day (~0.0004% of free quota)")
+        batches = -(-num_files // self.BATCH_LIMIT)
+        logger.info(f"🚀 Starting Drive polling detector (every {self.check_interval}s, backing off to {self.max_interval}s when quiet)")
+        logger.info(f"📊 Monitoring {num_files} files with {batches} batched request(s) per check")
         self._load_cache()
         
         while self.running:
             try:
-                for file_id in self.callbacks.keys():
-                    if not self.running:
-                        break
-                    await self._check_and_update(file_id)
-                    # Delay between file checks to spread API calls
-                    await asyncio.sleep(2)
-                    
-                await asyncio.sleep(self.check_interval)
+                changes = await self._check_all()
+                await asyncio.sleep(self._next_interval(changes))
                 
             except Exception as e:
                 logger.error(f"❌ Error in poll loop: {e}")
@@ -3,9 +3,10 @@
 
 import pandas as pd
 import io
-from googleapiclient.http import MediaIoBaseDownload
 from data.drive import get_drive_service
+from data.drive_fetch import fetch_drive_file, read_sheets
 from config import get_config
+from data.google_async import API_RETRIES
 import re
 from datetime import datetime
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -14,91 +15,55 @@ from sklearn.metrics.pairwise import cosine_similarity
 # Global dataset variables
 dfH = dfL = dfC = df = dfTH = dfTD = None
 year_data = {}  # Dictionary to hold year dataframes dynamically {2023: df23, 2024: df24, ...}
+_loaded_versions = {}  # workbook -> Drive fingerprint of the copy currently in the globals
+
+def _fetch_if_new(name, file_id, sheet_names):
+    """
+    Returns {sheet: DataFrame} for a workbook, or None if the version already
+    loaded into the globals is still current (no download, no parse).
+    """
+    sheets, version = fetch_drive_file(file_id, read_sheets(sheet_names), key=f"datasets:{name}")
+    if version is not None and _loaded_versions.get(name) == version:
+        return None
+    _loaded_versions[name] = version
+    return sheets
 
 def load_datasets():
     """
     Downloads and loads all datasets from Google Drive. Updates the global
     dataset variables so that the bot uses the latest data.
+    Workbooks that have not changed since they were last loaded are not
+    downloaded again and keep their current (preprocessed) DataFrames.
     Returns all loaded DataFrames.
     """
     global dfH, dfL, dfC, df, dfTH, dfTD, year_data
     config = get_config()
-    drive_service = get_drive_service()
 
     # --- Load Index Database (HLCFILE) ---
-    request = drive_service.files().export_media(
-        fileId=config.HLCFILE_ID,
-        mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-    file_data = io.BytesIO()
-    downloader = MediaIoBaseDownload(file_data, request, chunksize=1024 * 256)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    file_data.seek(0)
-    xls = pd.ExcelFile(file_data)
-    try:
-        dfH = pd.read_excel(xls, sheet_name="Hymn List")
-    except Exception:
-        dfH = None
-    try:
-        dfL = pd.read_excel(xls, sheet_name="Lyric List")
-    except Exception:
-        dfL = None
-    try:
-        dfC = pd.read_excel(xls, sheet_name="Convention List")
-    except Exception:
-        dfC = None
+    sheets = _fetch_if_new("hlc", config.HLCFILE_ID, ["Hymn List", "Lyric List", "Convention List"])
+    if sheets is not None:
+        dfH = sheets["Hymn List"]
+        dfL = sheets["Lyric List"]
+        dfC = sheets["Convention List"]
 
     # --- Load Main Excel File (FILE_ID) ---
-    request = drive_service.files().get_media(fileId=config.FILE_ID)
-    file_data = io.BytesIO()
-    downloader = MediaIoBaseDownload(file_data, request)
-    done = False
-    while not done:
-        _, done = downloader.next_chunk()
-    file_data.seek(0)
-    xls = pd.ExcelFile(file_data)
-    
     # --- Load Year DataFrames (dynamically from 2023 to current year) ---
-    year_data.clear()  # Clear previous year data
-    current_year = datetime.now().year
-    
-    for year in range(2023, current_year + 1):
-        sheet_name = str(year)
-        try:
-            year_data[year] = pd.read_excel(xls, sheet_name=sheet_name)
-        except Exception as e:
-            print(f"Warning: Could not load sheet '{sheet_name}': {e}")
-            year_data[year] = None
-    
-    try:
-        df = pd.read_excel(xls, sheet_name="Sheet 1")
-    except Exception:
-        df = None
+    years = list(range(2023, datetime.now().year + 1))
+    sheets = _fetch_if_new(f"main:{years[-1]}", config.FILE_ID, [str(year) for year in years] + ["Sheet 1"])
+    if sheets is not None:
+        year_data.clear()  # Clear previous year data
+        for year in years:
+            year_data[year] = sheets[str(year)]
+        df = sheets["Sheet 1"]
 
     # --- Load Tune Database (TFILE_ID) ---
     try:
-        request = drive_service.files().export_media(
-            fileId=config.TFILE_ID,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
-        xls = pd.ExcelFile(file_data)
-        try:
-            dfTH = pd.read_excel(xls, sheet_name="Hymn")
-        except Exception:
-            dfTH = None
-        try:
-            dfTD = pd.read_excel(xls, sheet_name="Doxology")
-        except Exception:
-            dfTD = None
+        sheets = _fetch_if_new("tune", config.TFILE_ID, ["Hymn", "Doxology"])
+        if sheets is not None:
+            dfTH = sheets["Hymn"]
+            dfTD = sheets["Doxology"]
     except Exception:
+        _loaded_versions.pop("tune", None)
         dfTH = None
         dfTD = None
     return dfH, dfL, dfC, year_data, df, dfTH, dfTD
@@ -313,6 +278,13 @@ def Datefinder(songs, category=None, first=False):
     global df
     First=first
     Song = standardize_hlc_value(songs)
+    if First:
+        # Last sung date comes straight from the per-song arrays of the vocabulary engine
+        from data.vocabulary import get_vocabulary_engine
+        last_date = get_vocabulary_engine(df).last_sung_date(Song)
+        if last_date is not None:
+            return f"{Song}: {IndexFinder(Song)} was last sung on: {last_date.strftime('%d/%m/%Y')}"
+        return f"The Song {Song} was not Sang in the past years since 2022"
     Found = False
     formatted_date = []
     for i in range(len(df) - 1, -1, -1):
@@ -322,11 +294,7 @@ def Datefinder(songs, category=None, first=False):
             Found = True
             date_val = df['Date'].iloc[i]
             formatted_date.append(date_val.strftime("%d/%m/%Y"))
-            if First:
-                break
-    if Found and First:
-         return f"{Song}: {IndexFinder(Song)} was last sung on: {formatted_date[0]}"
-    elif Found:
+    if Found:
         dates_string = ''.join(f"{i}\n" for i in formatted_date)
         return f"{Song}: {IndexFinder(Song)} was sung on: \n{dates_string}"
     else:
@@ -387,7 +355,7 @@ def save_lyric_list_to_drive(dfL_updated: pd.DataFrame) -> bool:
         downloader = MediaIoBaseDownload(file_data, request)
         done = False
         while not done:
-            _, done = downloader.next_chunk()
+            _, done = downloader.next_chunk(num_retries=API_RETRIES)
         file_data.seek(0)
         
         # Load all sheets
@@ -411,7 +379,7 @@ def save_lyric_list_to_drive(dfL_updated: pd.DataFrame) -> bool:
         drive_service.files().update(
             fileId=config.HLCFILE_ID,
             media_body=media
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         # Clean up temp file
         import os
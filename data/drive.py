@@ -1,16 +1,16 @@
 # data/drive.py
 # Google Drive/Docs API functions 
 
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from google.oauth2 import service_account
-import json
 import os
 from config import get_config
-import tempfile
+from data.google_async import API_RETRIES
+from data.google_services import get_service_registry
+from data.local_store import get_local_store, register_replicator
 import pandas as pd
 import io
-from googleapiclient.http import MediaIoBaseDownload
+import threading
+from bisect import bisect_left, insort
 from datetime import datetime
 import streamlit as st
 
@@ -18,32 +18,21 @@ import streamlit as st
 
 def get_drive_service():
     """
-    Returns an authenticated Google Drive service instance.
+    Returns the calling thread's pooled Google Drive service instance.
     """
-    config = get_config()
-    # Always use a cross-platform temp directory for the service account file
-    tmp_dir = tempfile.gettempdir()
-    key_path = os.path.join(tmp_dir, "service_account.json")
-    with open(key_path, "w") as f:
-        json.dump(config.service_account_data, f)
-    config.KEY_PATH = key_path
-    creds = service_account.Credentials.from_service_account_file(
-        config.KEY_PATH, scopes=["https://www.googleapis.com/auth/drive"]
-    )
-    return build("drive", "v3", credentials=creds)
+    return get_service_registry().get("drive", "v3")
 
 def get_docs_service():
     """
-    Returns an authenticated Google Docs service instance.
+    Returns the calling thread's pooled Google Docs service instance.
     """
-    config = get_config()
-    if not os.path.exists(config.KEY_PATH):
-        with open(config.KEY_PATH, "w") as f:
-            json.dump(config.service_account_data, f)
-    creds = service_account.Credentials.from_service_account_file(
-        config.KEY_PATH, scopes=["https://www.googleapis.com/auth/documents"]
-    )
-    return build("docs", "v1", credentials=creds)
+    return get_service_registry().get("docs", "v1")
+
+def get_sheets_service():
+    """
+    Returns the calling thread's pooled Google Sheets service instance.
+    """
+    return get_service_registry().get("sheets", "v4")
 
 def upload_log_to_google_doc(doc_id: str, log_file: str):
     """
@@ -60,7 +49,7 @@ def upload_log_to_google_doc(doc_id: str, log_file: str):
         print(f"ℹ️ Log file {log_file} is empty. Skipping upload.")
         return
     try:
-        doc = docs_service.documents().get(documentId=doc_id).execute()
+        doc = docs_service.documents().get(documentId=doc_id).execute(num_retries=API_RETRIES)
         end_index = doc.get('body', {}).get('content', [{}])[-1].get('endIndex', 1)
         requests = []
         if end_index > 1:
@@ -81,7 +70,7 @@ def upload_log_to_google_doc(doc_id: str, log_file: str):
         docs_service.documents().batchUpdate(
             documentId=doc_id,
             body={'requests': requests}
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         print(f"✅ Successfully uploaded {log_file} to Google Doc")
     except HttpError as e:
         print(f"❌ Failed to log due to: {e}")
@@ -92,7 +81,7 @@ def append_download_to_google_doc(yfile_id: str, download_entry: str):
     """
     docs_service = get_docs_service()
     try:
-        doc = docs_service.documents().get(documentId=yfile_id).execute()
+        doc = docs_service.documents().get(documentId=yfile_id).execute(num_retries=API_RETRIES)
         end_index = doc.get("body").get("content")[-1].get("endIndex", 1)
         requests = [{
             "insertText": {
@@ -103,7 +92,7 @@ def append_download_to_google_doc(yfile_id: str, download_entry: str):
         docs_service.documents().batchUpdate(
             documentId=yfile_id,
             body={"requests": requests}
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         print("✅ Query successful")
     except Exception as e:
         print(f"❌ Failed to Query Youtube: {e}")
@@ -111,76 +100,184 @@ def append_download_to_google_doc(yfile_id: str, download_entry: str):
 # Game Score Database Functions
 def load_game_scores():
     """
-    Load the Game_Score Excel sheet from Google Drive
+    Load game scores from the local store (seeded from the Game_Score sheet on first run)
     Returns a pandas DataFrame with columns: Date, User_Name, User_id, Score, Difficulty
     """
     try:
+        if not _ensure_game_scores_seeded():
+            return pd.DataFrame(columns=['Date', 'User_Name', 'User_id', 'Score', 'Difficulty'])
+        return get_local_store().game_scores_frame()
+
+    except Exception as e:
+        print(f"❌ Error loading game scores: {e}")
+        return pd.DataFrame(columns=['Date', 'User_Name', 'User_id', 'Score', 'Difficulty'])
+
+def _ensure_game_scores_seeded():
+    """Copy the Game_Score sheet into the local score log once. Returns False if that is not possible yet."""
+    local = get_local_store()
+    if local.has_game_scores():
+        return True
+    df = _download_game_scores()
+    if df is None:
+        return False
+    local.replace_game_scores(df)
+    return True
+
+def _read_game_scores(data):
+    """Parser for fetch_drive_file: the score sheet with all required columns"""
+    df = pd.read_excel(data)
+
+    # Ensure the required columns exist
+    required_columns = ['Date', 'User_Name', 'User_id', 'Score', 'Difficulty']
+    for col in required_columns:
+        if col not in df.columns:
+            df[col] = None if col != 'Difficulty' else 'Easy'  # Default difficulty to Easy for old records
+
+    return df
+
+def _download_game_scores():
+    """
+    Download the Game_Score Excel sheet from Google Drive
+    Returns a DataFrame, or None if the sheet is not configured or could not be read
+    """
+    try:
+        from data.drive_fetch import fetch_drive_file
         config = get_config()
-        drive_service = get_drive_service()
 
         # Get the Game_Score file ID from config
         game_score_file_id = config.GAME_SCORE
         if not game_score_file_id:
             print("❌ GAME_SCORE file ID not found in secrets")
-            return pd.DataFrame(columns=['Date', 'User_Name', 'User_id', 'Score'])
-
-        # Download the Excel file
-        request = drive_service.files().export_media(
-            fileId=game_score_file_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
-
-        # Read the Excel file
-        df = pd.read_excel(file_data)
-
-        # Ensure the required columns exist
-        required_columns = ['Date', 'User_Name', 'User_id', 'Score', 'Difficulty']
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = None if col != 'Difficulty' else 'Easy'  # Default difficulty to Easy for old records
+            return None
 
+        # Download the Excel file (reused as is if unchanged since the last download)
+        df, _ = fetch_drive_file(game_score_file_id, _read_game_scores, key="game_scores")
         return df
 
     except Exception as e:
-        print(f"❌ Error loading game scores: {e}")
-        return pd.DataFrame(columns=['Date', 'User_Name', 'User_id', 'Score', 'Difficulty'])
+        print(f"❌ Error downloading game scores: {e}")
+        return None
+
+class ScoreBoard:
+    """
+    Best score per user for each difficulty, kept in memory.
+    Each difficulty also keeps its bests in a sorted list, so a new score is
+    placed with a binary search and a leaderboard is a slice of that list.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._best = {}    # difficulty -> {user_id: (score, user_name)}
+        self._ranked = {}  # difficulty -> sorted [(-score, user_id)]
+
+    def record(self, user_id, user_name, score, difficulty):
+        if user_id is None or score is None:
+            return
+        difficulty = difficulty or "Easy"
+        with self._lock:
+            best = self._best.setdefault(difficulty, {})
+            ranked = self._ranked.setdefault(difficulty, [])
+            current = best.get(user_id)
+            if current is not None:
+                if current[0] >= score:
+                    return
+                del ranked[bisect_left(ranked, (-current[0], user_id))]
+            best[user_id] = (score, user_name)
+            insort(ranked, (-score, user_id))
+
+    def best(self, user_id, difficulty=None):
+        with self._lock:
+            difficulties = [difficulty] if difficulty else list(self._best)
+            scores = [self._best.get(d, {}).get(user_id, (0, None))[0] for d in difficulties]
+        return max(scores, default=0)
+
+    def top(self, top_n=10, difficulty=None):
+        with self._lock:
+            if difficulty:
+                best = self._best.get(difficulty, {})
+                ranked = [(user_id, best[user_id]) for _, user_id in self._ranked.get(difficulty, [])[:top_n]]
+            else:
+                # Best score per user across all difficulties
+                overall = {}
+                for best in self._best.values():
+                    for user_id, entry in best.items():
+                        if user_id not in overall or entry[0] > overall[user_id][0]:
+                            overall[user_id] = entry
+                ranked = sorted(overall.items(), key=lambda item: -item[1][0])[:top_n]
+        return [{'User_id': user_id, 'User_Name': name, 'Score': score} for user_id, (score, name) in ranked]
+
+
+_score_board = None
+_score_board_lock = threading.Lock()
+
+def get_score_board():
+    """
+    Returns the in-memory score board, built once from the local score log
+    """
+    global _score_board
+    with _score_board_lock:
+        if _score_board is None:
+            board = ScoreBoard()
+            if _ensure_game_scores_seeded():
+                for user_id, user_name, score, difficulty in get_local_store().query(
+                    "SELECT user_id, user_name, score, difficulty FROM game_scores ORDER BY id"
+                ):
+                    board.record(user_id, user_name, score, difficulty)
+            else:
+                return board  # try again on the next call
+            _score_board = board
+        return _score_board
 
 def save_game_score(user_name, user_id, score, difficulty="Easy"):
     """
-    Save a new game score to the Game_Score Excel sheet
+    Append a new game score to the local score log and the score board;
+    the replicator appends it to the Game_Score sheet
     """
     try:
-        # Load existing scores
-        df = load_game_scores()
-
-        # Create new entry
-        new_entry = {
-            'Date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'User_Name': user_name,
-            'User_id': user_id,
-            'Score': score,
-            'Difficulty': difficulty
-        }
-
-        # Add new entry to DataFrame
-        df = pd.concat([df, pd.DataFrame([new_entry])], ignore_index=True)
-
-        # Upload back to Google Drive
-        config = get_config()
-        drive_service = get_drive_service()
-        game_score_file_id = config.GAME_SCORE
+        board = get_score_board()  # seeds the local log before appending
+        get_local_store().add_game_score(
+            datetime.now().strftime('%Y-%m-%d %H:%M:%S'), user_name, user_id, score, difficulty
+        )
+        board.record(user_id, user_name, score, difficulty)
+        print(f"✅ Game score saved for {user_name} (ID: {user_id}): {score} ({difficulty})")
+        return True
 
-        if not game_score_file_id:
-            print("❌ GAME_SCORE file ID not found in secrets")
-            return False
+    except Exception as e:
+        print(f"❌ Error saving game score: {e}")
+        return False
 
+def replicate_game_scores():
+    """
+    Append unreplicated scores from the local log to the Game_Score sheet.
+    The first replication uploads the whole log so the sheet's columns match it.
+    """
+    local = get_local_store()
+    pending = local.unreplicated_score_ids()
+    if not pending:
+        return True
+
+    config = get_config()
+    game_score_file_id = config.GAME_SCORE
+    if not game_score_file_id:
+        print("❌ GAME_SCORE file ID not found in secrets")
+        return False
+
+    if local.get_meta("game_scores_sheet_synced"):
+        placeholders = ",".join("?" * len(pending))
+        rows = local.query(
+            f"SELECT date, user_name, user_id, score, difficulty FROM game_scores WHERE id IN ({placeholders}) ORDER BY id",
+            pending
+        )
+        get_sheets_service().spreadsheets().values().append(
+            spreadsheetId=game_score_file_id,
+            range="A:E",
+            valueInputOption="RAW",
+            insertDataOption="INSERT_ROWS",
+            body={"values": [list(row) for row in rows]}
+        ).execute(num_retries=API_RETRIES)
+    else:
         # Convert DataFrame to Excel
+        df = local.game_scores_frame()
         output = io.BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
             df.to_excel(writer, index=False, sheet_name='Sheet1')
@@ -190,33 +287,24 @@ def save_game_score(user_name, user_id, score, difficulty="Easy"):
         from googleapiclient.http import MediaIoBaseUpload
         media = MediaIoBaseUpload(output, mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
 
-        drive_service.files().update(
+        get_drive_service().files().update(
             fileId=game_score_file_id,
             media_body=media
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
+        local.set_meta("game_scores_sheet_synced", True)
 
-        print(f"✅ Game score saved for {user_name} (ID: {user_id}): {score} ({difficulty})")
-        return True
+    local.mark_scores_replicated(pending)
+    print(f"✅ Replicated {len(pending)} game scores to Google Drive")
+    return True
 
-    except Exception as e:
-        print(f"❌ Error saving game score: {e}")
-        return False
+register_replicator("game scores", replicate_game_scores)
 
 def get_user_best_score(user_id, difficulty=None):
     """
     Get the best score for a specific user, optionally filtered by difficulty
     """
     try:
-        df = load_game_scores()
-        user_scores = df[df['User_id'] == user_id]
-
-        if difficulty:
-            user_scores = user_scores[user_scores['Difficulty'] == difficulty]
-
-        if user_scores.empty:
-            return 0
-
-        return user_scores['Score'].max()
+        return get_score_board().best(user_id, difficulty)
 
     except Exception as e:
         print(f"❌ Error getting user best score: {e}")
@@ -227,18 +315,8 @@ def get_user_best_scores_all_difficulties(user_id):
     Get the best scores for a user across all difficulties
     """
     try:
-        df = load_game_scores()
-        user_scores = df[df['User_id'] == user_id]
-
-        if user_scores.empty:
-            return {"Easy": 0, "Medium": 0, "Hard": 0}
-
-        best_scores = {}
-        for difficulty in ["Easy", "Medium", "Hard"]:
-            difficulty_scores = user_scores[user_scores['Difficulty'] == difficulty]
-            best_scores[difficulty] = difficulty_scores['Score'].max() if not difficulty_scores.empty else 0
-
-        return best_scores
+        board = get_score_board()
+        return {difficulty: board.best(user_id, difficulty) for difficulty in ["Easy", "Medium", "Hard"]}
 
     except Exception as e:
         print(f"❌ Error getting user best scores: {e}")
@@ -249,25 +327,7 @@ def get_leaderboard(top_n=10, difficulty=None):
     Get the top N scores from all users, optionally filtered by difficulty
     """
     try:
-        df = load_game_scores()
-
-        if df.empty:
-            return []
-
-        # Filter by difficulty if specified
-        if difficulty:
-            df = df[df['Difficulty'] == difficulty]
-
-        if df.empty:
-            return []
-
-        # Group by user and get their best score for the specified difficulty
-        user_best = df.groupby(['User_id', 'User_Name'])['Score'].max().reset_index()
-
-        # Sort by score descending and get top N
-        leaderboard = user_best.sort_values('Score', ascending=False).head(top_n)
-
-        return leaderboard.to_dict('records')
+        return get_score_board().top(top_n, difficulty)
 
     except Exception as e:
         print(f"❌ Error getting leaderboard: {e}")
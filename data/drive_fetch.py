@@ -0,0 +1,131 @@
+# data/drive_fetch.py
+# Conditional Drive downloads: fetch and parse a file only when it changed
+
+import io
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+import pandas as pd
+from googleapiclient.http import DEFAULT_CHUNK_SIZE, MediaIoBaseDownload
+from data.drive import get_drive_service
+from data.google_async import API_RETRIES
+from data.sync_metrics import get_sync_metrics
+
+XLSX_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+GOOGLE_APPS_PREFIX = 'application/vnd.google-apps.'
+
+_entries: Dict[str, Tuple[tuple, Any]] = {}  # key -> (fingerprint, parsed value)
+_entries_lock = threading.Lock()
+
+
+def get_file_metadata(file_id) -> dict:
+    """One small files.get call: checksum/version/modified time and MIME type"""
+    meta = get_drive_service().files().get(
+        fileId=file_id, fields='md5Checksum,modifiedTime,version,mimeType'
+    ).execute(num_retries=API_RETRIES)
+    get_sync_metrics().record_api_call('files.get')
+    return meta
+
+
+def fingerprint_of(meta: dict) -> tuple:
+    """
+    Identity of a file's content. Binary files have an md5Checksum; Google
+    Sheets/Docs do not, but their version goes up on every edit.
+    """
+    return (meta.get('md5Checksum') or meta.get('version'), meta.get('modifiedTime'))
+
+
+def download_file(file_id, mime_type: Optional[str] = None, export_mime: str = XLSX_MIME,
+                  chunksize: int = DEFAULT_CHUNK_SIZE) -> io.BytesIO:
+    """
+    Downloads a file into memory: Google-native files are exported as
+    `export_mime`, anything else is fetched as is. When the MIME type is
+    unknown the export is tried first.
+    """
+    files = get_drive_service().files()
+    if mime_type and not mime_type.startswith(GOOGLE_APPS_PREFIX):
+        requests = [files.get_media(fileId=file_id)]
+    elif mime_type:
+        requests = [files.export_media(fileId=file_id, mimeType=export_mime)]
+    else:
+        requests = [files.export_media(fileId=file_id, mimeType=export_mime), files.get_media(fileId=file_id)]
+
+    metrics = get_sync_metrics()
+    for attempt, request in enumerate(requests):
+        file_data = io.BytesIO()
+        try:
+            downloader = MediaIoBaseDownload(file_data, request, chunksize=chunksize)
+            done = False
+            chunks = 0
+            while not done:
+                _, done = downloader.next_chunk(num_retries=API_RETRIES)
+                chunks += 1
+        except Exception:
+            if attempt + 1 == len(requests):
+                raise
+            continue
+        metrics.record_api_call('files.download', chunks)
+        metrics.record_download(file_data.getbuffer().nbytes)
+        file_data.seek(0)
+        return file_data
+
+
+def fetch_drive_file(file_id, parse: Callable[[io.BytesIO], Any], key: Optional[str] = None,
+                     export_mime: str = XLSX_MIME) -> Tuple[Any, Optional[tuple]]:
+    """
+    Returns (parse(content), fingerprint) for a Drive file.
+
+    The file's metadata is checked first; if its fingerprint matches the
+    cached entry for `key` the cached parsed value is returned without
+    downloading or parsing. Callers that parse the same file differently
+    must use different keys. The fingerprint is None when the metadata
+    could not be read (the file is then always downloaded); callers can
+    compare it with the one they last applied to skip rebuilding state.
+    """
+    key = key or file_id
+    try:
+        meta = get_file_metadata(file_id)
+        fingerprint = fingerprint_of(meta)
+    except Exception as e:
+        print(f"⚠️ Could not read metadata for {file_id}, downloading: {e}")
+        meta, fingerprint = {}, None
+
+    with _entries_lock:
+        entry = _entries.get(key)
+    if fingerprint is not None and entry is not None and entry[0] == fingerprint:
+        get_sync_metrics().inc('sync_downloads_skipped_total')
+        return entry[1], fingerprint
+
+    value = parse(download_file(file_id, meta.get('mimeType'), export_mime))
+    if fingerprint is not None:
+        with _entries_lock:
+            _entries[key] = (fingerprint, value)
+    return value, fingerprint
+
+
+def forget(key: Optional[str] = None):
+    """Drops one cached entry (or all), forcing the next fetch to download"""
+    with _entries_lock:
+        if key is None:
+            _entries.clear()
+        else:
+            _entries.pop(key, None)
+
+
+def read_sheets(names) -> Callable[[io.BytesIO], Dict[str, Optional[pd.DataFrame]]]:
+    """Parser for fetch_drive_file: {sheet name: DataFrame, or None if the sheet is missing/unreadable}"""
+    def _parse(data):
+        xls = pd.ExcelFile(data)
+        sheets = {}
+        for name in names:
+            try:
+                sheets[name] = pd.read_excel(xls, sheet_name=name)
+            except Exception as e:
+                print(f"Warning: Could not load sheet '{name}': {e}")
+                sheets[name] = None
+        return sheets
+    return _parse
+
+
+def read_all_sheets(data) -> Dict[str, pd.DataFrame]:
+    """Parser for fetch_drive_file: every sheet of the workbook"""
+    return pd.read_excel(data, sheet_name=None)
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Feature Control System for Admin Management
-Uses Google Drive Excel sheet (DISABLED_DB) for persistent storage
+Uses the local store for persistent storage, mirrored to the Google Drive
+Excel sheet (DISABLED_DB)
 """
 
 import pandas as pd
@@ -9,14 +10,21 @@ import logging
 import streamlit as st
 from typing import Dict, List, Optional
 from datetime import datetime
+from types import MappingProxyType
 import io
+import threading
+import time
+from config import get_config
 from data.drive import get_drive_service
-from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload
+from data.google_async import API_RETRIES
+from data.drive_fetch import fetch_drive_file, read_all_sheets
+from data.local_store import get_local_store, register_replicator
+from googleapiclient.http import MediaIoBaseUpload
 
 logger = logging.getLogger(__name__)
 
 class FeatureController:
-    """Manages enabled/disabled features using Google Drive Excel sheet"""
+    """Manages enabled/disabled features, stored locally and mirrored to the Google Drive Excel sheet"""
 
     def __init__(self):
         self.disabled_db_id = st.secrets.get("DISABLED_DB")
@@ -24,12 +32,22 @@ class FeatureController:
             logger.error("DISABLED_DB file ID not found in secrets")
             raise ValueError("DISABLED_DB configuration missing")
 
-        self.drive_service = get_drive_service()
         self._cache = None
         self._cache_timestamp = None
+        self._cache_is_fallback = False
+        self._write_lock = threading.Lock()
+        self._drive_version = None  # fingerprint of the workbook last loaded from Drive
+
+        # Feature flags compiled from the table: read-only {feature_name: status}.
+        # Replaced as a whole on every load/save, so checks never see a partial update.
+        self._flags = None
         
-        # Cache timeout in seconds (5 minutes)
-        self.cache_timeout = 300
+        # Changes to the sheet are pushed by the sync manager (see refresh_control_tables);
+        # the timed refresh is only a safety net, so it runs every few hours
+        self.cache_timeout = get_config().CONTROL_TABLE_TTL
+
+        # Retry interval in seconds (5 minutes) while Drive is unreachable on first run
+        self.fallback_retry = 300
 
         # Default feature definitions (fallback if Excel is unavailable)
         self.default_features = {
@@ -119,109 +137,139 @@ class FeatureController:
             }
         }
     
-    def _load_from_drive(self) -> pd.DataFrame:
-        """Load feature configuration from Google Drive Excel sheet"""
-        try:
-            # Check cache first
-            if self._cache is not None and self._cache_timestamp is not None:
-                cache_age = (datetime.now() - self._cache_timestamp).total_seconds()
-                if cache_age < self.cache_timeout:
-                    logger.debug("Using cached feature data")
-                    return self._cache
-
-            logger.info("Loading feature configuration from Google Drive...")
-
-            # Download from Google Drive (try both Excel export and direct read)
-            try:
-                # First try: Export as Excel (for Google Sheets)
-                request = self.drive_service.files().export_media(
-                    fileId=self.disabled_db_id,
-                    mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-                file_data = io.BytesIO()
-                downloader = MediaIoBaseDownload(file_data, request)
-
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
-
-                file_data.seek(0)
-                df = pd.read_excel(file_data, sheet_name=None)  # Read all sheets
+    @property
+    def drive_service(self):
+        """Pooled Drive client for the calling thread"""
+        return get_drive_service()
+
+    def _load(self) -> pd.DataFrame:
+        """Load feature configuration from the local store (seeded from Drive on first run)"""
+        if self._cache is not None:
+            if not self._cache_is_fallback:
+                return self._cache
+            cache_age = (datetime.now() - self._cache_timestamp).total_seconds()
+            if cache_age < self.fallback_retry:
+                return self._cache
+
+        local = get_local_store()
+        df = local.get_table('FeatureControl')
+        if df is None:
+            df = self._load_from_drive()
+            if df is not None:
+                local.put_table('FeatureControl', df, dirty=False)
 
-                # Get the first sheet if FeatureControl doesn't exist
-                if 'FeatureControl' in df:
-                    df = df['FeatureControl']
-                else:
-                    # Use the first sheet
-                    sheet_name = list(df.keys())[0]
-                    df = df[sheet_name]
-                    logger.info(f"Using sheet '{sheet_name}' instead of 'FeatureControl'")
+        if df is None:
+            self._set_table(self._create_default_dataframe(), fallback=True)
+        else:
+            self._set_table(df)
+        return self._cache
 
-                logger.info("Successfully loaded data using Excel export method")
+    def _save(self, df: pd.DataFrame) -> bool:
+        """Save feature configuration locally; the replicator mirrors it to Google Drive"""
+        try:
+            with self._write_lock:
+                get_local_store().put_table('FeatureControl', df)
+                self._set_table(df)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving feature configuration: {e}")
+            return False
 
-            except Exception as export_error:
-                logger.warning(f"Excel export failed: {export_error}, trying direct media download...")
+    def _set_table(self, df: pd.DataFrame, fallback: bool = False):
+        """Make `df` the current table and recompile the flags from it"""
+        self._flags = self._compile(df)
+        self._cache = df
+        self._cache_timestamp = datetime.now()
+        self._cache_is_fallback = fallback
+
+    def _compile(self, df: pd.DataFrame):
+        """Compile the feature table into a frozen {feature_name: status} mapping"""
+        flags = {}
+        for _, row in df.iterrows():
+            flags[row['feature_name']] = MappingProxyType(self._row_status(row))
+        return MappingProxyType(flags)
+
+    @staticmethod
+    def _row_status(row) -> Dict:
+        """Status dict for one row of the feature table"""
+        return {
+            'exists': True,
+            'name': row['feature_display_name'],
+            'commands': row['commands'].split(', ') if isinstance(row['commands'], str) else [row['commands']],
+            'enabled': bool(row['enabled']),
+            'disabled_reason': row['disabled_reason'] if pd.notna(row['disabled_reason']) else '',
+            'disabled_by_admin_id': row['disabled_by_admin_id'] if pd.notna(row['disabled_by_admin_id']) else '',
+            'disabled_date': row['disabled_date'] if pd.notna(row['disabled_date']) else '',
+            'restricted_to_authorized': bool(row.get('restricted_to_authorized', False)) if pd.notna(row.get('restricted_to_authorized', False)) else False,
+            'restriction_reason': row.get('restriction_reason', '') if pd.notna(row.get('restriction_reason', '')) else '',
+            'restricted_by_admin_id': row.get('restricted_by_admin_id', '') if pd.notna(row.get('restricted_by_admin_id', '')) else '',
+            'restricted_date': row.get('restricted_date', '') if pd.notna(row.get('restricted_date', '')) else '',
+            'admin_only': bool(row.get('admin_only', False)) if pd.notna(row.get('admin_only', False)) else False,
+            'admin_only_reason': row.get('admin_only_reason', '') if pd.notna(row.get('admin_only_reason', '')) else '',
+            'admin_only_by_admin_id': row.get('admin_only_by_admin_id', '') if pd.notna(row.get('admin_only_by_admin_id', '')) else '',
+            'admin_only_date': row.get('admin_only_date', '') if pd.notna(row.get('admin_only_date', '')) else '',
+            'last_modified': row['last_modified'] if pd.notna(row['last_modified']) else ''
+        }
 
-                # Second try: Direct media download (for actual Excel files)
-                request = self.drive_service.files().get_media(fileId=self.disabled_db_id)
-                file_data = io.BytesIO()
-                downloader = MediaIoBaseDownload(file_data, request)
+    def get_flags(self):
+        """Compiled feature flags; loads the table only on first use"""
+        flags = self._flags
+        if flags is None or self._cache_is_fallback and \
+                (datetime.now() - self._cache_timestamp).total_seconds() >= self.fallback_retry:
+            self._load()
+            flags = self._flags
+        return flags
+
+    def refresh(self) -> bool:
+        """
+        Pull the FeatureControl sheet from Drive (e.g. after edits from the admin
+        app) unless local changes are still waiting to be replicated
+        """
+        local = get_local_store()
+        if 'FeatureControl' in local.dirty_tables():
+            return False
+        df = self._load_from_drive(if_changed=True)
+        if df is None:
+            return False
+        with self._write_lock:
+            if 'FeatureControl' in local.dirty_tables():
+                return False  # an admin change landed while downloading
+            local.put_table('FeatureControl', df, dirty=False)
+            self._set_table(df)
+        logger.info(f"Refreshed {len(df)} feature flags from Google Drive")
+        return True
+
+    def _load_from_drive(self, if_changed: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Load feature configuration from Google Drive Excel sheet (None on failure,
+        or with if_changed=True when the workbook is unchanged since it was last loaded)
+        """
+        try:
+            logger.info("Loading feature configuration from Google Drive...")
 
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
+            # Shared with AIModelConfig; only downloaded when the workbook changed
+            sheets, version = fetch_drive_file(self.disabled_db_id, read_all_sheets)
+            if if_changed and version is not None and version == self._drive_version:
+                logger.info("Feature configuration unchanged on Google Drive")
+                return None
 
-                file_data.seek(0)
-                df = pd.read_excel(file_data, sheet_name='FeatureControl')
-                logger.info("Successfully loaded data using direct media download")
+            # Get the first sheet if FeatureControl doesn't exist
+            if 'FeatureControl' in sheets:
+                df = sheets['FeatureControl']
+            else:
+                # Use the first sheet
+                sheet_name = list(sheets.keys())[0]
+                df = sheets[sheet_name]
+                logger.info(f"Using sheet '{sheet_name}' instead of 'FeatureControl'")
 
             # Log successful loading
             logger.info(f"Successfully loaded {len(df)} features from Google Drive")
-
-            # Update cache
-            self._cache = df
-            self._cache_timestamp = datetime.now()
-
-            return df
+            self._drive_version = version
+            return df.copy()
 
         except Exception as e:
             logger.error(f"Error loading from Google Drive: {e}")
-            # Return default features as DataFrame
-            return self._create_default_dataframe()
-
-    def _save_to_drive(self, df: pd.DataFrame) -> bool:
-        """Save feature configuration to Google Drive Excel sheet"""
-        try:
-            logger.info("Saving feature configuration to Google Drive...")
-
-            # Convert DataFrame to Excel in memory
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='FeatureControl', index=False)
-            excel_buffer.seek(0)
-
-            # Upload to Google Drive
-            media = MediaIoBaseUpload(
-                excel_buffer,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-
-            # Update the existing file
-            updated_file = self.drive_service.files().update(
-                fileId=self.disabled_db_id,
-                media_body=media
-            ).execute()
-
-            # Update cache
-            self._cache = df
-            self._cache_timestamp = datetime.now()
-
-            logger.info("Successfully saved feature configuration to Google Drive")
-            return True
-
-        except Exception as e:
-            logger.error(f"Error saving to Google Drive: {e}")
-            return False
+            return None
 
     def _create_default_dataframe(self) -> pd.DataFrame:
         """Create default DataFrame structure"""
@@ -251,16 +299,13 @@ class FeatureController:
     def is_feature_enabled(self, feature_name: str) -> bool:
         """Check if a feature is enabled"""
         try:
-            df = self._load_from_drive()
+            flag = self.get_flags().get(feature_name)
 
-            # Find the feature in the DataFrame
-            feature_row = df[df['feature_name'] == feature_name]
-
-            if feature_row.empty:
+            if flag is None:
                 logger.warning(f"Unknown feature: {feature_name}")
                 return True  # Default to enabled for unknown features
 
-            return bool(feature_row.iloc[0]['enabled'])
+            return flag['enabled']
 
         except Exception as e:
             logger.error(f"Error checking feature status: {e}")
@@ -270,7 +315,7 @@ class FeatureController:
     def enable_feature(self, feature_name: str, admin_id: int) -> tuple[bool, str]:
         """Enable a feature"""
         try:
-            df = self._load_from_drive()
+            df = self._load()
 
             # Find the feature in the DataFrame
             feature_idx = df[df['feature_name'] == feature_name].index
@@ -286,12 +331,12 @@ class FeatureController:
             df.loc[idx, 'disabled_date'] = ''
             df.loc[idx, 'last_modified'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            # Save to Google Drive
-            if self._save_to_drive(df):
+            # Save locally (replicated to Google Drive in the background)
+            if self._save(df):
                 feature_display_name = df.loc[idx, 'feature_display_name']
                 return True, f"✅ **{feature_display_name}** has been enabled"
             else:
-                return False, "Failed to save configuration to Google Drive"
+                return False, "Failed to save configuration"
 
         except Exception as e:
             logger.error(f"Error enabling feature: {e}")
@@ -300,7 +345,7 @@ class FeatureController:
     def disable_feature(self, feature_name: str, admin_id: int, reason: str = None) -> tuple[bool, str]:
         """Disable a feature"""
         try:
-            df = self._load_from_drive()
+            df = self._load()
 
             # Find the feature in the DataFrame
             feature_idx = df[df['feature_name'] == feature_name].index
@@ -316,12 +361,12 @@ class FeatureController:
             df.loc[idx, 'disabled_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             df.loc[idx, 'last_modified'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            # Save to Google Drive
-            if self._save_to_drive(df):
+            # Save locally (replicated to Google Drive in the background)
+            if self._save(df):
                 feature_display_name = df.loc[idx, 'feature_display_name']
                 return True, f"❌ **{feature_display_name}** has been disabled"
             else:
-                return False, "Failed to save configuration to Google Drive"
+                return False, "Failed to save configuration"
 
         except Exception as e:
             logger.error(f"Error disabling feature: {e}")
@@ -330,33 +375,10 @@ class FeatureController:
     def get_feature_status(self, feature_name: str) -> Dict:
         """Get detailed status of a feature"""
         try:
-            df = self._load_from_drive()
-
-            # Find the feature in the DataFrame
-            feature_row = df[df['feature_name'] == feature_name]
-
-            if feature_row.empty:
+            flag = self.get_flags().get(feature_name)
+            if flag is None:
                 return {'exists': False}
-
-            row = feature_row.iloc[0]
-            return {
-                'exists': True,
-                'name': row['feature_display_name'],
-                'commands': row['commands'].split(', ') if isinstance(row['commands'], str) else [row['commands']],
-                'enabled': bool(row['enabled']),
-                'disabled_reason': row['disabled_reason'] if pd.notna(row['disabled_reason']) else '',
-                'disabled_by_admin_id': row['disabled_by_admin_id'] if pd.notna(row['disabled_by_admin_id']) else '',
-                'disabled_date': row['disabled_date'] if pd.notna(row['disabled_date']) else '',
-                'restricted_to_authorized': bool(row.get('restricted_to_authorized', False)) if pd.notna(row.get('restricted_to_authorized', False)) else False,
-                'restriction_reason': row.get('restriction_reason', '') if pd.notna(row.get('restriction_reason', '')) else '',
-                'restricted_by_admin_id': row.get('restricted_by_admin_id', '') if pd.notna(row.get('restricted_by_admin_id', '')) else '',
-                'restricted_date': row.get('restricted_date', '') if pd.notna(row.get('restricted_date', '')) else '',
-                'admin_only': bool(row.get('admin_only', False)) if pd.notna(row.get('admin_only', False)) else False,
-                'admin_only_reason': row.get('admin_only_reason', '') if pd.notna(row.get('admin_only_reason', '')) else '',
-                'admin_only_by_admin_id': row.get('admin_only_by_admin_id', '') if pd.notna(row.get('admin_only_by_admin_id', '')) else '',
-                'admin_only_date': row.get('admin_only_date', '') if pd.notna(row.get('admin_only_date', '')) else '',
-                'last_modified': row['last_modified'] if pd.notna(row['last_modified']) else ''
-            }
+            return dict(flag)
 
         except Exception as e:
             logger.error(f"Error getting feature status: {e}")
@@ -365,31 +387,7 @@ class FeatureController:
     def get_all_features_status(self) -> Dict:
         """Get status of all features"""
         try:
-            df = self._load_from_drive()
-            status = {}
-
-            for _, row in df.iterrows():
-                feature_name = row['feature_name']
-                status[feature_name] = {
-                    'exists': True,
-                    'name': row['feature_display_name'],
-                    'commands': row['commands'].split(', ') if isinstance(row['commands'], str) else [row['commands']],
-                    'enabled': bool(row['enabled']),
-                    'disabled_reason': row['disabled_reason'] if pd.notna(row['disabled_reason']) else '',
-                    'disabled_by_admin_id': row['disabled_by_admin_id'] if pd.notna(row['disabled_by_admin_id']) else '',
-                    'disabled_date': row['disabled_date'] if pd.notna(row['disabled_date']) else '',
-                    'restricted_to_authorized': bool(row.get('restricted_to_authorized', False)) if pd.notna(row.get('restricted_to_authorized', False)) else False,
-                    'restriction_reason': row['restriction_reason'] if pd.notna(row.get('restriction_reason', '')) else '',
-                    'restricted_by_admin_id': row['restricted_by_admin_id'] if pd.notna(row.get('restricted_by_admin_id', '')) else '',
-                    'restricted_date': row['restricted_date'] if pd.notna(row.get('restricted_date', '')) else '',
-                    'admin_only': bool(row.get('admin_only', False)) if pd.notna(row.get('admin_only', False)) else False,
-                    'admin_only_reason': row.get('admin_only_reason', '') if pd.notna(row.get('admin_only_reason', '')) else '',
-                    'admin_only_by_admin_id': row.get('admin_only_by_admin_id', '') if pd.notna(row.get('admin_only_by_admin_id', '')) else '',
-                    'admin_only_date': row.get('admin_only_date', '') if pd.notna(row.get('admin_only_date', '')) else '',
-                    'last_modified': row['last_modified'] if pd.notna(row['last_modified']) else ''
-                }
-
-            return status
+            return {feature_name: dict(flag) for feature_name, flag in self.get_flags().items()}
 
         except Exception as e:
             logger.error(f"Error getting all features status: {e}")
@@ -421,8 +419,7 @@ class FeatureController:
     def get_available_features(self) -> List[str]:
         """Get list of available feature names"""
         try:
-            df = self._load_from_drive()
-            return df['feature_name'].tolist()
+            return list(self.get_flags())
         except Exception as e:
             logger.error(f"Error getting available features: {e}")
             return list(self.default_features.keys())
@@ -430,7 +427,7 @@ class FeatureController:
     def restrict_access(self, feature_name: str, admin_id: int, reason: str = None) -> tuple[bool, str]:
         """Restrict a feature to authorized users only"""
         try:
-            df = self._load_from_drive()
+            df = self._load()
 
             # Find the feature in the DataFrame
             feature_idx = df[df['feature_name'] == feature_name].index
@@ -446,12 +443,12 @@ class FeatureController:
             df.loc[idx, 'restricted_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             df.loc[idx, 'last_modified'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            # Save to Google Drive
-            if self._save_to_drive(df):
+            # Save locally (replicated to Google Drive in the background)
+            if self._save(df):
                 feature_display_name = df.loc[idx, 'feature_display_name']
                 return True, f"🔒 **{feature_display_name}** is now restricted to authorized users only"
             else:
-                return False, "Failed to save configuration to Google Drive"
+                return False, "Failed to save configuration"
 
         except Exception as e:
             logger.error(f"Error restricting access: {e}")
@@ -460,7 +457,7 @@ class FeatureController:
     def unrestrict_access(self, feature_name: str, admin_id: int) -> tuple[bool, str]:
         """Remove access restriction from a feature"""
         try:
-            df = self._load_from_drive()
+            df = self._load()
 
             # Find the feature in the DataFrame
             feature_idx = df[df['feature_name'] == feature_name].index
@@ -476,12 +473,12 @@ class FeatureController:
             df.loc[idx, 'restricted_date'] = ''
             df.loc[idx, 'last_modified'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            # Save to Google Drive
-            if self._save_to_drive(df):
+            # Save locally (replicated to Google Drive in the background)
+            if self._save(df):
                 feature_display_name = df.loc[idx, 'feature_display_name']
                 return True, f"🔓 **{feature_display_name}** is now available to all users"
             else:
-                return False, "Failed to save configuration to Google Drive"
+                return False, "Failed to save configuration"
 
         except Exception as e:
             logger.error(f"Error unrestricting access: {e}")
@@ -490,19 +487,8 @@ class FeatureController:
     def is_feature_restricted(self, feature_name: str) -> bool:
         """Check if a feature is restricted to authorized users only"""
         try:
-            df = self._load_from_drive()
-
-            # Find the feature in the DataFrame
-            feature_row = df[df['feature_name'] == feature_name]
-
-            if feature_row.empty:
-                return False  # Unknown features are not restricted
-
-            # Check if restricted_to_authorized column exists and is True
-            if 'restricted_to_authorized' in df.columns:
-                return bool(feature_row.iloc[0]['restricted_to_authorized'])
-            else:
-                return False  # No restriction if column doesn't exist
+            flag = self.get_flags().get(feature_name)
+            return flag is not None and flag['restricted_to_authorized']  # Unknown features are not restricted
 
         except Exception as e:
             logger.error(f"Error checking feature restriction: {e}")
@@ -511,19 +497,8 @@ class FeatureController:
     def is_admin_only(self, feature_name: str) -> bool:
         """Check if a feature is admin-only"""
         try:
-            df = self._load_from_drive()
-
-            # Find the feature in the DataFrame
-            feature_row = df[df['feature_name'] == feature_name]
-
-            if feature_row.empty:
-                return False  # Unknown features are not admin-only
-
-            # Check if admin_only column exists and is True
-            if 'admin_only' in df.columns:
-                return bool(feature_row.iloc[0]['admin_only'])
-            else:
-                return False  # Not admin-only if column doesn't exist
+            flag = self.get_flags().get(feature_name)
+            return flag is not None and flag['admin_only']  # Unknown features are not admin-only
 
         except Exception as e:
             logger.error(f"Error checking admin-only status: {e}")
@@ -532,7 +507,7 @@ class FeatureController:
     def set_admin_only(self, feature_name: str, admin_id: int, reason: str = None) -> tuple[bool, str]:
         """Set a feature to admin-only"""
         try:
-            df = self._load_from_drive()
+            df = self._load()
 
             # Find the feature in the DataFrame
             feature_idx = df[df['feature_name'] == feature_name].index
@@ -555,12 +530,12 @@ class FeatureController:
             df.loc[idx, 'admin_only_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             df.loc[idx, 'last_modified'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            # Save to Google Drive
-            if self._save_to_drive(df):
+            # Save locally (replicated to Google Drive in the background)
+            if self._save(df):
                 feature_display_name = df.loc[idx, 'feature_display_name']
                 return True, f"🔐 **{feature_display_name}** is now admin-only"
             else:
-                return False, "Failed to save configuration to Google Drive"
+                return False, "Failed to save configuration"
 
         except Exception as e:
             logger.error(f"Error setting admin-only: {e}")
@@ -569,7 +544,7 @@ class FeatureController:
     def unset_admin_only(self, feature_name: str, admin_id: int) -> tuple[bool, str]:
         """Remove admin-only restriction from a feature"""
         try:
-            df = self._load_from_drive()
+            df = self._load()
 
             # Find the feature in the DataFrame
             feature_idx = df[df['feature_name'] == feature_name].index
@@ -586,19 +561,93 @@ class FeatureController:
                 df.loc[idx, 'admin_only_date'] = ''
             df.loc[idx, 'last_modified'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            # Save to Google Drive
-            if self._save_to_drive(df):
+            # Save locally (replicated to Google Drive in the background)
+            if self._save(df):
                 feature_display_name = df.loc[idx, 'feature_display_name']
                 return True, f"🔓 **{feature_display_name}** is no longer admin-only"
             else:
-                return False, "Failed to save configuration to Google Drive"
+                return False, "Failed to save configuration"
 
         except Exception as e:
             logger.error(f"Error unsetting admin-only: {e}")
             return False, f"Error unsetting admin-only: {str(e)}"
 
+# Sheets of the DISABLED_DB workbook owned by the local store
+CONTROL_SHEETS = ('FeatureControl', 'AIModelConfig')
+
+def replicate_control_tables() -> bool:
+    """Mirror locally changed control tables (features, AI model assignments) to the DISABLED_DB workbook"""
+    local = get_local_store()
+    dirty = {name: version for name, version in local.dirty_tables().items() if name in CONTROL_SHEETS}
+    if not dirty:
+        return True
+
+    disabled_db_id = st.secrets.get("DISABLED_DB")
+    if not disabled_db_id:
+        logger.error("DISABLED_DB file ID not found in secrets")
+        return False
+
+    drive_service = get_drive_service()
+    xlsx = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    # Keep any other sheets in the workbook as they are (cached copy if unchanged)
+    sheets, _ = fetch_drive_file(disabled_db_id, read_all_sheets)
+    sheets = dict(sheets)
+
+    for name in CONTROL_SHEETS:
+        table = local.get_table(name)
+        if table is not None:
+            sheets[name] = table
+
+    excel_buffer = io.BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
+        for sheet_name, sheet_df in sheets.items():
+            sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
+    excel_buffer.seek(0)
+
+    drive_service.files().update(
+        fileId=disabled_db_id,
+        media_body=MediaIoBaseUpload(excel_buffer, mimetype=xlsx)
+    ).execute(num_retries=API_RETRIES)
+
+    for name, version in dirty.items():
+        local.mark_table_clean(name, version)
+    logger.info(f"Replicated {', '.join(dirty)} to Google Drive")
+    return True
+
+register_replicator("control tables", replicate_control_tables)
+
+def refresh_control_tables():
+    """
+    Reload feature flags and AI model assignments from the DISABLED_DB workbook.
+    Called by the sync manager when the workbook changes on Drive.
+    """
+    from data.ai_model_config import get_ai_model_config
+    for controller in (get_feature_controller(), get_ai_model_config()):
+        if hasattr(controller, 'refresh'):
+            controller.refresh()
+
 # Global instance (lazy initialization to avoid startup errors)
 _feature_controller = None
+_refresh_thread = None
+
+def start_feature_refresh(controller: FeatureController, interval: int = None):
+    """Starts a daemon thread that refreshes the feature flags from Drive every `interval` seconds"""
+    global _refresh_thread
+    if _refresh_thread is not None:
+        return
+    interval = interval or controller.cache_timeout
+
+    def _run():
+        while True:
+            time.sleep(interval)
+            try:
+                controller.refresh()
+            except Exception as e:
+                logger.error(f"Feature flag refresh failed: {e}")
+
+    _refresh_thread = threading.Thread(target=_run, name="feature-refresh", daemon=True)
+    _refresh_thread.start()
 
 def get_feature_controller():
     """Get or create the global feature controller instance"""
@@ -606,6 +655,7 @@ def get_feature_controller():
     if _feature_controller is None:
         try:
             _feature_controller = FeatureController()
+            start_feature_refresh(_feature_controller)
         except Exception as e:
             logger.error(f"Failed to initialize feature controller: {e}")
             # Return a dummy controller that always allows features
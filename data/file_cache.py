@@ -0,0 +1,268 @@
+# data/file_cache.py
+# Local content-addressed cache for Drive files (notation and lyrics PDFs)
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from googleapiclient.http import MediaIoBaseDownload
+from config import get_config
+from data.google_async import API_RETRIES
+
+
+def download_drive_file_bytes(drive_service, file_id):
+    """
+    Downloads a binary Drive file and returns its content as bytes.
+    """
+    request = drive_service.files().get_media(fileId=file_id)
+    file_data = io.BytesIO()
+    downloader = MediaIoBaseDownload(file_data, request)
+    done = False
+    while not done:
+        _, done = downloader.next_chunk(num_retries=API_RETRIES)
+    return file_data.getvalue()
+
+
+class DriveFileCache:
+    """
+    Disk cache of Drive files keyed by (file id, md5Checksum).
+    A changed file on Drive gets a new checksum and therefore a new entry,
+    so cached entries never need revalidation. Files are validated once on
+    insert, evicted least-recently-used when the cache exceeds max_bytes, and
+    request counts are kept so the most requested files can be prefetched.
+    """
+
+    COUNTS_FILE = "request_counts.json"
+    SAVE_COUNTS_EVERY = 10
+
+    def __init__(self, cache_dir: str, max_bytes: int, suffix: str = ".pdf"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (file_id, checksum) -> (path, size), oldest first
+        self._checksums = {}           # file_id -> md5Checksum learned from folder listings
+        self._request_counts = {}      # file_id -> number of requests
+        self._unsaved_requests = 0
+        self._total_bytes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_existing()
+
+    def _entry_path(self, file_id, checksum):
+        return os.path.join(self.cache_dir, f"{file_id}_{checksum}{self.suffix}")
+
+    def _load_existing(self):
+        """Rebuilds the LRU index from files already on disk (oldest access first)."""
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.suffix):
+                continue
+            file_id, sep, checksum = name[:-len(self.suffix)].rpartition("_")
+            if not sep:
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found.append((stat.st_mtime, (file_id, checksum), path, stat.st_size))
+        for _, key, path, size in sorted(found):
+            self._entries[key] = (path, size)
+            self._total_bytes += size
+
+        counts_path = os.path.join(self.cache_dir, self.COUNTS_FILE)
+        try:
+            with open(counts_path, "r") as f:
+                self._request_counts = {k: int(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError):
+            self._request_counts = {}
+
+    def save_request_counts(self):
+        """Persists request counts atomically so popularity survives restarts."""
+        with self._lock:
+            counts = dict(self._request_counts)
+            self._unsaved_requests = 0
+        counts_path = os.path.join(self.cache_dir, self.COUNTS_FILE)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(counts, f)
+        os.replace(tmp_path, counts_path)
+
+    def remember_checksums(self, checksums: dict):
+        """Records {file_id: md5Checksum} from a folder listing so lookups need no metadata call."""
+        with self._lock:
+            self._checksums.update({k: v for k, v in checksums.items() if v})
+
+    def checksum_for(self, file_id, drive_service=None):
+        """Returns the known md5Checksum of a file, asking Drive only if it is unknown."""
+        with self._lock:
+            checksum = self._checksums.get(file_id)
+        if checksum or drive_service is None:
+            return checksum
+        try:
+            meta = drive_service.files().get(fileId=file_id, fields="md5Checksum").execute(num_retries=API_RETRIES)
+        except Exception as e:
+            print(f"⚠️ Could not get checksum for {file_id}: {e}")
+            return None
+        checksum = meta.get("md5Checksum")
+        if checksum:
+            with self._lock:
+                self._checksums[file_id] = checksum
+        return checksum
+
+    def lookup(self, file_id, checksum):
+        """Returns the cached path for (file_id, checksum) and marks it recently used, or None."""
+        key = (file_id, checksum)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        path = entry[0]
+        try:
+            os.utime(path, None)
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+                self._total_bytes -= entry[1]
+            return None
+        return path
+
+    def insert(self, file_id, checksum, data: bytes, validator=None):
+        """
+        Validates and stores file content. Returns the cached path, or None if
+        the content failed validation.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if validator is not None and not validator(tmp_path):
+            os.remove(tmp_path)
+            return None
+        path = self._entry_path(file_id, checksum)
+        os.replace(tmp_path, path)
+        key = (file_id, checksum)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (path, len(data))
+            self._total_bytes += len(data)
+            self._evict_locked(keep=key)
+        return path
+
+    def _evict_locked(self, keep=None):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, (path, size) = next(iter(self._entries.items()))
+            if key == keep:
+                self._entries.move_to_end(key)
+                continue
+            self._entries.pop(key)
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def fetch(self, file_id, drive_service, validator=None, count_request=True):
+        """
+        Returns a local cached path for the current version of a Drive file,
+        downloading it only on a cache miss. Returns None if the file has no
+        checksum to key on or cannot be downloaded or validated.
+        """
+        if count_request:
+            with self._lock:
+                self._request_counts[file_id] = self._request_counts.get(file_id, 0) + 1
+                self._unsaved_requests += 1
+                save_counts = self._unsaved_requests >= self.SAVE_COUNTS_EVERY
+            if save_counts:
+                self.save_request_counts()
+        checksum = self.checksum_for(file_id, drive_service)
+        if not checksum:
+            return None
+        path = self.lookup(file_id, checksum)
+        if path:
+            return path
+        data = download_drive_file_bytes(drive_service, file_id)
+        return self.insert(file_id, checksum, data, validator)
+
+    def copy_to(self, file_id, dest_path, drive_service, validator=None):
+        """
+        Fetches a file through the cache and copies it to dest_path, so callers can
+        delete their copy after sending without touching the cache. Files without
+        a checksum are downloaded straight to dest_path.
+        """
+        path = self.fetch(file_id, drive_service, validator)
+        if path is not None:
+            shutil.copyfile(path, dest_path)
+            return dest_path
+        if self.checksum_for(file_id):
+            # Known version that failed to download or validate
+            return None
+        with open(dest_path, "wb") as f:
+            f.write(download_drive_file_bytes(drive_service, file_id))
+        if validator is not None and not validator(dest_path):
+            os.remove(dest_path)
+            return None
+        return dest_path
+
+    def most_requested(self, limit: int):
+        with self._lock:
+            ranked = sorted(self._request_counts.items(), key=lambda item: item[1], reverse=True)
+        return [file_id for file_id, _ in ranked[:limit]]
+
+    def prefetch(self, drive_service, file_ids, validator=None):
+        """Downloads the given files into the cache if their current version is missing."""
+        fetched = 0
+        for file_id in file_ids:
+            try:
+                checksum = self.checksum_for(file_id, drive_service)
+                if checksum and self.lookup(file_id, checksum):
+                    continue
+                if self.fetch(file_id, drive_service, validator, count_request=False):
+                    fetched += 1
+            except Exception as e:
+                print(f"⚠️ Prefetch failed for {file_id}: {e}")
+        return fetched
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'known_checksums': len(self._checksums),
+            }
+
+
+_notation_cache = None
+
+
+def get_notation_cache() -> DriveFileCache:
+    """Returns the shared cache for notation and lyrics PDFs."""
+    global _notation_cache
+    if _notation_cache is None:
+        config = get_config()
+        _notation_cache = DriveFileCache(
+            config.NOTATION_CACHE_DIR,
+            config.NOTATION_CACHE_MAX_MB * 1024 * 1024
+        )
+    return _notation_cache
+
+
+def prefetch_popular_notations(validator=None):
+    """
+    Warms the notation cache with the most requested files.
+    Meant to run in a background thread: it builds its own Drive service.
+    """
+    from data.drive import get_drive_service
+    cache = get_notation_cache()
+    file_ids = cache.most_requested(get_config().NOTATION_PREFETCH_COUNT)
+    if not file_ids:
+        return 0
+    fetched = cache.prefetch(get_drive_service(), file_ids, validator)
+    print(f"✅ Prefetched {fetched} popular notation files")
+    return fetched
@@ -0,0 +1,268 @@
+# data/folder_index.py
+# Persisted number -> file id maps of the notation folders, kept current from the Drive changes feed
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from googleapiclient.errors import HttpError
+from config import get_config
+from data.google_async import API_RETRIES
+from data.file_cache import get_notation_cache
+
+PDF_MIME_TYPE = "application/pdf"
+CHANGE_FIELDS = (
+    "nextPageToken,newStartPageToken,"
+    "changes(fileId,removed,file(name,parents,trashed,mimeType,md5Checksum))"
+)
+
+
+def parse_page_number(name):
+    """Hymn notation files are named by page number, e.g. '123.pdf'."""
+    try:
+        return int(name.split('.')[0])
+    except ValueError:
+        return None
+
+
+def parse_lyric_number(name):
+    """Lyric notation files are named 'L-<number>.pdf'."""
+    match = re.match(r'L-(\d+)\.pdf$', name)
+    return int(match.group(1)) if match else None
+
+
+class DriveFolderIndex:
+    """
+    Number -> Drive file id map for the PDFs in one folder.
+
+    The map is loaded from disk at startup. The first sync lists the folder
+    once and records a changes-feed token; later syncs only read the changes
+    since that token, so API usage follows what changed rather than the
+    folder size. `file_map` is updated in place, so modules holding a
+    reference to it always see the current state.
+    """
+
+    def __init__(self, folder_id: str, parse_name, state_path: str, label: str = None):
+        self.folder_id = folder_id
+        self.parse_name = parse_name
+        self.state_path = state_path
+        self.label = label or folder_id
+        self.file_map = {}
+        self._files = {}  # file_id -> {'name': ..., 'md5': ...}
+        self._page_token = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.last_sync = None
+
+    def load(self):
+        """Loads the persisted map. Returns True if one was found."""
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get("folder_id") != self.folder_id:
+            return False
+        with self._lock:
+            self._files = state.get("files", {})
+            self._page_token = state.get("page_token")
+            self._rebuild_map_locked()
+        print(f"📦 Loaded {len(self.file_map)} {self.label} entries from disk")
+        return True
+
+    def _save(self):
+        with self._lock:
+            state = {
+                "folder_id": self.folder_id,
+                "page_token": self._page_token,
+                "files": dict(self._files),
+            }
+        directory = os.path.dirname(self.state_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _rebuild_map_locked(self):
+        new_map = {}
+        for file_id, info in sorted(self._files.items(), key=lambda item: item[1]["name"]):
+            number = self.parse_name(info["name"])
+            if number is not None and number not in new_map:
+                new_map[number] = file_id
+        # Update in place without ever exposing an empty map to readers
+        for number in [n for n in self.file_map if n not in new_map]:
+            del self.file_map[number]
+        self.file_map.update(new_map)
+        get_notation_cache().remember_checksums({fid: info.get("md5") for fid, info in self._files.items()})
+
+    def _full_listing(self, drive_service):
+        """Lists the whole folder and starts a fresh changes-feed cursor."""
+        # Take the token first so nothing changed during the listing is missed
+        page_token = drive_service.changes().getStartPageToken().execute(num_retries=API_RETRIES).get("startPageToken")
+        files = {}
+        list_token = None
+        while True:
+            response = drive_service.files().list(
+                q=f"'{self.folder_id}' in parents and mimeType='{PDF_MIME_TYPE}' and trashed = false",
+                fields="nextPageToken, files(id, name, md5Checksum)",
+                pageToken=list_token,
+                pageSize=1000
+            ).execute(num_retries=API_RETRIES)
+            for file in response.get("files", []):
+                files[file["id"]] = {"name": file["name"], "md5": file.get("md5Checksum")}
+            list_token = response.get("nextPageToken")
+            if list_token is None:
+                break
+        with self._lock:
+            self._files = files
+            self._page_token = page_token
+            self._rebuild_map_locked()
+        return len(files)
+
+    def _apply_changes(self, drive_service):
+        """Applies changes since the stored cursor. Returns the number of entries touched."""
+        with self._lock:
+            page_token = self._page_token
+        touched = 0
+        while page_token:
+            response = drive_service.changes().list(
+                pageToken=page_token,
+                spaces="drive",
+                includeRemoved=True,
+                pageSize=1000,
+                fields=CHANGE_FIELDS
+            ).execute(num_retries=API_RETRIES)
+            with self._lock:
+                for change in response.get("changes", []):
+                    touched += self._apply_change_locked(change)
+            if response.get("newStartPageToken"):
+                page_token = response["newStartPageToken"]
+                break
+            page_token = response.get("nextPageToken")
+        with self._lock:
+            self._page_token = page_token
+            if touched:
+                self._rebuild_map_locked()
+        return touched
+
+    def _apply_change_locked(self, change):
+        file_id = change.get("fileId")
+        file = change.get("file") or {}
+        in_folder = (
+            not change.get("removed")
+            and not file.get("trashed")
+            and file.get("mimeType") == PDF_MIME_TYPE
+            and self.folder_id in file.get("parents", [])
+        )
+        if in_folder:
+            entry = {"name": file.get("name", ""), "md5": file.get("md5Checksum")}
+            if self._files.get(file_id) == entry:
+                return 0
+            self._files[file_id] = entry
+            return 1
+        return 1 if self._files.pop(file_id, None) is not None else 0
+
+    def sync(self, drive_service=None):
+        """
+        Brings the map up to date: a full listing the first time (or when the
+        changes cursor has expired), otherwise just the changes since last sync.
+        """
+        if drive_service is None:
+            from data.drive import get_drive_service
+            drive_service = get_drive_service()
+        with self._sync_lock:
+            try:
+                if self._page_token is None:
+                    count = self._full_listing(drive_service)
+                    print(f"✅ Indexed {count} {self.label} files from Drive")
+                else:
+                    touched = self._apply_changes(drive_service)
+                    if touched:
+                        print(f"🔄 {self.label}: applied {touched} folder changes")
+            except HttpError as e:
+                if e.resp.status not in (400, 410):
+                    raise
+                print(f"⚠️ {self.label}: changes cursor expired, relisting folder")
+                with self._lock:
+                    self._page_token = None
+                count = self._full_listing(drive_service)
+                print(f"✅ Indexed {count} {self.label} files from Drive")
+            self.last_sync = time.time()
+            self._save()
+        return self.file_map
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self.file_map),
+                'files': len(self._files),
+                'has_cursor': self._page_token is not None,
+                'last_sync': self.last_sync,
+            }
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+_sync_thread = None
+
+
+def get_folder_index(folder_id: str, parse_name, label: str = None) -> DriveFolderIndex:
+    """Returns the shared index for a folder, loading its persisted state on first use."""
+    with _indexes_lock:
+        index = _indexes.get(folder_id)
+        if index is None:
+            state_path = os.path.join(get_config().FOLDER_INDEX_DIR, f"{folder_id}.json")
+            index = DriveFolderIndex(folder_id, parse_name, state_path, label)
+            index.load()
+            _indexes[folder_id] = index
+        return index
+
+
+def get_hymn_sheet_index() -> DriveFolderIndex:
+    return get_folder_index(get_config().H_SHEET_MUSIC, parse_page_number, "hymn notation")
+
+
+def get_lyrics_sheet_index() -> DriveFolderIndex:
+    return get_folder_index(get_config().L_SHEET_MUSIC, parse_lyric_number, "lyric notation")
+
+
+def sync_all_folder_indexes(drive_service=None):
+    """Runs an incremental sync of every registered folder index."""
+    if drive_service is None:
+        from data.drive import get_drive_service
+        drive_service = get_drive_service()
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        try:
+            index.sync(drive_service)
+        except Exception as e:
+            print(f"❌ Error syncing {index.label} index: {e}")
+
+
+def start_folder_index_sync(interval: int = None, on_first_sync=None):
+    """
+    Starts a daemon thread that syncs the folder indexes right away and then
+    every `interval` seconds. `on_first_sync` runs once after the first pass.
+    """
+    global _sync_thread
+    if _sync_thread is not None:
+        return
+    interval = interval or get_config().FOLDER_INDEX_SYNC_INTERVAL
+
+    def _run():
+        sync_all_folder_indexes()
+        if on_first_sync is not None:
+            try:
+                on_first_sync()
+            except Exception as e:
+                print(f"⚠️ Post-sync task failed: {e}")
+        while True:
+            time.sleep(interval)
+            sync_all_folder_indexes()
+
+    _sync_thread = threading.Thread(target=_run, name="folder-index-sync", daemon=True)
+    _sync_thread.start()
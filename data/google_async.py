@@ -0,0 +1,58 @@
+# data/google_async.py
+# Async facade for the blocking Google API client (Drive, Sheets, Docs)
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import get_config
+
+# Retries for individual API requests. googleapiclient retries 429, 5xx and
+# connection errors with randomized exponential backoff when num_retries > 0.
+API_RETRIES = get_config().GOOGLE_API_RETRIES
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_google_executor() -> ThreadPoolExecutor:
+    """
+    Returns the bounded executor all Google API work runs on, so slow Drive
+    calls never block the event loop and at most GOOGLE_API_WORKERS run at once.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_config().GOOGLE_API_WORKERS,
+                thread_name_prefix="google-api"
+            )
+        return _executor
+
+
+def execute_request(request):
+    """Executes a googleapiclient request with backoff on transient errors."""
+    return request.execute(num_retries=API_RETRIES)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs a blocking data-layer function (anything that talks to Google APIs)
+    on the Google API executor and awaits its result.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_google_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def execute_async(request):
+    """Awaitable version of execute_request for a single API request."""
+    return await run_blocking(execute_request, request)
+
+
+def shutdown_google_executor(wait: bool = True):
+    """Stops the executor, letting queued writes finish when wait is True."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,68 @@
+# data/google_services.py
+# Shared Google API clients: one credential, keep-alive connections, thread-safe access
+
+import threading
+import httplib2
+import google_auth_httplib2
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from config import get_config
+
+SCOPES = [
+    "https://www.googleapis.com/auth/drive",
+    "https://www.googleapis.com/auth/documents",
+    "https://www.googleapis.com/auth/spreadsheets",
+]
+
+
+class GoogleServiceRegistry:
+    """
+    Hands out Drive, Docs and Sheets clients built from one service-account
+    credential, so the access token is refreshed once for every API.
+
+    googleapiclient services are not thread-safe (each wraps an httplib2
+    connection), so every thread gets its own client per API. A client is
+    built once per thread and reused, keeping its HTTPS connection alive
+    instead of paying for a new client and TLS handshake on every call.
+    """
+
+    def __init__(self, service_account_info: dict, timeout: int = 60):
+        self.credentials = service_account.Credentials.from_service_account_info(
+            service_account_info, scopes=SCOPES
+        )
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._built = 0
+
+    def get(self, api: str, version: str):
+        services = getattr(self._local, "services", None)
+        if services is None:
+            services = self._local.services = {}
+        service = services.get((api, version))
+        if service is None:
+            http = google_auth_httplib2.AuthorizedHttp(
+                self.credentials, http=httplib2.Http(timeout=self.timeout)
+            )
+            service = build(api, version, http=http, cache_discovery=False)
+            services[(api, version)] = service
+            with self._lock:
+                self._built += 1
+        return service
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'clients_built': self._built, 'token_valid': self.credentials.valid}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_service_registry() -> GoogleServiceRegistry:
+    """Returns the process-wide service registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = GoogleServiceRegistry(get_config().service_account_data)
+        return _registry
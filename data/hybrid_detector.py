@@ -9,6 +9,8 @@ from googleapiclient.errors import HttpError
 from data.drive import get_drive_service
 from data.change_detector import PollingChangeDetector
 from config import get_config
+import hmac
+import secrets
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -74,9 +76,8 @@ class HybridChangeDetector:
             if not self.drive_service:
                 self.drive_service = get_drive_service()
             
-            # Note: This requires a public HTTPS endpoint
-            # For Streamlit, we'd need to set up a webhook receiver
-            # For now, this is a placeholder that gracefully fails
+            # Requires a public HTTPS endpoint that routes to the local
+            # receiver (data/webhook_receiver.py); without one we poll only
             config = get_config()
             webhook_url = getattr(config, 'WEBHOOK_URL', None)
             
@@ -85,6 +86,7 @@ class HybridChangeDetector:
                 return False
             
             channel_id = str(uuid.uuid4())
+            token = secrets.token_urlsafe(24)
             expiration = int((datetime.now() + timedelta(hours=24)).timestamp() * 1000)
             
             # Register webhook
@@ -94,6 +96,7 @@ class HybridChangeDetector:
                     'id': channel_id,
                     'type': 'web_hook',
                     'address': webhook_url,
+                    'token': token,
                     'expiration': expiration
                 }
             ).execute()
@@ -101,6 +104,7 @@ class HybridChangeDetector:
             self.webhook_channels[file_id] = {
                 'id': channel_id,
                 'resource_id': channel.get('resourceId'),
+                'token': token,
                 'expiration': expiration
             }
             self.webhook_active_files.add(file_id)
@@ -145,15 +149,37 @@ class HybridChangeDetector:
             self.webhook_channels.pop(file_id, None)
             self.webhook_active_files.discard(file_id)
     
+    def resolve_channel(self, channel_id: str, token: str) -> Optional[str]:
+        """Return the file a notification is for, or None if the channel id/token is not ours"""
+        for file_id, channel in list(self.webhook_channels.items()):
+            if channel['id'] == channel_id:
+                return file_id if hmac.compare_digest(channel.get('token', ''), token) else None
+        return None
+
+    def _tune_polling(self):
+        """Poll slowly while every file has a webhook, at full speed otherwise"""
+        poller = self.polling_detector
+        config = get_config()
+        if self.callbacks and self.webhook_active_files >= set(self.callbacks):
+            interval = max(self.polling_interval, config.WEBHOOK_POLLING_INTERVAL)
+        else:
+            interval = self.polling_interval
+        if poller.check_interval != interval:
+            poller.check_interval = interval
+            poller.current_interval = interval
+            poller.max_interval = max(interval, config.AUTO_SYNC_MAX_INTERVAL)
+            logger.info(f"⏱️ Polling fallback interval set to {interval}s")
+
     async def handle_webhook_notification(self, file_id: str):
         """
-        Handle a webhook notification (called by webhook endpoint).
-        
-        This would be called by your Streamlit webhook handler.
+        Handle a webhook notification (called by the webhook receiver, see data/webhook_receiver.py).
         """
         self.last_webhook_event[file_id] = datetime.now()
         logger.info(f"⚡ Webhook notification received for file {file_id[:8]}...")
         
+        # Let the safety-net poll know this edit is handled, so it does not reload again
+        await self.polling_detector.mark_current(file_id)
+        
         # Execute callbacks immediately (instant detection!)
         if file_id in self.callbacks:
             for callback in self.callbacks[file_id]:
@@ -187,6 +213,8 @@ class HybridChangeDetector:
                         logger.info(f"🔄 Renewing webhook for {file_id[:8]}...")
                         self._stop_webhook(file_id)
                         self._try_register_webhook(file_id)
+
+                self._tune_polling()
                 
                 # Check every 30 minutes
                 await asyncio.sleep(1800)
@@ -214,6 +242,7 @@ class HybridChangeDetector:
             logger.info(f"🎯 Hybrid mode: {webhook_count} webhooks active + polling fallback every {self.polling_interval}s")
             # Start webhook monitor
             asyncio.create_task(self._webhook_monitor_loop())
+            self._tune_polling()
         else:
             logger.info(f"🎯 Polling-only mode: Checking every {self.polling_interval}s (webhooks unavailable)")
         
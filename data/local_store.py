@@ -0,0 +1,258 @@
+# data/local_store.py
+# Local SQLite (WAL) store: the source of truth for users, game scores and
+# control tables, mirrored to Google Sheets by a background replicator
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import pandas as pd
+from datetime import datetime
+from config import get_config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS users (
+    user_id  INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    record   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_dirty (
+    user_id INTEGER NOT NULL,
+    col     TEXT NOT NULL,
+    PRIMARY KEY (user_id, col)
+);
+CREATE TABLE IF NOT EXISTS game_scores (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    date       TEXT,
+    user_name  TEXT,
+    user_id    INTEGER,
+    score      INTEGER,
+    difficulty TEXT,
+    replicated INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_game_scores_user ON game_scores (user_id, difficulty);
+CREATE TABLE IF NOT EXISTS control_tables (
+    name       TEXT PRIMARY KEY,
+    rows       TEXT NOT NULL,
+    dirty      INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+"""
+
+
+def _json_default(value):
+    if hasattr(value, 'item'):  # numpy scalar
+        return value.item()
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(value):
+    return json.dumps(value, default=_json_default)
+
+
+def _clean(value):
+    """NaN -> None, numpy scalars and timestamps -> plain values for SQLite/JSON."""
+    if isinstance(value, float) and pd.isna(value):
+        return None
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if hasattr(value, 'item'):
+        value = value.item()
+        return None if isinstance(value, float) and pd.isna(value) else value
+    return value
+
+
+class LocalStore:
+    """
+    Embedded SQLite database in WAL mode. Every thread gets its own
+    connection; WAL lets readers run while the replicator writes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- meta ---
+
+    def get_meta(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, _dumps(value)))
+
+    # --- users ---
+
+    def has_users(self) -> bool:
+        return self.get_meta("user_columns") is not None
+
+    def load_users(self):
+        """Returns (columns, rows as dicts in sheet order, {user_id: set(dirty columns)})."""
+        conn = self._conn()
+        columns = self.get_meta("user_columns", [])
+        rows = [json.loads(record) for (record,) in conn.execute("SELECT record FROM users ORDER BY position")]
+        dirty = {}
+        for user_id, col in conn.execute("SELECT user_id, col FROM user_dirty"):
+            dirty.setdefault(user_id, set()).add(col)
+        return columns, rows, dirty
+
+    def replace_users(self, columns, rows):
+        """Replaces all users (seeding from the sheet). Pending dirty cells are kept."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM users")
+            conn.executemany(
+                "INSERT INTO users (user_id, position, record) VALUES (?, ?, ?)",
+                [(row['user_id'], position, _dumps({k: _clean(v) for k, v in row.items()}))
+                 for position, row in enumerate(rows)]
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('user_columns', ?)", (_dumps(columns),))
+
+    def write_user(self, user_id, position, values: dict, columns, dirty_columns):
+        """Stores one user row and records which of its cells still need replicating."""
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO users (user_id, position, record) VALUES (?, ?, ?)",
+                (user_id, position, _dumps({k: _clean(v) for k, v in values.items()}))
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO user_dirty (user_id, col) VALUES (?, ?)",
+                [(user_id, col) for col in dirty_columns]
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('user_columns', ?)", (_dumps(columns),))
+
+    def clear_user_dirty(self, dirty: dict):
+        """Forgets dirty cells that have been replicated."""
+        with self._conn() as conn:
+            conn.executemany(
+                "DELETE FROM user_dirty WHERE user_id = ? AND col = ?",
+                [(user_id, col) for user_id, cols in dirty.items() for col in cols]
+            )
+
+    # --- game scores ---
+
+    def has_game_scores(self) -> bool:
+        return bool(self.get_meta("game_scores_seeded", False))
+
+    def replace_game_scores(self, df: pd.DataFrame):
+        """Seeds the score log from the sheet; the seeded rows count as replicated."""
+        rows = [
+            (_clean(r.get('Date')), _clean(r.get('User_Name')), _clean(r.get('User_id')),
+             _clean(r.get('Score')), _clean(r.get('Difficulty')) or 'Easy')
+            for r in df.to_dict('records')
+        ]
+        with self._conn() as conn:
+            conn.execute("DELETE FROM game_scores")
+            conn.executemany(
+                "INSERT INTO game_scores (date, user_name, user_id, score, difficulty, replicated) "
+                "VALUES (?, ?, ?, ?, ?, 1)",
+                rows
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('game_scores_seeded', 'true')")
+
+    def add_game_score(self, date, user_name, user_id, score, difficulty):
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "INSERT INTO game_scores (date, user_name, user_id, score, difficulty) VALUES (?, ?, ?, ?, ?)",
+                (date, user_name, user_id, score, difficulty)
+            )
+            return cursor.lastrowid
+
+    def game_scores_frame(self) -> pd.DataFrame:
+        rows = self._conn().execute(
+            "SELECT date, user_name, user_id, score, difficulty FROM game_scores ORDER BY id"
+        ).fetchall()
+        return pd.DataFrame(rows, columns=['Date', 'User_Name', 'User_id', 'Score', 'Difficulty'])
+
+    def query(self, sql, params=()):
+        return self._conn().execute(sql, params).fetchall()
+
+    def unreplicated_score_ids(self):
+        return [row[0] for row in self._conn().execute("SELECT id FROM game_scores WHERE replicated = 0 ORDER BY id")]
+
+    def mark_scores_replicated(self, ids):
+        with self._conn() as conn:
+            conn.executemany("UPDATE game_scores SET replicated = 1 WHERE id = ?", [(i,) for i in ids])
+
+    # --- control tables (feature flags, AI model assignments) ---
+
+    def get_table(self, name):
+        row = self._conn().execute("SELECT rows FROM control_tables WHERE name = ?", (name,)).fetchone()
+        return pd.DataFrame(json.loads(row[0])) if row else None
+
+    def put_table(self, name, df: pd.DataFrame, dirty=True):
+        rows = [{k: _clean(v) for k, v in r.items()} for r in df.to_dict('records')]
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO control_tables (name, rows, dirty, updated_at) VALUES (?, ?, ?, ?)",
+                (name, _dumps(rows), int(dirty), datetime.now().isoformat())
+            )
+
+    def dirty_tables(self):
+        """{name: updated_at} of tables changed since they were last replicated."""
+        return dict(self._conn().execute("SELECT name, updated_at FROM control_tables WHERE dirty = 1"))
+
+    def mark_table_clean(self, name, version):
+        """Marks a table replicated, unless it changed again since `version` was read."""
+        with self._conn() as conn:
+            conn.execute("UPDATE control_tables SET dirty = 0 WHERE name = ? AND updated_at = ?", (name, version))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_local_store() -> LocalStore:
+    """Returns the shared local store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocalStore(get_config().LOCAL_DB_PATH)
+        return _store
+
+
+# --- replication to Google Sheets ---
+
+_replicators = []
+
+
+def register_replicator(name: str, func):
+    """Registers a blocking function that mirrors one kind of local state to Sheets."""
+    _replicators.append((name, func))
+
+
+def replicate_all():
+    """Runs every registered replicator once; failures are retried next cycle."""
+    for name, func in list(_replicators):
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ Replication of {name} failed: {e}")
+
+
+async def run_replicator(interval=None):
+    """Background task mirroring local state to Google Sheets every SHEETS_REPLICATION_INTERVAL seconds."""
+    from data.google_async import run_blocking
+    interval = interval or get_config().SHEETS_REPLICATION_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        await run_blocking(replicate_all)
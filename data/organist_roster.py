@@ -1,22 +1,171 @@
 # data/organist_roster.py
 # Organist Roster Management - Fetch and display organist assignments
 
+import heapq
 import pandas as pd
-import io
+import threading
+import time
 from datetime import datetime, date, timedelta, timezone
-from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
-from data.drive import get_drive_service
+from googleapiclient.errors import HttpError
+from data.drive import get_sheets_service
+from data.drive_fetch import fetch_drive_file
 from config import get_config
+from data.google_async import API_RETRIES
 from logging_utils import setup_loggers
-from openpyxl import load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils import get_column_letter
 
 bot_logger, user_logger = setup_loggers()
 
 # Global cache for organist roster data
 _organist_roster_cache = None
+_organist_roster_source = None  # RosterWorkbook the cached roster was read from
 _reference_sheet_cache = None
 
+ROSTER_WORKBOOK_KEY = "roster:workbook"
+
+
+class RosterWorkbook:
+    """
+    One downloaded copy of the roster workbook with every sheet parsed in a
+    single pass. Writes go through the Sheets API and patch `sheets` in place.
+    """
+
+    def __init__(self, data):
+        self.sheets = pd.read_excel(data, sheet_name=None)
+
+    def sheet(self, name):
+        """A copy of one sheet as a DataFrame, or None if the workbook has no such sheet"""
+        df = self.sheets.get(name)
+        return df.copy() if df is not None else None
+
+
+_roster_workbook = None
+_roster_checked_at = 0.0
+_roster_lock = threading.Lock()
+
+def get_roster_workbook(max_age=None):
+    """
+    Returns the roster workbook, downloading it only when its Drive version
+    changed. The version is re-checked (one metadata call) once the cached
+    copy is older than `max_age` seconds (default ROSTER_REVALIDATE_INTERVAL);
+    /refresh passes max_age=0 to pick up edits made in the sheet right away.
+    Returns None if the workbook is not configured or cannot be loaded.
+    """
+    global _roster_workbook, _roster_checked_at
+    config = get_config()
+    roster_sheet_id = config.secrets.get("ORGANIST_ROSTER_SHEET_ID")
+    if not roster_sheet_id:
+        user_logger.error("ORGANIST_ROSTER_SHEET_ID not found in secrets")
+        return None
+
+    if max_age is None:
+        max_age = config.ROSTER_REVALIDATE_INTERVAL
+    with _roster_lock:
+        if _roster_workbook is not None and time.monotonic() - _roster_checked_at < max_age:
+            return _roster_workbook
+
+    try:
+        workbook, _ = fetch_drive_file(roster_sheet_id, RosterWorkbook, key=ROSTER_WORKBOOK_KEY)
+    except Exception as e:
+        user_logger.error(f"Roster workbook load error: {str(e)[:100]}")
+        return None
+    with _roster_lock:
+        _roster_workbook = workbook
+        _roster_checked_at = time.monotonic()
+    return workbook
+
+def _read_sheet_values(roster_sheet_id, sheet_name):
+    """
+    Current values of one roster sheet, header row first (one values.get).
+    Returns None if the sheet does not exist.
+    """
+    try:
+        response = get_sheets_service().spreadsheets().values().get(
+            spreadsheetId=roster_sheet_id,
+            range=f"'{sheet_name}'",
+            valueRenderOption='UNFORMATTED_VALUE'
+        ).execute(num_retries=API_RETRIES)
+    except HttpError as e:
+        if e.resp.status == 400:  # Unable to parse range: no such sheet
+            return None
+        raise
+    return response.get('values', [])
+
+def _write_cells(roster_sheet_id, data):
+    """
+    Writes [{'range': ..., 'values': ...}] in one values.batchUpdate request.
+    The next workbook read re-checks the Drive version, so sheets computed
+    from the edit by formulas are downloaded fresh.
+    """
+    global _roster_checked_at
+    get_sheets_service().spreadsheets().values().batchUpdate(
+        spreadsheetId=roster_sheet_id,
+        body={"valueInputOption": "RAW", "data": data}
+    ).execute(num_retries=API_RETRIES)
+    with _roster_lock:
+        _roster_checked_at = 0.0
+
+def _patch_cached_sheet(sheet_name, values):
+    """
+    Replaces one sheet of the cached workbook with the values just written,
+    so reads see the edit even if the next version check fails. Sheets
+    computed from it by formulas catch up at that check (see _write_cells).
+    """
+    global _organist_roster_cache
+    with _roster_lock:
+        workbook = _roster_workbook
+    if workbook is not None and values:
+        header = [h if h not in (None, '') else f"Unnamed: {i}" for i, h in enumerate(values[0])]
+        width = len(header)
+        rows = [[None if v == '' else v for v in (list(row) + [None] * width)[:width]] for row in values[1:]]
+        while rows and all(v is None for v in rows[-1]):
+            rows.pop()
+        workbook.sheets[sheet_name] = pd.DataFrame(rows, columns=header)
+    _organist_roster_cache = None  # 'Order of Songs' may be derived from the edited sheet
+
+def _write_songs_for_sunday(roster_sheet_id, songs, organists=None):
+    """
+    Puts `songs` in column A of "Songs for Sunday" and `organists` in column B
+    (by default the organists already there are kept), and blanks rows left
+    over from a longer list.
+    Returns an error message, or None on success.
+    """
+    values = _read_sheet_values(roster_sheet_id, "Songs for Sunday")
+    if values is None:
+        return "'Songs for Sunday' sheet not found in workbook"
+
+    header = values[0] if values else ['Songs', 'Organist']
+    current_data = values[1:]
+    user_logger.info(f"Current 'Songs for Sunday' has {len(current_data)} rows")
+
+    # Get existing organists (column B, index 1)
+    existing_organists = []
+    for row in current_data:
+        if len(row) > 1:
+            existing_organists.append(row[1] if row[1] is not None else '')
+        else:
+            existing_organists.append('')
+
+    # Match the number of organists to the number of songs
+    if organists is not None:
+        organists = list(organists)
+    elif len(existing_organists) < len(songs):
+        # Pad with empty strings
+        organists = existing_organists + [''] * (len(songs) - len(existing_organists))
+    else:
+        # Truncate to match songs
+        organists = existing_organists[:len(songs)]
+
+    # New rows, then blanks over any rows left from the previous list
+    rows = [[song, organist] for song, organist in zip(songs, organists)]
+    blanks = [['', '']] * max(0, len(current_data) - len(rows))
+    _write_cells(roster_sheet_id, [{
+        "range": f"'Songs for Sunday'!A2:B{len(rows) + len(blanks) + 1}",
+        "values": rows + blanks
+    }])
+    _patch_cached_sheet("Songs for Sunday", [header] + rows)
+    return None
+
 def load_organist_roster_data():
     """
     Load organist roster data from Google Sheet and cache it.
@@ -26,32 +175,18 @@ def load_organist_roster_data():
         DataFrame with columns: 'Song/ Responses', 'Name of The Organist'
         or None if failed
     """
-    global _organist_roster_cache
+    global _organist_roster_cache, _organist_roster_source
     
     try:
-        config = get_config()
-        roster_sheet_id = config.secrets.get("ORGANIST_ROSTER_SHEET_ID")
-        
-        if not roster_sheet_id:
-            user_logger.error("ORGANIST_ROSTER_SHEET_ID not found in secrets")
+        workbook = get_roster_workbook()
+        if workbook is None:
             return None
         
-        drive_service = get_drive_service()
-        
-        # Download the Excel file
-        request = drive_service.files().export_media(
-            fileId=roster_sheet_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
-        
-        # Read the Excel file - specifically the 'Order of Songs' sheet
-        df = pd.read_excel(file_data, sheet_name='Order of Songs')
+        # Read the 'Order of Songs' sheet
+        df = workbook.sheet('Order of Songs')
+        if df is None:
+            user_logger.error("'Order of Songs' sheet not found")
+            return None
         
         # Ensure required columns exist
         required_columns = ['Song/ Responses', 'Name of The Organist']
@@ -62,6 +197,7 @@ def load_organist_roster_data():
         
         # Cache the data
         _organist_roster_cache = df
+        _organist_roster_source = workbook
         user_logger.info("✅ Organist roster loaded and cached successfully")
         return df
     
@@ -71,7 +207,8 @@ def load_organist_roster_data():
 
 def get_organist_roster_data():
     """
-    Get organist roster data from cache, or load if not cached.
+    Get organist roster data from cache, or load if not cached or the
+    workbook has been replaced since (see get_roster_workbook).
     
     Returns:
         DataFrame with columns: 'Song/ Responses', 'Name of The Organist'
@@ -79,7 +216,8 @@ def get_organist_roster_data():
     """
     global _organist_roster_cache
     
-    if _organist_roster_cache is None:
+    workbook = get_roster_workbook()
+    if _organist_roster_cache is None or (workbook is not None and workbook is not _organist_roster_source):
         user_logger.info("Cache miss - loading organist roster from Google Drive")
         return load_organist_roster_data()
     
@@ -97,29 +235,15 @@ def load_reference_sheet():
     global _reference_sheet_cache
     
     try:
-        config = get_config()
-        roster_sheet_id = config.secrets.get("ORGANIST_ROSTER_SHEET_ID")
-        
-        if not roster_sheet_id:
-            user_logger.error("ORGANIST_ROSTER_SHEET_ID not found in secrets")
+        workbook = get_roster_workbook()
+        if workbook is None:
             return None
         
-        drive_service = get_drive_service()
-        
-        # Download the Excel file
-        request = drive_service.files().export_media(
-            fileId=roster_sheet_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
-        
-        # Read the Excel file - specifically the 'Reference Sheet'
-        df = pd.read_excel(file_data, sheet_name='Reference Sheet')
+        # Read the 'Reference Sheet'
+        df = workbook.sheet('Reference Sheet')
+        if df is None:
+            user_logger.error("'Reference Sheet' not found")
+            return None
         
         # Ensure 'Organists' column exists
         if 'Organists' not in df.columns:
@@ -144,10 +268,139 @@ def reload_organist_roster():
         bool: True if reload successful, False otherwise
     """
     global _reference_sheet_cache
+    if get_roster_workbook(max_age=0) is None:
+        return False
     roster_result = load_organist_roster_data()
     ref_result = load_reference_sheet()
     return roster_result is not None and ref_result is not None
 
+def _cell_text(value):
+    """Stripped text of a sheet cell, '' for blanks/NaN"""
+    return str(value).strip() if pd.notna(value) else ''
+
+
+class RosterModel:
+    """
+    Indexed view of one version of the roster ('Order of Songs' plus the
+    Reference Sheet). Built once when either sheet is reloaded; the /rooster
+    menu actions are then dictionary lookups over these indexes, and the
+    table lines they display are rendered here once.
+    """
+
+    def __init__(self, roster_df, reference_df):
+        self.roster_df = roster_df
+        self.reference_df = reference_df
+        self.organists = []       # Reference Sheet organists, sorted
+        self.types = []           # 'Type' values in sheet order
+        self.entries = []         # (song, organist or "Not Assigned", type) for rows with a song
+        self.by_organist = {}     # organist -> [song]
+        self.by_type = {}         # type -> [index into entries]
+        self.unassigned = []      # songs without an organist
+        self.summary = {'total_songs': 0, 'assigned_songs': 0, 'unassigned_songs': 0, 'total_organists': 0}
+        # Pre-rendered message lines
+        self.table_lines = []     # "1. song → organist"
+        self.unassigned_lines = []
+        self.organist_lines = {}  # organist -> ["1. song"]
+        self.type_lines = {}      # (type, include_organist) -> ["  1. song → organist"]
+
+        if reference_df is not None and 'Organists' in reference_df.columns:
+            self.organists = sorted({_cell_text(v) for v in reference_df['Organists']} - {''})
+        if roster_df is not None:
+            self._index_roster(roster_df)
+
+    def _index_roster(self, df):
+        has_type_col = 'Type' in df.columns
+        types = df['Type'] if has_type_col else [None] * len(df)
+        total_songs = assigned_songs = 0
+        organist_names = set()
+        seen_types = {}  # insertion-ordered set
+        for song, organist, raw_type in zip(df['Song/ Responses'], df['Name of The Organist'], types):
+            organist_name = _cell_text(organist)
+            type_name = _cell_text(raw_type)
+            if organist_name:
+                organist_names.add(organist_name)
+            if type_name:
+                seen_types[type_name] = None
+            if pd.isna(song):
+                continue
+            total_songs += 1
+            if organist_name:
+                assigned_songs += 1
+                self.by_organist.setdefault(organist_name, []).append(song)
+            else:
+                self.unassigned.append(song)
+            song_name = _cell_text(song)
+            if song_name:
+                self.by_type.setdefault(type_name or 'Unknown', []).append(len(self.entries))
+                self.entries.append((song_name, organist_name or "Not Assigned", type_name or 'Unknown'))
+
+        self.types = list(seen_types)
+        self.summary = {
+            'total_songs': total_songs,
+            'assigned_songs': assigned_songs,
+            'unassigned_songs': total_songs - assigned_songs,
+            'total_organists': len(organist_names)
+        }
+
+        self.table_lines = [f"{i}. {song} → {organist}" for i, (song, organist, _) in enumerate(self.entries, 1)]
+        self.unassigned_lines = [f"{i}. {song}" for i, song in enumerate(self.unassigned, 1)]
+        self.organist_lines = {
+            name: [f"{i}. {song}" for i, song in enumerate(songs, 1)]
+            for name, songs in self.by_organist.items()
+        }
+        for type_name, indexes in self.by_type.items():
+            rows = [self.entries[i] for i in indexes]
+            self.type_lines[(type_name, True)] = [f"  {i}. {song} → {organist}" for i, (song, organist, _) in enumerate(rows, 1)]
+            self.type_lines[(type_name, False)] = [f"  {i}. {song}" for i, (song, _, _) in enumerate(rows, 1)]
+
+    def filtered_entries(self, include_types=None):
+        """Entries of the given types (all when empty), in sheet order"""
+        if not include_types:
+            return list(self.entries)
+        indexes = heapq.merge(*(self.by_type.get(t, []) for t in set(include_types)))
+        return [self.entries[i] for i in indexes]
+
+    def render_types(self, types, include_organist=True):
+        """Message lines grouping the entries of `types` under a heading per type"""
+        lines = []
+        for type_name in types:
+            type_lines = self.type_lines.get((type_name, include_organist))
+            if type_lines:
+                lines.append(f"*{type_name}*")
+                lines.extend(type_lines)
+                lines.append("")
+        return lines
+
+
+_roster_model = None
+
+def get_roster_model():
+    """
+    Returns the RosterModel for the cached roster and Reference Sheet,
+    rebuilding it only when one of them has been reloaded.
+    """
+    global _roster_model
+    roster_df = get_organist_roster_data()
+    reference_df = _reference_sheet_cache
+    if reference_df is None:
+        user_logger.info("Cache miss - loading Reference Sheet from Google Drive")
+        reference_df = load_reference_sheet()
+
+    model = _roster_model
+    if model is None or model.roster_df is not roster_df or model.reference_df is not reference_df:
+        try:
+            model = RosterModel(roster_df, reference_df)
+        except Exception as e:
+            user_logger.error(f"Error indexing roster: {str(e)[:100]}")
+            return RosterModel(None, None)
+        if roster_df is not None and reference_df is not None:
+            _roster_model = model
+            user_logger.info(
+                f"Indexed roster: {len(model.entries)} entries, {len(model.organists)} organists, "
+                f"{len(model.types)} types"
+            )
+    return model
+
 def get_unique_organists():
     """
     Get list of unique organists from the Reference Sheet.
@@ -155,33 +408,7 @@ def get_unique_organists():
     Returns:
         list: List of unique organist names (excluding empty/NaN values)
     """
-    global _reference_sheet_cache
-    
-    # Load reference sheet if not cached
-    if _reference_sheet_cache is None:
-        user_logger.info("Cache miss - loading Reference Sheet from Google Drive")
-        df = load_reference_sheet()
-    else:
-        user_logger.info("Cache hit - using cached Reference Sheet")
-        df = _reference_sheet_cache
-    
-    if df is None:
-        return []
-    
-    try:
-        # Get organists from 'Organists' column, excluding NaN values
-        organists = df['Organists'].dropna().tolist()
-        # Remove empty strings and strip whitespace
-        organists = [str(org).strip() for org in organists if pd.notna(org) and str(org).strip()]
-        # Remove duplicates (if any) and sort alphabetically
-        organists = sorted(set(organists))
-        
-        user_logger.info(f"Found {len(organists)} unique organists from Reference Sheet")
-        return organists
-    
-    except Exception as e:
-        user_logger.error(f"Error getting organists from Reference Sheet: {str(e)[:100]}")
-        return []
+    return list(get_roster_model().organists)
 
 def get_songs_by_organist(organist_name: str):
     """
@@ -193,23 +420,7 @@ def get_songs_by_organist(organist_name: str):
     Returns:
         list: List of songs assigned to the organist
     """
-    df = get_organist_roster_data()
-    
-    if df is None:
-        return []
-    
-    try:
-        # Filter songs for the specific organist
-        organist_songs = df[df['Name of The Organist'] == organist_name]['Song/ Responses'].tolist()
-        # Remove NaN values
-        organist_songs = [song for song in organist_songs if pd.notna(song)]
-        
-        user_logger.info(f"Found {len(organist_songs)} songs for {organist_name}")
-        return organist_songs
-    
-    except Exception as e:
-        user_logger.error(f"Error getting songs: {str(e)[:50]}")
-        return []
+    return list(get_roster_model().by_organist.get(organist_name.strip(), []))
 
 def get_unassigned_songs():
     """
@@ -218,24 +429,7 @@ def get_unassigned_songs():
     Returns:
         list: List of unassigned songs
     """
-    df = get_organist_roster_data()
-    
-    if df is None:
-        return []
-    
-    try:
-        # Filter songs where organist is NaN or empty
-        unassigned = df[df['Name of The Organist'].isna() | (df['Name of The Organist'].str.strip() == '')]
-        unassigned_songs = unassigned['Song/ Responses'].tolist()
-        # Remove NaN values from songs
-        unassigned_songs = [song for song in unassigned_songs if pd.notna(song)]
-        
-        user_logger.info(f"Found {len(unassigned_songs)} unassigned songs")
-        return unassigned_songs
-    
-    except Exception as e:
-        user_logger.error(f"Error getting unassigned songs: {str(e)[:50]}")
-        return []
+    return list(get_roster_model().unassigned)
 
 def get_roster_summary():
     """
@@ -244,37 +438,7 @@ def get_roster_summary():
     Returns:
         dict: Summary statistics
     """
-    df = get_organist_roster_data()
-    
-    if df is None:
-        return {
-            'total_songs': 0,
-            'assigned_songs': 0,
-            'unassigned_songs': 0,
-            'total_organists': 0
-        }
-    
-    try:
-        total_songs = len(df[df['Song/ Responses'].notna()])
-        assigned_songs = len(df[df['Name of The Organist'].notna() & (df['Name of The Organist'].str.strip() != '')])
-        unassigned_songs = total_songs - assigned_songs
-        total_organists = len(df['Name of The Organist'].dropna().unique())
-        
-        return {
-            'total_songs': total_songs,
-            'assigned_songs': assigned_songs,
-            'unassigned_songs': unassigned_songs,
-            'total_organists': total_organists
-        }
-    
-    except Exception as e:
-        user_logger.error(f"Error getting summary: {str(e)[:50]}")
-        return {
-            'total_songs': 0,
-            'assigned_songs': 0,
-            'unassigned_songs': 0,
-            'total_organists': 0
-        }
+    return dict(get_roster_model().summary)
 
 def get_full_roster_table():
     """
@@ -283,62 +447,17 @@ def get_full_roster_table():
     Returns:
         list: List of tuples (song_name, organist_name) in original order
     """
-    df = get_organist_roster_data()
-    
-    if df is None:
-        return []
-    
-    try:
-        # Get all rows with song names (filter out empty songs)
-        roster_table = []
-        for _, row in df.iterrows():
-            song = row['Song/ Responses']
-            organist = row['Name of The Organist']
-            
-            # Only include rows with song names
-            if pd.notna(song) and str(song).strip():
-                # Handle empty organist
-                if pd.isna(organist) or str(organist).strip() == '':
-                    organist_name = "Not Assigned"
-                else:
-                    organist_name = str(organist).strip()
-                
-                roster_table.append((str(song).strip(), organist_name))
-        
-        user_logger.info(f"Retrieved full roster table ({len(roster_table)} entries)")
-        return roster_table
-    
-    except Exception as e:
-        user_logger.error(f"Error getting full table: {str(e)[:50]}")
-        return []
+    return [(song, organist) for song, organist, _ in get_roster_model().entries]
 
 def get_unique_types():
     """
     Get list of unique types from the 'Type' column in the Order of Songs sheet.
 
     Returns:
-        list: Sorted list of unique type strings (e.g. ['Doxology', 'Response', 'Song', 'Vestry'])
+        list: Unique type strings in sheet order (e.g. ['Song', 'Response', 'Vestry', 'Doxology'])
               Returns empty list if column doesn't exist.
     """
-    df = get_organist_roster_data()
-
-    if df is None:
-        return []
-
-    if 'Type' not in df.columns:
-        user_logger.warning("'Type' column not found in Order of Songs sheet")
-        return []
-
-    try:
-        types = df['Type'].dropna().tolist()
-        # Preserve original sheet order (not alphabetical) by using dict.fromkeys
-        seen = dict.fromkeys(str(t).strip() for t in types if str(t).strip())
-        types = list(seen)
-        user_logger.info(f"Found {len(types)} unique types (sheet order): {types}")
-        return types
-    except Exception as e:
-        user_logger.error(f"Error getting unique types: {str(e)[:100]}")
-        return []
+    return list(get_roster_model().types)
 
 
 def get_full_roster_table_filtered(include_types=None):
@@ -352,52 +471,7 @@ def get_full_roster_table_filtered(include_types=None):
     Returns:
         list: List of tuples (song_name, organist_name, type_name) in original sheet order.
     """
-    df = get_organist_roster_data()
-
-    if df is None:
-        return []
-
-    has_type_col = 'Type' in df.columns
-
-    try:
-        roster_table = []
-        for _, row in df.iterrows():
-            song = row['Song/ Responses']
-            organist = row['Name of The Organist']
-
-            # Skip rows without a song name
-            if not (pd.notna(song) and str(song).strip()):
-                continue
-
-            organist_name = (
-                str(organist).strip()
-                if pd.notna(organist) and str(organist).strip()
-                else "Not Assigned"
-            )
-
-            # Determine type
-            if has_type_col:
-                raw_type = row['Type']
-                type_name = str(raw_type).strip() if pd.notna(raw_type) and str(raw_type).strip() else 'Unknown'
-            else:
-                type_name = 'Unknown'
-
-            # Apply filter
-            if include_types and type_name not in include_types:
-                continue
-
-            roster_table.append((str(song).strip(), organist_name, type_name))
-
-        user_logger.info(
-            f"Retrieved filtered roster table ({len(roster_table)} entries, "
-            f"filter={include_types})"
-        )
-        return roster_table
-
-    except Exception as e:
-        user_logger.error(f"Error getting filtered roster table: {str(e)[:50]}")
-        return []
-
+    return get_roster_model().filtered_entries(include_types)
 
 def parse_date_input(date_str):
     """
@@ -647,80 +721,10 @@ def update_songs_for_sunday():
         if not songs:
             return False, f"No songs found for {next_date.strftime('%d/%m/%Y')}", next_date
         
-        drive_service = get_drive_service()
-        
-        # Download the current Excel file
-        request = drive_service.files().export_media(
-            fileId=roster_sheet_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
-        
-        # Load workbook with openpyxl to preserve formulas in other sheets
-        wb = load_workbook(file_data)
-        
-        # Check if "Songs for Sunday" sheet exists
-        if "Songs for Sunday" not in wb.sheetnames:
-            available_sheets = ', '.join(wb.sheetnames)
-            return False, f"'Songs for Sunday' sheet not found. Available: {available_sheets}", next_date
-        
-        user_logger.info(f"Available sheets: {wb.sheetnames}")
-        
-        # Get the target sheet
-        ws = wb["Songs for Sunday"]
-        
-        # Read current data to preserve organists
-        current_data = []
-        for row in ws.iter_rows(min_row=2, values_only=True):  # Skip header
-            current_data.append(row)
-        
-        user_logger.info(f"Current 'Songs for Sunday' has {len(current_data)} rows")
-        
-        # Get existing organists (column B, index 1)
-        existing_organists = []
-        for row in current_data:
-            if len(row) > 1:
-                existing_organists.append(row[1] if row[1] is not None else '')
-            else:
-                existing_organists.append('')
-        
-        # Match the number of organists to the number of songs
-        if len(existing_organists) < len(songs):
-            # Pad with empty strings
-            organists = existing_organists + [''] * (len(songs) - len(existing_organists))
-        else:
-            # Truncate to match songs
-            organists = existing_organists[:len(songs)]
-        
-        # Clear the sheet data (keep header row)
-        ws.delete_rows(2, ws.max_row)
-        
-        # Write new data
-        for i, (song, organist) in enumerate(zip(songs, organists), start=2):
-            ws.cell(row=i, column=1, value=song)  # Column A: Songs
-            ws.cell(row=i, column=2, value=organist)  # Column B: Organist
-        
-        # Save to BytesIO
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        # Upload the file back
-        media = MediaIoBaseUpload(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            resumable=True
-        )
-        
-        drive_service.files().update(
-            fileId=roster_sheet_id,
-            media_body=media
-        ).execute()
+        # Only the "Songs for Sunday" cells change: one read and one batchUpdate
+        error = _write_songs_for_sunday(roster_sheet_id, songs)
+        if error:
+            return False, error, next_date
         
         user_logger.info(f"✅ Updated Songs for Sunday with {len(songs)} songs for {next_date.strftime('%d/%m/%Y')}")
         return True, f"✅ Updated {len(songs)} songs for {next_date.strftime('%d/%m/%Y')}", next_date
@@ -755,80 +759,10 @@ def update_date_songs(target_date):
         if not songs:
             return False, f"No songs found for {target_date.strftime('%d/%m/%Y')} or any later date", target_date
         
-        drive_service = get_drive_service()
-        
-        # Download the current Excel file
-        request = drive_service.files().export_media(
-            fileId=roster_sheet_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
-        
-        # Load workbook with openpyxl to preserve formulas in other sheets
-        wb = load_workbook(file_data)
-        
-        # Check if "Songs for Sunday" sheet exists
-        if "Songs for Sunday" not in wb.sheetnames:
-            available_sheets = ', '.join(wb.sheetnames)
-            return False, f"'Songs for Sunday' sheet not found. Available: {available_sheets}", target_date
-        
-        user_logger.info(f"Available sheets: {wb.sheetnames}")
-        
-        # Get the target sheet
-        ws = wb["Songs for Sunday"]
-        
-        # Read current data to preserve organists
-        current_data = []
-        for row in ws.iter_rows(min_row=2, values_only=True):  # Skip header
-            current_data.append(row)
-        
-        user_logger.info(f"Current 'Songs for Sunday' has {len(current_data)} rows")
-        
-        # Get existing organists (column B, index 1)
-        existing_organists = []
-        for row in current_data:
-            if len(row) > 1:
-                existing_organists.append(row[1] if row[1] is not None else '')
-            else:
-                existing_organists.append('')
-        
-        # Match the number of organists to the number of songs
-        if len(existing_organists) < len(songs):
-            # Pad with empty strings
-            organists = existing_organists + [''] * (len(songs) - len(existing_organists))
-        else:
-            # Truncate to match songs
-            organists = existing_organists[:len(songs)]
-        
-        # Clear the sheet data (keep header row)
-        ws.delete_rows(2, ws.max_row)
-        
-        # Write new data
-        for i, (song, organist) in enumerate(zip(songs, organists), start=2):
-            ws.cell(row=i, column=1, value=song)  # Column A: Songs
-            ws.cell(row=i, column=2, value=organist)  # Column B: Organist
-        
-        # Save to BytesIO
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        # Upload the file back
-        media = MediaIoBaseUpload(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            resumable=True
-        )
-        
-        drive_service.files().update(
-            fileId=roster_sheet_id,
-            media_body=media
-        ).execute()
+        # Only the "Songs for Sunday" cells change: one read and one batchUpdate
+        error = _write_songs_for_sunday(roster_sheet_id, songs)
+        if error:
+            return False, error, target_date
         
         user_logger.info(f"✅ Updated Songs for Sunday with {len(songs)} songs for {target_date.strftime('%d/%m/%Y')}")
         return True, f"✅ Updated {len(songs)} songs for {target_date.strftime('%d/%m/%Y')}", target_date
@@ -838,6 +772,40 @@ def update_date_songs(target_date):
         return False, f"Error: {str(e)[:100]}", None
 
 
+def apply_roster_assignments(assignments):
+    """
+    Writes a complete roster for the next service to the "Songs for Sunday"
+    sheet (songs and organists) in one batched update.
+    
+    Args:
+        assignments: list of (song, organist) tuples, in service order
+        
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    try:
+        config = get_config()
+        roster_sheet_id = config.secrets.get("ORGANIST_ROSTER_SHEET_ID")
+        
+        if not roster_sheet_id:
+            return False, "ORGANIST_ROSTER_SHEET_ID not found in secrets"
+        
+        if not assignments:
+            return False, "No assignments to apply"
+        
+        songs = [song for song, _ in assignments]
+        organists = [organist or '' for _, organist in assignments]
+        error = _write_songs_for_sunday(roster_sheet_id, songs, organists)
+        if error:
+            return False, error
+        
+        user_logger.info(f"✅ Applied roster with {len(assignments)} assignments to 'Songs for Sunday'")
+        return True, f"✅ Assigned {len(assignments)} songs"
+    
+    except Exception as e:
+        user_logger.error(f"Error applying roster: {str(e)[:100]}")
+        return False, f"Error: {str(e)[:100]}"
+
 def assign_song_to_organist(song_code: str, organist_name: str):
     """
     Assign a specific song to an organist in the 'Songs for Sunday' sheet.
@@ -856,39 +824,22 @@ def assign_song_to_organist(song_code: str, organist_name: str):
         if not roster_sheet_id:
             return False, "ORGANIST_ROSTER_SHEET_ID not found in secrets"
         
-        drive_service = get_drive_service()
-        
-        # Download current file
-        request = drive_service.files().export_media(
-            fileId=roster_sheet_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
-        
-        # Load workbook using openpyxl to preserve formulas
-        wb = load_workbook(file_data)
-        
-        # Check if 'Songs for Sunday' sheet exists
-        if 'Songs for Sunday' not in wb.sheetnames:
+        # Current contents of the sheet (the row of a song can move between edits)
+        values = _read_sheet_values(roster_sheet_id, 'Songs for Sunday')
+        if values is None:
             return False, "'Songs for Sunday' sheet not found in workbook"
         
-        ws = wb['Songs for Sunday']
-        
         # Find the header row (should be row 1)
         # Expected columns: 'Songs' (column A) and 'Organist' (column B)
         song_col = None
         organist_col = None
         
         # Check first row for headers
-        for col_idx, cell in enumerate(ws[1], 1):
-            if cell.value and 'songs' in str(cell.value).lower():
+        header = values[0] if values else []
+        for col_idx, value in enumerate(header, 1):
+            if value and 'songs' in str(value).lower():
                 song_col = col_idx
-            elif cell.value and 'organist' in str(cell.value).lower():
+            elif value and 'organist' in str(value).lower():
                 organist_col = col_idx
         
         if not song_col or not organist_col:
@@ -898,8 +849,8 @@ def assign_song_to_organist(song_code: str, organist_name: str):
         song_found = False
         song_row = None
         
-        for row_idx in range(2, ws.max_row + 1):
-            cell_value = ws.cell(row=row_idx, column=song_col).value
+        for row_idx, row in enumerate(values[1:], 2):
+            cell_value = row[song_col - 1] if len(row) >= song_col else None
             if cell_value:
                 # Extract song code from "H-44 - Song Name" format
                 song_str = str(cell_value).strip()
@@ -917,29 +868,15 @@ def assign_song_to_organist(song_code: str, organist_name: str):
             user_logger.warning(f"Song '{song_code}' not found in 'Songs for Sunday' sheet")
             return False, f"Song '{song_code}' not found in 'Songs for Sunday' sheet"
         
-        # Update the organist assignment in the 'Organist' column
-        ws.cell(row=song_row, column=organist_col, value=organist_name)
-        
-        # Save workbook to BytesIO
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        # Upload back to Google Drive
-        media = MediaIoBaseUpload(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            resumable=True
-        )
-        
-        drive_service.files().update(
-            fileId=roster_sheet_id,
-            media_body=media
-        ).execute()
-        
-        # Invalidate cache to force reload
-        global _organist_roster_cache
-        _organist_roster_cache = None
+        # Update the organist assignment in the 'Organist' column (one cell)
+        _write_cells(roster_sheet_id, [{
+            "range": f"'Songs for Sunday'!{get_column_letter(organist_col)}{song_row}",
+            "values": [[organist_name]]
+        }])
+        row = values[song_row - 1]
+        values[song_row - 1] = list(row) + [''] * max(0, organist_col - len(row))
+        values[song_row - 1][organist_col - 1] = organist_name
+        _patch_cached_sheet('Songs for Sunday', values)
         
         user_logger.info(f"✅ Assigned {song_code} to {organist_name} in 'Songs for Sunday' sheet")
         return True, f"✅ {song_code} assigned to {organist_name}"
@@ -963,25 +900,15 @@ def get_songs_for_assignment():
         if not roster_sheet_id:
             return False, [], "ORGANIST_ROSTER_SHEET_ID not found in secrets"
         
-        drive_service = get_drive_service()
-        
-        # Download the file
-        request = drive_service.files().export_media(
-            fileId=roster_sheet_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
+        # Cached roster workbook (re-checked against Drive every few seconds)
+        workbook = get_roster_workbook()
+        if workbook is None:
+            return False, [], "Could not load the roster workbook"
         
         # Read the 'Songs for Sunday' sheet
-        try:
-            df = pd.read_excel(file_data, sheet_name='Songs for Sunday')
-        except Exception as sheet_error:
-            return False, [], f"'Songs for Sunday' sheet not found: {str(sheet_error)[:50]}"
+        df = workbook.sheet('Songs for Sunday')
+        if df is None:
+            return False, [], "'Songs for Sunday' sheet not found in workbook"
         
         # Get songs from the 'Songs' column
         if 'Songs' not in df.columns:
@@ -1040,25 +967,15 @@ def get_special_songs():
         if not roster_sheet_id:
             return False, [], "ORGANIST_ROSTER_SHEET_ID not found in secrets"
         
-        drive_service = get_drive_service()
-        
-        # Download the Excel file
-        request = drive_service.files().export_media(
-            fileId=roster_sheet_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
+        # Cached roster workbook (re-checked against Drive every few seconds)
+        workbook = get_roster_workbook()
+        if workbook is None:
+            return False, [], "Could not load the roster workbook"
         
         # Read the 'Special Songs' sheet
-        try:
-            df = pd.read_excel(file_data, sheet_name='Special Songs')
-        except Exception as sheet_error:
-            user_logger.warning(f"'Special Songs' sheet not found: {str(sheet_error)[:50]}")
+        df = workbook.sheet('Special Songs')
+        if df is None:
+            user_logger.warning("'Special Songs' sheet not found")
             return False, [], "'Special Songs' sheet not found in workbook"
         
         # Validate columns
@@ -1187,40 +1104,22 @@ def update_special_song(song_type: str, song_code: str, song_name: str, organist
         if not roster_sheet_id:
             return False, "ORGANIST_ROSTER_SHEET_ID not found in secrets"
         
-        drive_service = get_drive_service()
-        
-        # Download current file
-        request = drive_service.files().export_media(
-            fileId=roster_sheet_id,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        file_data.seek(0)
-        
-        # Load workbook with openpyxl
-        wb = load_workbook(file_data)
-        
-        # Check if 'Special Songs' sheet exists
-        if 'Special Songs' not in wb.sheetnames:
-            # Create the sheet
-            ws = wb.create_sheet('Special Songs')
-            # Add headers
-            ws.cell(row=1, column=1, value='Type')
-            ws.cell(row=1, column=2, value='Song Code')
-            ws.cell(row=1, column=3, value='Song Name')
-            ws.cell(row=1, column=4, value='Organist')
+        values = _read_sheet_values(roster_sheet_id, 'Special Songs')
+        if values is None:
+            # Create the sheet; its header is written with the song below
+            get_sheets_service().spreadsheets().batchUpdate(
+                spreadsheetId=roster_sheet_id,
+                body={"requests": [{"addSheet": {"properties": {"title": 'Special Songs'}}}]}
+            ).execute(num_retries=API_RETRIES)
             user_logger.info("Created new 'Special Songs' sheet")
-        else:
-            ws = wb['Special Songs']
+            values = []
+        if not values:
+            values = [['Type', 'Song Code', 'Song Name', 'Organist']]
         
         # Find if this type already exists
         type_row = None
-        for row_idx in range(2, ws.max_row + 1):
-            cell_type = ws.cell(row=row_idx, column=1).value
+        for row_idx, existing in enumerate(values[1:], 2):
+            cell_type = existing[0] if existing else None
             if cell_type and str(cell_type).strip().lower() == song_type.lower():
                 type_row = row_idx
                 break
@@ -1230,31 +1129,21 @@ def update_special_song(song_type: str, song_code: str, song_name: str, organist
             row = type_row
             user_logger.info(f"Updating existing {song_type} at row {row}")
         else:
-            row = ws.max_row + 1
+            row = len(values) + 1
             user_logger.info(f"Adding new {song_type} at row {row}")
         
-        # Write data
-        ws.cell(row=row, column=1, value=song_type)
-        ws.cell(row=row, column=2, value=song_code if song_code else 'nil')
-        ws.cell(row=row, column=3, value=song_name)
-        ws.cell(row=row, column=4, value=organist if organist else '')
-        
-        # Save to BytesIO
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
-        # Upload back to Google Drive
-        media = MediaIoBaseUpload(
-            output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            resumable=True
-        )
-        
-        drive_service.files().update(
-            fileId=roster_sheet_id,
-            media_body=media
-        ).execute()
+        # Write data (plus the header if the sheet was empty)
+        new_row = [song_type, song_code if song_code else 'nil', song_name, organist if organist else '']
+        data = [{"range": f"'Special Songs'!A{row}:D{row}", "values": [new_row]}]
+        if len(values) == 1:
+            data.insert(0, {"range": "'Special Songs'!A1:D1", "values": [values[0]]})
+        _write_cells(roster_sheet_id, data)
+        
+        if row <= len(values):
+            values[row - 1] = new_row
+        else:
+            values.append(new_row)
+        _patch_cached_sheet('Special Songs', values)
         
         user_logger.info(f"✅ Updated {song_type}: {song_code or song_name} → {organist or 'Unassigned'}")
         return True, f"✅ {song_type} updated successfully"
@@ -0,0 +1,137 @@
+# data/roster_optimizer.py
+# Proposes a balanced organist roster for the next service (min-cost assignment)
+
+import re
+import time
+from collections import Counter, defaultdict
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from data.organist_roster import get_roster_model, get_next_available_date, get_songs_for_date
+from logging_utils import setup_loggers
+
+bot_logger, user_logger = setup_loggers()
+
+# Cost of giving a song to an organist; lower is better
+LOAD_WEIGHT = 1.0      # other songs on the organist's roster, relative to the average organist
+SERVICE_WEIGHT = 1.0   # each further song for the same organist in this service
+SKILL_WEIGHT = 0.5     # organist rarely plays this category of song (H/L/C, or the roster 'Type')
+
+_SONG_CODE = re.compile(r'^([A-Z]+)-\s*(\d+)$')
+
+
+def _song_code(song):
+    """'H-44 - Song Name' -> 'H-44'"""
+    return str(song).split(' - ')[0].strip().upper()
+
+
+def _song_category(code, type_name=None):
+    """Hymn/Lyric/Convention prefix of a song code, else its roster type"""
+    match = _SONG_CODE.match(code)
+    return match.group(1) if match else (type_name or 'Unknown')
+
+
+def _song_types(model):
+    """Roster 'Type' of each song code in 'Order of Songs'"""
+    return {_song_code(song): type_name for song, _, type_name in model.entries}
+
+
+def _organist_profiles(model, exclude=()):
+    """
+    Load and per-category counts for each organist in the Reference Sheet,
+    from the assignments in 'Order of Songs'. That sheet is the current
+    roster, not a history: rows for the song codes in `exclude` (the service
+    being planned) are left out, so the proposal is not weighed against the
+    assignments it replaces.
+    """
+    load = {name: 0 for name in model.organists}
+    categories = defaultdict(Counter)
+    for song, organist, type_name in model.entries:
+        code = _song_code(song)
+        if organist not in load or code in exclude:
+            continue
+        load[organist] += 1
+        categories[organist][_song_category(code, type_name)] += 1
+    return load, categories
+
+
+def solve_assignment(songs, organists, load, categories, song_types=None):
+    """
+    Assigns every song to an organist at minimum total cost.
+    `song_types` maps song codes to their roster 'Type', the category used
+    for songs without an H/L/C code (as in _organist_profiles).
+
+    Each organist gets one column per song they could take this service;
+    the k-th song costs SERVICE_WEIGHT * k more than the first, so the
+    cheapest assignment spreads songs evenly before favouring skills.
+    Returns (organist index per song, total cost).
+    """
+    n, m = len(songs), len(organists)
+    slots = min(n, -(-n // m) + 1)  # one spare slot each keeps room for skill trade-offs
+    mean_load = max(1.0, sum(load.values()) / m)
+
+    song_cost = np.empty((n, m))
+    song_types = song_types or {}
+    song_categories = [_song_category(code, song_types.get(code)) for code in map(_song_code, songs)]
+    for j, name in enumerate(organists):
+        songs_held = load.get(name, 0)
+        base = LOAD_WEIGHT * songs_held / mean_load
+        for i, category in enumerate(song_categories):
+            share = categories[name][category] / songs_held if songs_held else 0.0
+            song_cost[i, j] = base + SKILL_WEIGHT * (1.0 - share)
+
+    cost = np.repeat(song_cost, slots, axis=1) + np.tile(SERVICE_WEIGHT * np.arange(slots), m)
+    rows, cols = linear_sum_assignment(cost)
+    choice = [0] * n
+    for i, col in zip(rows, cols):
+        choice[i] = col // slots
+    return choice, float(cost[rows, cols].sum())
+
+
+def propose_roster(target_date=None):
+    """
+    Proposes organists for every song of the next service (or of the first
+    service on/after `target_date`), balancing workloads against the rest of
+    the current roster (see _organist_profiles).
+
+    Returns:
+        tuple: (success: bool, proposal: dict or None, message: str)
+        proposal: {'date', 'assignments': [(song, organist)], 'service_load': {organist: songs},
+                   'roster_load': {organist: other songs}, 'cost', 'solve_ms'}
+    """
+    try:
+        service_date = target_date or get_next_available_date()
+        if service_date is None:
+            return False, None, "No upcoming date with songs found in database"
+
+        songs = get_songs_for_date(service_date)
+        if not songs:
+            return False, None, f"No songs found for {service_date.strftime('%d/%m/%Y')}"
+
+        model = get_roster_model()
+        organists = model.organists
+        if not organists:
+            return False, None, "No organists found in the Reference Sheet"
+
+        started = time.perf_counter()
+        load, categories = _organist_profiles(model, exclude={_song_code(song) for song in songs})
+        choice, total_cost = solve_assignment(songs, organists, load, categories, _song_types(model))
+        solve_ms = (time.perf_counter() - started) * 1000
+
+        assignments = [(song, organists[j]) for song, j in zip(songs, choice)]
+        service_load = Counter(organist for _, organist in assignments)
+        user_logger.info(
+            f"Proposed roster for {service_date.strftime('%d/%m/%Y')}: {len(songs)} songs, "
+            f"{len(service_load)} organists, {solve_ms:.1f} ms"
+        )
+        return True, {
+            'date': service_date,
+            'assignments': assignments,
+            'service_load': dict(service_load),
+            'roster_load': load,
+            'cost': total_cost,
+            'solve_ms': solve_ms
+        }, f"Proposed {len(assignments)} assignments"
+
+    except Exception as e:
+        user_logger.error(f"Error proposing roster: {str(e)[:100]}")
+        return False, None, f"Error: {str(e)[:100]}"
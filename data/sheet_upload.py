@@ -4,6 +4,7 @@
 from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 from data.drive import get_drive_service
 from config import get_config
+from data.google_async import API_RETRIES
 from logging_utils import setup_loggers
 import os
 import io
@@ -66,7 +67,7 @@ def upload_file_to_drive(file_path: str, original_filename: str, uploader_name:
             body=file_metadata,
             media_body=media,
             fields='id, name, webViewLink'
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         file_id = file.get('id')
         file_link = file.get('webViewLink')
@@ -116,7 +117,7 @@ def list_uploaded_files(limit: int = 10) -> str:
             pageSize=limit,
             orderBy="createdTime desc",
             fields="files(id, name, createdTime, description, webViewLink)"
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         files = results.get('files', [])
         
@@ -184,7 +185,7 @@ def search_uploaded_file_by_lyric(lyric_number: int) -> tuple[bool, str, str]:
             q=f"'{folder_id}' in parents and trashed=false and mimeType='application/pdf'",
             pageSize=100,
             fields="files(id, name, createdTime)"
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         files = results.get('files', [])
         
@@ -230,7 +231,7 @@ def download_uploaded_file(file_id: str, filename: str, temp_dir: str) -> str:
         
         done = False
         while not done:
-            status, done = downloader.next_chunk()
+            status, done = downloader.next_chunk(num_retries=API_RETRIES)
         
         # Write to temp file
         file_path = os.path.join(temp_dir, filename)
@@ -270,7 +271,7 @@ def get_all_uploaded_lyric_numbers() -> set:
             q=f"'{folder_id}' in parents and trashed=false and mimeType='application/pdf'",
             pageSize=1000,  # Get up to 1000 files
             fields="files(id, name)"
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         files = results.get('files', [])
         lyric_numbers = set()
@@ -314,7 +315,7 @@ def get_all_notation_database_lyric_numbers() -> set:
             q=f"'{folder_id}' in parents and trashed=false and mimeType='application/pdf'",
             pageSize=1000,
             fields="files(id, name)"
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         files = results.get('files', [])
         lyric_numbers = set()
@@ -384,7 +385,7 @@ def search_uploaded_file_by_text(search_text: str) -> list[tuple[str, str]]:
             q=f"'{folder_id}' in parents and trashed=false and mimeType='application/pdf'",
             pageSize=100,
             fields="files(id, name, createdTime)"
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         files = results.get('files', [])
         matching_files = []
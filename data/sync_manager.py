@@ -3,16 +3,105 @@
 
 import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Awaitable, Callable, Dict, Optional
 from datetime import datetime
 from data.hybrid_detector import HybridChangeDetector
 from data.datasets import load_datasets, get_all_data
+from data.sync_metrics import get_sync_metrics
 from data.drive import load_game_scores
+from data.feature_control import refresh_control_tables
+from data.google_async import run_blocking
 from config import get_config
 
 logger = logging.getLogger(__name__)
 
 
+class ReloadScheduler:
+    """
+    Turns bursts of change events into as few reloads as possible without
+    missing any edit.
+
+    Events for the same key are merged until the key has been quiet for
+    `quiet_window` seconds (or `max_delay` seconds after the first event,
+    so constant edits cannot postpone a reload forever). An event that
+    arrives while that key is reloading schedules exactly one trailing
+    reload after it finishes. At most `max_concurrent` reloads run at once.
+    """
+
+    def __init__(self, quiet_window: float = 2.0, max_delay: float = 30.0, max_concurrent: int = 1):
+        self.quiet_window = quiet_window
+        self.max_delay = max_delay
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._actions: Dict[str, Callable[[str], Awaitable]] = {}
+        self._first_event: Dict[str, float] = {}   # key -> monotonic time of first unhandled event
+        self._timers: Dict[str, asyncio.Task] = {}  # key -> pending quiet-window wait
+        self._waiting = set()    # keys queued for a reload slot
+        self._running = set()    # keys reloading now
+        self._rerun = set()      # keys that changed again while reloading
+        self.stats = {'events': 0, 'coalesced': 0, 'reloads': 0, 'failed': 0}
+
+    def submit(self, key: str, action: Callable[[str], Awaitable]):
+        """Record a change for `key`; `action(key)` runs once things are quiet"""
+        self.stats['events'] += 1
+        self._actions[key] = action
+        self._first_event.setdefault(key, time.monotonic())
+        if key in self._running:
+            if key in self._rerun:
+                self.stats['coalesced'] += 1
+            self._rerun.add(key)
+        elif key in self._waiting:
+            self.stats['coalesced'] += 1  # the queued reload will pick this change up
+        else:
+            if key in self._timers:
+                self.stats['coalesced'] += 1
+            self._schedule(key)
+
+    def _schedule(self, key: str):
+        """(Re)start the quiet-window timer for `key`"""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        deadline = self._first_event.setdefault(key, time.monotonic()) + self.max_delay
+        delay = min(self.quiet_window, max(0.0, deadline - time.monotonic()))
+        self._timers[key] = asyncio.get_event_loop().create_task(self._wait_and_run(key, delay))
+
+    async def _wait_and_run(self, key: str, delay: float):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        self._timers.pop(key, None)
+        self._waiting.add(key)
+        async with self._semaphore:
+            self._waiting.discard(key)
+            self._running.add(key)
+            self._first_event.pop(key, None)
+            try:
+                await self._actions[key](key)
+                self.stats['reloads'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.error(f"❌ Reload for {key} failed: {e}")
+            finally:
+                self._running.discard(key)
+        if key in self._rerun:
+            self._rerun.discard(key)
+            self._schedule(key)  # trailing reload for changes made while we were reloading
+
+    def queue_depth(self) -> int:
+        """Reloads scheduled but not yet running"""
+        return len(self._timers) + len(self._waiting) + len(self._rerun)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            'queue_depth': self.queue_depth(),
+            'pending': sorted(set(self._timers) | self._waiting | self._rerun),
+            'running': sorted(self._running),
+        }
+
+
 class DatasetSyncManager:
     """
     Manages automatic synchronization of datasets from Google Drive.
@@ -35,7 +124,13 @@ class DatasetSyncManager:
         self.config = get_config()
         self.last_sync_times = {}
         self.sync_in_progress = {}
+        self._detected_at = {}  # file name -> epoch time of the first change not yet reloaded
         self.auto_start = auto_start
+        self.reload_scheduler = ReloadScheduler(
+            quiet_window=self.config.SYNC_QUIET_WINDOW,
+            max_delay=self.config.SYNC_MAX_DELAY,
+            max_concurrent=self.config.SYNC_MAX_CONCURRENT_RELOADS
+        )
         
     def _register_all_files(self):
         """Register all configured Google Drive files for monitoring"""
@@ -72,6 +167,14 @@ class DatasetSyncManager:
                 "Game Score Database"
             )
             
+        # Feature flags / AI model assignments (refreshed in place, no dataset reload)
+        if self.config.DISABLED_DB:
+            self.detector.register_file(
+                self.config.DISABLED_DB,
+                self._on_control_tables_changed,
+                "Feature Control Database"
+            )
+
         # User Database
         if self.config.U_DATABASE:
             self.detector.register_file(
@@ -83,24 +186,28 @@ class DatasetSyncManager:
         logger.info("✅ Registered all files for change detection")
 
     async def _reload_datasets_safe(self, file_name: str):
-        """Safely reload datasets with error handling and debouncing"""
-        
-        # Prevent multiple simultaneous reloads
-        if self.sync_in_progress.get(file_name, False):
-            logger.info(f"⏭️ Skipping reload for {file_name} - sync already in progress")
-            return
-            
+        """Schedule a dataset reload; bursts of changes are merged into one reload"""
+        self._detected_at.setdefault(file_name, time.time())
+        self.reload_scheduler.submit(file_name, self._reload_datasets)
+
+    @staticmethod
+    def _measured_load():
+        """load_datasets() on a worker thread, recording its wall/CPU time, bytes and API calls"""
+        with get_sync_metrics().measure_reload():
+            load_datasets()
+
+    async def _reload_datasets(self, file_name: str):
+        """Reload the datasets (run by the reload scheduler)"""
+        detected_at = self._detected_at.pop(file_name, None)  # changes after this point get a new reload
         try:
             self.sync_in_progress[file_name] = True
             logger.info(f"🔄 Reloading datasets due to {file_name} change...")
             
-            # Small delay to allow file to fully save on Drive
-            await asyncio.sleep(2)
-            
             # Reload the datasets (synchronous call in async context)
-            await asyncio.get_event_loop().run_in_executor(None, load_datasets)
+            await asyncio.get_event_loop().run_in_executor(None, self._measured_load)
             
             self.last_sync_times[file_name] = datetime.now()
+            get_sync_metrics().record_reload_done(file_name, detected_at)
             logger.info(f"✅ Successfully reloaded datasets for {file_name}")
             
         except Exception as e:
@@ -133,6 +240,22 @@ class DatasetSyncManager:
         logger.info("📊 User Database changed, triggering sync...")
         await self._reload_datasets_safe("User Database")
 
+    async def _on_control_tables_changed(self, file_id: str):
+        """Callback when the feature control / AI model workbook changes"""
+        logger.info("📊 Feature Control Database changed, scheduling flag refresh...")
+        self.reload_scheduler.submit("Feature Control Database", self._refresh_control_tables)
+
+    async def _refresh_control_tables(self, file_name: str):
+        """Refresh the feature control / AI model tables (run by the reload scheduler)"""
+        try:
+            self.sync_in_progress[file_name] = True
+            await run_blocking(refresh_control_tables)
+            self.last_sync_times[file_name] = datetime.now()
+        except Exception as e:
+            logger.error(f"❌ Error refreshing feature control tables: {e}")
+        finally:
+            self.sync_in_progress[file_name] = False
+
     async def start(self):
         """Start the sync manager"""
         logger.info("🚀 Starting Dataset Sync Manager...")
@@ -156,7 +279,9 @@ class DatasetSyncManager:
             'active_webhooks': detector_status['active_webhooks'],
             'polling_interval': detector_status['polling_interval'],
             'webhook_files': detector_status.get('webhook_files', []),
-            'last_webhook_events': detector_status.get('last_webhook_events', {})
+            'last_webhook_events': detector_status.get('last_webhook_events', {}),
+            'reload_queue': self.reload_scheduler.get_stats(),
+            'metrics': get_sync_metrics().summary()
         }
         return status
 
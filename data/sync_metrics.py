@@ -0,0 +1,213 @@
+# data/sync_metrics.py
+# Sync pipeline metrics: detection latency, reload cost and staleness
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from config import get_config
+
+HISTOGRAMS = {
+    'sync_detection_latency_seconds': "Drive modifiedTime to change detection",
+    'sync_reload_latency_seconds': "Change detection to reload completion",
+    'sync_reload_wall_seconds': "Wall time of one dataset reload",
+    'sync_reload_cpu_seconds': "CPU time of one dataset reload",
+    'sync_reload_bytes': "Bytes downloaded by one dataset reload",
+}
+COUNTERS = {
+    'sync_api_calls_total': "Google API requests made by the sync pipeline",
+    'sync_bytes_downloaded_total': "Bytes downloaded from Drive",
+    'sync_downloads_skipped_total': "Downloads skipped because the file was unchanged",
+}
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def parse_drive_time(value: Optional[str]) -> Optional[float]:
+    """RFC 3339 timestamp from the Drive API (e.g. modifiedTime) -> epoch seconds"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class RollingHistogram:
+    """
+    Observations from the last `window` seconds (at most `max_samples`),
+    plus all-time count and sum.
+    """
+
+    def __init__(self, window: float, max_samples: int = 1000):
+        self.window = window
+        self._samples = deque(maxlen=max_samples)  # (time, value)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self._samples.append((time.time(), value))
+        self.count += 1
+        self.total += value
+
+    def values(self):
+        cutoff = time.time() - self.window
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        return sorted(v for _, v in self._samples)
+
+    def snapshot(self) -> dict:
+        values = self.values()
+        if not values:
+            return {'samples': 0}
+        snap = {'samples': len(values), 'min': values[0], 'max': values[-1],
+                'mean': sum(values) / len(values)}
+        for q in QUANTILES:
+            snap[f'p{int(q * 100)}'] = values[min(len(values) - 1, int(q * len(values)))]
+        return snap
+
+
+class SyncMetrics:
+    """
+    Thread-safe registry for the sync pipeline. Series are keyed by
+    (metric name, label tuple). Work done inside `measure_reload()` on a
+    thread is also attributed to that reload (bytes, API calls).
+    """
+
+    def __init__(self, window: float = 86400):
+        self.window = window
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, tuple], RollingHistogram] = {}
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._last_reload: Dict[str, float] = {}
+        self._local = threading.local()
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = RollingHistogram(self.window)
+            hist.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    # --- pipeline events ---
+
+    def record_detection(self, modified_time: Optional[str], source: str):
+        """A detector saw a change; `modified_time` is the file's Drive modifiedTime"""
+        modified = parse_drive_time(modified_time)
+        if modified is not None:
+            self.observe('sync_detection_latency_seconds', max(0.0, time.time() - modified), source=source)
+
+    def record_api_call(self, kind: str, count: int = 1):
+        self.inc('sync_api_calls_total', count, kind=kind)
+        reload = getattr(self._local, 'reload', None)
+        if reload is not None:
+            reload['api_calls'] += count
+
+    def record_download(self, nbytes: int):
+        self.inc('sync_bytes_downloaded_total', nbytes)
+        reload = getattr(self._local, 'reload', None)
+        if reload is not None:
+            reload['bytes'] += nbytes
+
+    @contextmanager
+    def measure_reload(self):
+        """Times a reload running on the current thread and totals what it downloaded"""
+        reload = self._local.reload = {'bytes': 0, 'api_calls': 0}
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield reload
+        finally:
+            self._local.reload = None
+            reload['wall'] = time.perf_counter() - wall
+            reload['cpu'] = time.thread_time() - cpu
+            self.observe('sync_reload_wall_seconds', reload['wall'])
+            self.observe('sync_reload_cpu_seconds', reload['cpu'])
+            self.observe('sync_reload_bytes', reload['bytes'])
+
+    def record_reload_done(self, file_name: str, detected_at: Optional[float]):
+        """A reload triggered by `file_name` finished; `detected_at` is the epoch time of its first change"""
+        now = time.time()
+        with self._lock:
+            self._last_reload[file_name] = now
+        if detected_at is not None:
+            self.observe('sync_reload_latency_seconds', now - detected_at)
+
+    # --- reporting ---
+
+    def staleness(self) -> Dict[str, float]:
+        """Seconds since each file's data was last reloaded"""
+        now = time.time()
+        with self._lock:
+            return {name: now - ts for name, ts in self._last_reload.items()}
+
+    def summary(self) -> dict:
+        with self._lock:
+            histograms = {}
+            for (name, labels), hist in self._histograms.items():
+                label = ','.join(v for _, v in labels)
+                histograms[f"{name}[{label}]" if label else name] = hist.snapshot()
+            counters = {}
+            for (name, labels), value in self._counters.items():
+                label = ','.join(v for _, v in labels)
+                counters[f"{name}[{label}]" if label else name] = value
+        return {'histograms': histograms, 'counters': counters, 'staleness': self.staleness()}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition; histograms are exported as summaries over the rolling window"""
+        lines = []
+        with self._lock:
+            histograms = sorted((key, hist.values(), hist.total, hist.count) for key, hist in self._histograms.items())
+            counters = sorted(self._counters.items())
+        for metric, help_text in HISTOGRAMS.items():
+            series = [(labels, values, total, count) for (name, labels), values, total, count in histograms if name == metric]
+            if not series:
+                continue
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+            for labels, values, total, count in series:
+                for q in QUANTILES:
+                    value = values[min(len(values) - 1, int(q * len(values)))] if values else float('nan')
+                    lines.append(f"{metric}{_labels(labels + (('quantile', str(q)),))} {value}")
+                lines.append(f"{metric}_sum{_labels(labels)} {total}")
+                lines.append(f"{metric}_count{_labels(labels)} {count}")
+        for metric, help_text in COUNTERS.items():
+            series = [(labels, value) for (name, labels), value in counters if name == metric]
+            if not series:
+                continue
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f"{metric}{_labels(labels)} {value}" for labels, value in series]
+        staleness = self.staleness()
+        if staleness:
+            lines += ["# HELP sync_staleness_seconds Seconds since the data for a file was last reloaded",
+                      "# TYPE sync_staleness_seconds gauge"]
+            lines += [f"sync_staleness_seconds{_labels((('file', name),))} {age}" for name, age in sorted(staleness.items())]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+_metrics: Optional[SyncMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_sync_metrics() -> SyncMetrics:
+    """Returns the shared sync metrics registry."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = SyncMetrics(window=get_config().SYNC_METRICS_WINDOW)
+        return _metrics
@@ -0,0 +1,84 @@
+# data/telegram_file_cache.py
+# Persistent content key -> Telegram file_id map, so repeat sends skip download and upload
+
+import json
+import os
+import tempfile
+import threading
+from config import get_config
+
+
+def drive_content_key(file_id, checksum):
+    """Content key for a Drive file version, or None when the checksum is unknown."""
+    if not file_id or not checksum:
+        return None
+    return f"drive:{file_id}:{checksum}"
+
+
+class TelegramFileIdCache:
+    """
+    Maps our content keys (Drive file id + checksum, downloader track id,
+    Telegram file_unique_id of an input) to the Telegram file_id returned
+    after the first send, optionally with send arguments (e.g. caption) to
+    reuse on later sends. Persisted as JSON and rewritten atomically.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r") as f:
+                self._file_ids = json.load(f)
+        except (OSError, ValueError):
+            self._file_ids = {}
+
+    def get(self, key):
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key):
+        """(file_id, stored send arguments) for `key`, or (None, {})"""
+        if not key:
+            return None, {}
+        with self._lock:
+            entry = self._file_ids.get(key)
+        if isinstance(entry, dict):
+            return entry.get('file_id'), dict(entry.get('meta') or {})
+        return entry, {}
+
+    def set(self, key, file_id, meta=None):
+        if not key or not file_id:
+            return
+        entry = {'file_id': file_id, 'meta': meta} if meta else file_id
+        with self._lock:
+            if self._file_ids.get(key) == entry:
+                return
+            self._file_ids[key] = entry
+            self._save_locked()
+
+    def discard(self, key):
+        with self._lock:
+            if self._file_ids.pop(key, None) is not None:
+                self._save_locked()
+
+    def _save_locked(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self._file_ids, f)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._file_ids)
+
+
+_telegram_file_cache = None
+
+
+def get_telegram_file_cache() -> TelegramFileIdCache:
+    """Returns the shared Telegram file_id cache."""
+    global _telegram_file_cache
+    if _telegram_file_cache is None:
+        _telegram_file_cache = TelegramFileIdCache(get_config().TELEGRAM_FILE_CACHE_PATH)
+    return _telegram_file_cache
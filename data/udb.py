@@ -2,74 +2,356 @@
 # User database management functions for Google Drive/Sheets
 
 import pandas as pd
-import io
 import os
+import threading
+import time
 from datetime import datetime
-from googleapiclient.http import MediaIoBaseDownload
 from googleapiclient.errors import HttpError
-from data.drive import get_drive_service
+from data.drive import get_sheets_service
+from data.drive_fetch import fetch_drive_file, forget
 from config import get_config
+from data.google_async import API_RETRIES
+from data.local_store import get_local_store, register_replicator
 from datetime import datetime
 from logging_utils import setup_loggers
 
 bot_logger, user_logger = setup_loggers()
 
-# Global user database variable
-user_db = None
+# Global user store (see UserStore); get_user_database() gives a DataFrame view
+user_store = None
 pending_saves = False  # Flag to track if there are unsaved changes
 
-def load_user_database():
+# Dirty-cell tracking: saves write only the cells changed since the last save.
+# A full rewrite happens only when the sheet layout no longer matches the store.
+_dirty_cells = {}          # user_id -> set of changed column names
+_synced_columns = None     # column order currently in the sheet; None forces a full rewrite
+_synced_rows = 0           # number of user rows currently in the sheet
+_dirty_lock = threading.Lock()
+_last_save_time = 0.0
+_sheet_version = None      # Drive fingerprint of the sheet last loaded into the store
+_sheet_unread = False      # True while the store was never seeded from the sheet; blocks full rewrites
+
+# The local SQLite store (data/local_store.py) is the source of truth; every
+# change is written there first and replicated to the sheet in the background.
+
+USER_COLUMNS = (
+    'user_id', 'username', 'name', 'last_seen', 'is_authorized', 'is_admin',
+    'status', 'notes', 'bible_language', 'game_language', 'search_results_limit',
+    'download_preference', 'download_quality', 'theme_preference', 'show_tunes_in_date'
+)
+
+
+class UserRecord:
+    """
+    One user row. Standard columns are slots; columns added later (e.g. upload
+    preferences) live in `extra`. Supports record['col'], record.get('col')
+    and 'col' in record like the pandas Series it replaces.
+    """
+    __slots__ = USER_COLUMNS + ('extra',)
+
+    def __init__(self, values: dict):
+        self.extra = {}
+        for column in USER_COLUMNS:
+            setattr(self, column, None)
+        for column, value in values.items():
+            self[column] = value
+
+    def __getitem__(self, column):
+        if column in USER_COLUMNS:
+            return getattr(self, column)
+        return self.extra[column]
+
+    def __setitem__(self, column, value):
+        if column in USER_COLUMNS:
+            setattr(self, column, value)
+        else:
+            self.extra[column] = value
+
+    def __contains__(self, column):
+        return column in USER_COLUMNS or column in self.extra
+
+    def get(self, column, default=None):
+        return self[column] if column in self else default
+
+    def values_for(self, columns):
+        return [self.get(column) for column in columns]
+
+
+class UserStore:
     """
-    Downloads and loads the user database from Google Drive.
-    Updates the global user_db variable.
+    In-memory user database indexed by user_id. Lookups and updates are
+    dict operations; rows keep their sheet order so cell positions are O(1).
+    The DataFrame view is built lazily for exports and reports and cached
+    until the next change.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._lock = threading.RLock()
+        self.columns = list(df.columns)
+        self._records = {}
+        self._order = []
+        self._positions = {}
+        self._frame = None
+        self.dropped_rows = 0  # blank, non-numeric or duplicate user_id rows skipped on load
+        for row in df.values.tolist():
+            record = UserRecord(dict(zip(self.columns, row)))
+            user_id = _normalize_user_id(record.user_id)
+            if user_id is None or user_id in self._records:
+                self.dropped_rows += 1
+                continue
+            record.user_id = user_id
+            self._append_locked(record)
+
+    def _append_locked(self, record):
+        self._positions[record.user_id] = len(self._order)
+        self._order.append(record.user_id)
+        self._records[record.user_id] = record
+
+    def __len__(self):
+        return len(self._order)
+
+    @property
+    def empty(self):
+        return not self._order
+
+    def get(self, user_id):
+        return self._records.get(_normalize_user_id(user_id))
+
+    def position(self, user_id):
+        """Row index of a user (0 = first user row), or None."""
+        return self._positions.get(_normalize_user_id(user_id))
+
+    def add(self, values: dict):
+        with self._lock:
+            for column in values:
+                if column not in self.columns:
+                    self.columns.append(column)
+            record = UserRecord(values)
+            record.user_id = _normalize_user_id(record.user_id)
+            self._append_locked(record)
+            self._frame = None
+            return record
+
+    def set(self, user_id, column, value):
+        with self._lock:
+            record = self._records[_normalize_user_id(user_id)]
+            if column not in self.columns:
+                self.columns.append(column)  # schema change
+            record[column] = value
+            self._frame = None
+
+    def records(self):
+        return [self._records[user_id] for user_id in self._order]
+
+    def rows(self, start=0):
+        """Snapshot of (columns, row values) from row `start` onwards."""
+        with self._lock:
+            columns = list(self.columns)
+            return columns, [self._records[user_id].values_for(columns) for user_id in self._order[start:]]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        with self._lock:
+            if self._frame is None:
+                columns, rows = self.rows()
+                self._frame = pd.DataFrame(rows, columns=columns)
+            return self._frame
+
+
+def _normalize_user_id(user_id):
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+def _read_user_sheet(data):
+    """Parser for fetch_drive_file; None if the workbook cannot be read"""
+    try:
+        return pd.read_excel(data)
+    except Exception as e:
+        print(f"❌ Error reading Excel file: {e}")
+        return None
+
+def _load_users_from_local_store(local):
+    """Builds the user store from SQLite; returns its DataFrame, or None on failure"""
+    global user_store
+    try:
+        columns, rows, dirty = local.load_users()
+        user_store = UserStore(ensure_user_database_structure(pd.DataFrame(rows, columns=columns)))
+        _restore_sync_state(dirty)
+        print(f"✅ Loaded {len(user_store)} users from local store")
+        return user_store.to_dataframe()
+    except Exception as e:
+        print(f"❌ Error loading users from local store, falling back to sheet: {e}")
+        return None
+
+def load_user_database(from_sheet=False):
+    """
+    Loads the user database into the global user store.
+    The local store is the source of truth; the sheet is only read on first
+    run or when from_sheet=True (e.g. /refresh after editing the sheet by hand).
+    If the sheet cannot be read the local store is kept as it is.
     Returns the loaded DataFrame.
     """
-    global user_db
+    global user_store, _sheet_version, _sheet_unread
     config = get_config()
-    drive_service = get_drive_service()
-    
+    local = get_local_store()
+
+    if not from_sheet and local.has_users():
+        df = _load_users_from_local_store(local)
+        if df is not None:
+            return df
+
     try:
         if not config.U_DATABASE:
             print("❌ U_DATABASE file ID not found in secrets")
-            return create_empty_user_database()
-        
-        # print(f"Loading user database from Google Drive (ID: {config.U_DATABASE})")
+            return _load_without_sheet(local)
         
-        # Download the Excel file from Google Drive
-        request = drive_service.files().export_media(
-            fileId=config.U_DATABASE,
-            mimeType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
+        # Download the Excel file from Google Drive (skipped if it has not changed)
+        df, version = fetch_drive_file(config.U_DATABASE, _read_user_sheet, key="user_database")
+        if df is None:
+            forget("user_database")  # don't keep the failed parse for this version
+            print("❌ Could not read the user database sheet")
+            return _load_without_sheet(local)
+        if version is not None and version == _sheet_version and local.has_users():
+            # Sheet unchanged since it was last loaded: everything in it is already in the local store
+            df = _load_users_from_local_store(local)
+            if df is not None:
+                print("✅ User database sheet unchanged, kept local store")
+                return df
         
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        
-        file_data.seek(0)
-        
-        # Read the Excel file
-        try:
-            user_db = pd.read_excel(file_data)
-            print(f"✅ Successfully loaded user database with {len(user_db)} records")
-        except Exception as e:
-            print(f"❌ Error reading Excel file: {e}")
-            user_db = create_empty_user_database()
+        df = df.copy()
+        sheet_columns = list(df.columns)
+        print(f"✅ Successfully loaded user database with {len(df)} records")
         
         # Ensure required columns exist
-        user_db = ensure_user_database_structure(user_db)
+        df = ensure_user_database_structure(df)
+        user_store = UserStore(df)
+        _reset_sync_state(sheet_columns)
+        _seed_local_store()
+        _sheet_version = version
+        _sheet_unread = False
         
-        return user_db
+        return user_store.to_dataframe()
         
     except HttpError as e:
         print(f"❌ Google Drive API error loading user database: {e}")
-        user_db = create_empty_user_database()
-        return user_db
+        return _load_without_sheet(local)
     except Exception as e:
         print(f"❌ Error loading user database: {e}")
-        user_db = create_empty_user_database()
-        return user_db
+        return _load_without_sheet(local)
+
+def _load_without_sheet(local):
+    """
+    Fallback when the sheet could not be read: keeps the users in the local
+    store, or starts an empty store. Neither the local store nor the sheet
+    sync state is touched, and the sheet is not rewritten until it has been
+    read successfully (see save_user_database).
+    """
+    global user_store, _sheet_unread
+    if local.has_users():
+        df = _load_users_from_local_store(local)
+        if df is not None:
+            return df
+    if user_store is None:
+        user_store = UserStore(ensure_user_database_structure(create_empty_user_database()))
+        _sheet_unread = True
+    return user_store.to_dataframe()
+
+def _reset_sync_state(sheet_columns):
+    """
+    Records the sheet layout just loaded. If ensure_user_database_structure
+    added columns, the next save rewrites the whole sheet.
+    So does skipping any sheet row on load: store positions would no longer
+    be sheet rows, and cell writes would land on the wrong users.
+    """
+    global _synced_columns, _synced_rows
+    if user_store.dropped_rows:
+        print(f"⚠️ Skipped {user_store.dropped_rows} user sheet rows without a valid, unique user_id; the sheet will be rewritten")
+        mark_pending_save()
+    with _dirty_lock:
+        _dirty_cells.clear()
+        if sheet_columns is not None and sheet_columns == user_store.columns and not user_store.dropped_rows:
+            _synced_columns = list(sheet_columns)
+            _synced_rows = len(user_store)
+        else:
+            _synced_columns = None
+            _synced_rows = 0
+        _persist_sync_state_locked()
+
+def _restore_sync_state(dirty):
+    """
+    Restores the sheet layout and unreplicated cells recorded in the local store.
+    No recorded layout means the store was never seeded from the sheet.
+    """
+    global _synced_columns, _synced_rows, _sheet_unread
+    synced = get_local_store().get_meta('user_sheet_sync') or {}
+    _sheet_unread = not synced
+    with _dirty_lock:
+        _dirty_cells.clear()
+        for user_id, columns in dirty.items():
+            _dirty_cells[int(user_id)] = set(columns)
+        _synced_columns = synced.get('columns')
+        _synced_rows = synced.get('rows', 0)
+    if _dirty_cells or _synced_columns != user_store.columns:
+        mark_pending_save()
+
+def _persist_sync_state_locked():
+    try:
+        get_local_store().set_meta('user_sheet_sync', {'columns': _synced_columns, 'rows': _synced_rows})
+    except Exception as e:
+        print(f"⚠️ Could not record user sheet sync state: {e}")
+
+def _seed_local_store():
+    """
+    Replaces the local users with the rows just read from the sheet. Cells
+    changed locally but not yet replicated win over the sheet and stay dirty.
+    """
+    local = get_local_store()
+    pending = {}
+    if local.has_users():
+        _, rows, dirty = local.load_users()
+        local_rows = {row.get('user_id'): row for row in rows}
+        for user_id, columns in dirty.items():
+            if user_id in local_rows:
+                pending[user_id] = {column: local_rows[user_id].get(column) for column in columns}
+
+    for user_id, values in pending.items():
+        if user_store.get(user_id) is None:
+            user_store.add(dict(values, user_id=user_id))
+        else:
+            for column, value in values.items():
+                user_store.set(user_id, column, value)
+
+    columns, rows = user_store.rows()
+    local.replace_users(columns, [dict(zip(columns, row)) for row in rows])
+    with _dirty_lock:
+        for user_id, values in pending.items():
+            _dirty_cells.setdefault(user_id, set()).update(values)
+    if pending:
+        mark_pending_save()
+        print(f"📒 Kept {len(pending)} users with unreplicated local changes")
+
+def _mark_dirty(user_id, columns=None):
+    """
+    Writes a changed user through to the local store and records which
+    cells the replicator still has to copy to the sheet.
+    columns=None marks the whole row (new users).
+    """
+    user_id = int(user_id)
+    record = user_store.get(user_id)
+    changed = list(columns) if columns is not None else list(user_store.columns)
+    with _dirty_lock:
+        _dirty_cells.setdefault(user_id, set()).update(changed)
+        if record is not None:
+            try:
+                get_local_store().write_user(
+                    user_id, user_store.position(user_id),
+                    {column: record.get(column) for column in user_store.columns},
+                    user_store.columns, changed
+                )
+            except Exception as e:
+                print(f"⚠️ Could not store user change locally: {e}")
+    mark_pending_save()
 
 def create_empty_user_database():
     """
@@ -163,26 +445,27 @@ def ensure_user_database_structure(df):
     
     return df
 
+def get_user_store():
+    """
+    Returns the indexed user store. Loads it if not already loaded.
+    """
+    if user_store is None:
+        load_user_database()
+    return user_store
+
 def get_user_database():
     """
-    Returns the current user database. Loads it if not already loaded.
+    Returns the current user database as a DataFrame (for exports and reports).
+    Loads it if not already loaded.
     """
-    global user_db
-    if user_db is None:
-        user_db = load_user_database()
-    return user_db
+    return get_user_store().to_dataframe()
 
 def get_user_by_id(user_id):
     """
     Retrieves a user record by Telegram user ID.
-    Returns the user record as a pandas Series, or None if not found.
+    Returns the UserRecord, or None if not found.
     """
-    db = get_user_database()
-    user_records = db[db['user_id'] == user_id]
-    
-    if not user_records.empty:
-        return user_records.iloc[0]
-    return None
+    return get_user_store().get(user_id)
 
 def user_exists(user_id):
     """
@@ -230,12 +513,9 @@ def set_user_authorization(user_id, authorized=True):
         bool: True if successful, False otherwise
     """
     try:
-        db = get_user_database()
-
-        # Check if user exists
-        user_idx = db[db['user_id'] == user_id].index
+        store = get_user_store()
 
-        if user_idx.empty:
+        if store.get(user_id) is None:
             # User doesn't exist, create new record
             new_user = {
                 'user_id': user_id,
@@ -256,17 +536,15 @@ def set_user_authorization(user_id, authorized=True):
             }
 
             # Add new user to database
-            global user_db 
-            user_db = pd.concat([db, pd.DataFrame([new_user])], ignore_index=True)
+            store.add(new_user)
+            _mark_dirty(user_id)
         else:
             # User exists, update authorization
-            idx = user_idx[0]
-            user_db.loc[idx, 'is_authorized'] = authorized
-            user_db.loc[idx, 'notes'] = f"Authorization {'granted' if authorized else 'revoked'} by admin"
-            user_db.loc[idx, 'last_seen'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            store.set(user_id, 'is_authorized', authorized)
+            store.set(user_id, 'notes', f"Authorization {'granted' if authorized else 'revoked'} by admin")
+            store.set(user_id, 'last_seen', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            _mark_dirty(user_id, ('is_authorized', 'notes', 'last_seen'))
 
-        # Mark for saving
-        mark_pending_save()
         return True
 
     except Exception as e:
@@ -307,29 +585,23 @@ def add_or_update_user(user_data):
     Returns:
         bool: True if successful, False otherwise
     """
-    global user_db
-    db = get_user_database()
+    store = get_user_store()
     
     try:
         user_id = user_data['user_id']
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # Check if user exists
-        existing_user_idx = db[db['user_id'] == user_id].index
+        existing_user = store.get(user_id)
         
-        if not existing_user_idx.empty:
-            # Update existing user
-            idx = existing_user_idx[0]
-            
+        if existing_user is not None:
             # Update fields that might change
-            db.at[idx, 'username'] = user_data.get('username', db.at[idx, 'username'])
-            db.at[idx, 'name'] = user_data.get('name', db.at[idx, 'name'])
-            db.at[idx, 'last_seen'] = current_time
+            store.set(user_id, 'username', user_data.get('username', existing_user.username))
+            store.set(user_id, 'name', user_data.get('name', existing_user.name))
+            store.set(user_id, 'last_seen', current_time)
+            _mark_dirty(user_id, ('username', 'name', 'last_seen'))
 
             # print(f"✅ Updated {user_id} in database")
-
-            # Mark as needing save but don't save immediately for performance
-            mark_pending_save()
             
         else:
             # Add new user
@@ -354,12 +626,10 @@ def add_or_update_user(user_data):
             }
             
             # Add new row to database
-            user_db = pd.concat([db, pd.DataFrame([new_user])], ignore_index=True)
+            store.add(new_user)
+            _mark_dirty(user_id)
             # print(f"✅ Added {user_id} to database")
 
-        # Mark as needing save but don't save immediately for performance
-        mark_pending_save()
-
         return True
         
     except Exception as e:
@@ -426,7 +696,7 @@ def track_user_fast(telegram_user):
     try:
         user_id = telegram_user.id
 
-        # Quick check if user exists without loading full database
+        # O(1) lookup in the indexed user store
         existing_user = get_user_by_id(user_id)
         is_new_user = existing_user is None
 
@@ -436,16 +706,10 @@ def track_user_fast(telegram_user):
             return (True, success)
         else:
             # For existing users, just update last_seen quickly
-            global user_db
-            db = get_user_database()
             current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            # Update last_seen for existing user
-            user_idx = db[db['user_id'] == user_id].index
-            if not user_idx.empty:
-                db.at[user_idx[0], 'last_seen'] = current_time
-                mark_pending_save()
-                # print(f"✅ Updated {user_id}")
+            get_user_store().set(user_id, 'last_seen', current_time)
+            _mark_dirty(user_id, ('last_seen',))
+            # print(f"✅ Updated {user_id}")
 
             return (False, True)
 
@@ -453,19 +717,36 @@ def track_user_fast(telegram_user):
         print(f"❌ Error in fast user tracking: {e}")
         return (False, False)
 
-def save_if_pending():
+def save_if_pending(force=False):
     """
     Save database only if there are pending changes.
     This can be called periodically or manually.
+
+    Saves are coalesced: within USER_DB_SAVE_WINDOW seconds of the previous
+    save, changes stay pending (already safe in the local store) for the
+    background replicator.
+    force=True saves right away.
     """
     global pending_saves
-    if pending_saves:
-        success = save_user_database()
-        if success:
-            pending_saves = False
-            print("✅ Pending database changes saved")
-        return success
-    return True  # No changes to save
+    if not pending_saves:
+        return True  # No changes to save
+    if not force and time.time() - _last_save_time < get_config().USER_DB_SAVE_WINDOW:
+        return True
+    pending_saves = False
+    success = save_user_database()
+    if success:
+        print("✅ Pending database changes saved")
+    else:
+        pending_saves = True
+    return success
+
+def flush_user_database():
+    """Replicates any pending user changes to the sheet now."""
+    if user_store is not None:
+        return save_if_pending(force=True)
+    return True
+
+register_replicator("user database", flush_user_database)
 
 def get_user_summary(user_id):
     """
@@ -517,7 +798,7 @@ def get_user_preference(user_id, preference_name, default_value=None):
         if user is None:
             return default_value
 
-        if preference_name in user.index:
+        if preference_name in user:
             value = user[preference_name]
             # Handle NaN values
             if pd.isna(value):
@@ -543,28 +824,19 @@ def update_user_preference(user_id, preference_name, preference_value):
         bool: True if successful, False otherwise
     """
     try:
-        global user_db
-        db = get_user_database()
+        store = get_user_store()
 
         # Find user
-        user_idx = db[db['user_id'] == user_id].index
-        if user_idx.empty:
+        if store.get(user_id) is None:
             # User doesn't exist, create them first
             user_data = {'user_id': user_id}
             if not add_or_update_user(user_data):
                 return False
-            # Reload database and find user again
-            db = get_user_database()
-            user_idx = db[db['user_id'] == user_id].index
-
-        if not user_idx.empty:
-            idx = user_idx[0]
-            db.at[idx, preference_name] = preference_value
-            mark_pending_save()
-            print(f"✅ Updated {preference_name} = {preference_value} for user {user_id}")
-            return True
 
-        return False
+        store.set(user_id, preference_name, preference_value)
+        _mark_dirty(user_id, (preference_name,))
+        print(f"✅ Updated {preference_name} = {preference_value} for user {user_id}")
+        return True
 
     except Exception as e:
         print(f"❌ Error updating user preference {preference_name} for {user_id}: {e}")
@@ -732,30 +1004,15 @@ def update_google_sheet_structure():
     This will add missing columns to your existing sheet.
     """
     try:
-        from googleapiclient.discovery import build
-        from google.oauth2 import service_account
-        import tempfile
-        import json
-        
         config = get_config()
-        
-        # Setup Google Sheets API
-        tmp_dir = tempfile.gettempdir()
-        key_path = os.path.join(tmp_dir, "service_account.json")
-        with open(key_path, "w") as f:
-            json.dump(config.service_account_data, f)
-        
-        creds = service_account.Credentials.from_service_account_file(
-            key_path, scopes=["https://www.googleapis.com/auth/spreadsheets"]
-        )
-        sheets_service = build("sheets", "v4", credentials=creds)
+        sheets_service = get_sheets_service()
         
         # Get current sheet data
         sheet = sheets_service.spreadsheets()
         result = sheet.values().get(
             spreadsheetId=config.U_DATABASE,
             range="A1:Z1"  # Get first row to check current headers
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         current_headers = result.get('values', [[]])[0] if result.get('values') else []
         # print(f"Current headers: {current_headers}")
@@ -785,7 +1042,7 @@ def update_google_sheet_structure():
             range="A1:Z1",
             valueInputOption="RAW",
             body={"values": [new_headers]}
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
         
         # print(f"✅ Successfully added columns: {missing_headers}")
         # print(f"✅ Sheet now has headers: {new_headers}")
@@ -796,49 +1053,139 @@ def update_google_sheet_structure():
         print(f"❌ Error updating Google Sheet structure: {e}")
         return False
 
+def _cell_value(cell):
+    """Formats a value the way the sheet stores it"""
+    if pd.isna(cell):
+        return ''
+    if isinstance(cell, bool):
+        return str(cell).upper()  # TRUE/FALSE for Google Sheets
+    return str(cell)
+
+def _column_letter(position):
+    """0 -> A, 25 -> Z, 26 -> AA"""
+    letters = ''
+    position += 1
+    while position:
+        position, remainder = divmod(position - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
 def save_user_database():
     """
-    Saves the current user database back to Google Drive/Sheets.
-    Updates the Google Sheet with the current database content.
+    Replicates the user database from the local store to Google Sheets.
+    Writes only the changed cells; the whole sheet is rewritten only when
+    its columns no longer match the database (or it was never written).
     """
-    try:
-        from googleapiclient.discovery import build
-        from google.oauth2 import service_account
-        import tempfile
-        import json
-
-        global user_db
-        if user_db is None or user_db.empty:
-            print("❌ No u_database to save")
+    global _last_save_time
+    if user_store is None or user_store.empty:
+        print("❌ No u_database to save")
+        return False
+
+    with _dirty_lock:
+        full_rewrite = _synced_columns != user_store.columns
+        if full_rewrite and _sheet_unread:
+            # Rewriting would replace users we never read with only the local ones
+            print("⚠️ User database sheet has not been read yet, not rewriting it")
             return False
+        dirty = dict(_dirty_cells)
+        _dirty_cells.clear()
+
+    success = _rewrite_user_sheet() if full_rewrite else _write_dirty_cells(dirty)
+    if success:
+        with _dirty_lock:
+            _persist_sync_state_locked()
+            # Cells marked again while saving hold newer values: keep them dirty
+            replicated = {}
+            for user_id, columns in dirty.items():
+                columns = set(columns) - _dirty_cells.get(user_id, set())
+                if columns:
+                    replicated[user_id] = columns
+            try:
+                get_local_store().clear_user_dirty(replicated)
+            except Exception as e:
+                print(f"⚠️ Could not clear replicated user changes: {e}")
+    else:
+        # Keep the changes for the next attempt
+        with _dirty_lock:
+            for user_id, columns in dirty.items():
+                _dirty_cells.setdefault(user_id, set()).update(columns)
+    _last_save_time = time.time()
+    return success
+
+def _write_dirty_cells(dirty):
+    """
+    Writes changed cells with values.batchUpdate (at most USER_DB_BATCH_SIZE
+    ranges per request) and appends rows for users added since the last save.
+    """
+    global _synced_rows
+    if not dirty:
+        return True
+    try:
+        config = get_config()
+        store = user_store
+        column_index = {column: i for i, column in enumerate(store.columns)}
+
+        data = []
+        new_rows = []
+        for user_id, changed in dirty.items():
+            position = store.position(user_id)
+            if position is None:
+                continue
+            if position >= _synced_rows:
+                new_rows.append(position)
+                continue
+            record = store.get(user_id)
+            sheet_row = position + 2  # header is row 1
+            for column in changed:
+                if column not in column_index:
+                    continue
+                data.append({
+                    "range": f"{_column_letter(column_index[column])}{sheet_row}",
+                    "values": [[_cell_value(record.get(column))]]
+                })
+
+        sheet = get_sheets_service().spreadsheets()
+        batch_size = config.USER_DB_BATCH_SIZE
+        for start in range(0, len(data), batch_size):
+            sheet.values().batchUpdate(
+                spreadsheetId=config.U_DATABASE,
+                body={"valueInputOption": "RAW", "data": data[start:start + batch_size]}
+            ).execute(num_retries=API_RETRIES)
+
+        if new_rows:
+            # New users always sit after the synced rows, in store order
+            first = _synced_rows
+            _, rows = store.rows(first)
+            rows = [[_cell_value(v) for v in row] for row in rows]
+            sheet.values().update(
+                spreadsheetId=config.U_DATABASE,
+                range=f"A{first + 2}",
+                valueInputOption="RAW",
+                body={"values": rows}
+            ).execute(num_retries=API_RETRIES)
+            _synced_rows = first + len(rows)
+
+        print(f"✅ Saved {len(data)} changed cells and {len(new_rows)} new users to Google Sheet")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error saving user database changes: {e}")
+        return False
 
+def _rewrite_user_sheet():
+    """
+    Clears the sheet and writes the whole user database.
+    Used when the sheet layout changed.
+    """
+    global _synced_columns, _synced_rows
+    try:
         config = get_config()
 
-        # Setup Google Sheets API
-        tmp_dir = tempfile.gettempdir()
-        key_path = os.path.join(tmp_dir, "service_account.json")
-        with open(key_path, "w") as f:
-            json.dump(config.service_account_data, f)
-
-        creds = service_account.Credentials.from_service_account_file(
-            key_path, scopes=["https://www.googleapis.com/auth/spreadsheets"]
-        )
-        sheets_service = build("sheets", "v4", credentials=creds)
-
-        # Prepare data for Google Sheets
-        # Convert DataFrame to list of lists (including headers)
-        headers = list(user_db.columns)
-        data_rows = user_db.values.tolist()
-
-        # Convert any NaN values to empty strings and ensure proper data types
-        for i, row in enumerate(data_rows):
-            for j, cell in enumerate(row):
-                if pd.isna(cell):
-                    data_rows[i][j] = ''
-                elif isinstance(cell, bool):
-                    data_rows[i][j] = str(cell).upper()  # TRUE/FALSE for Google Sheets
-                else:
-                    data_rows[i][j] = str(cell)
+        sheets_service = get_sheets_service()
+
+        # Prepare data for Google Sheets (headers + one list per user)
+        headers, rows = user_store.rows()
+        data_rows = [[_cell_value(cell) for cell in row] for row in rows]
 
         # Combine headers and data
         all_data = [headers] + data_rows
@@ -850,7 +1197,7 @@ def save_user_database():
         sheet.values().clear(
             spreadsheetId=config.U_DATABASE,
             range="A:Z"
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
 
         # Write new data
         sheet.values().update(
@@ -858,8 +1205,10 @@ def save_user_database():
             range="A1",
             valueInputOption="RAW",
             body={"values": all_data}
-        ).execute()
+        ).execute(num_retries=API_RETRIES)
 
+        _synced_columns = headers
+        _synced_rows = len(data_rows)
         print(f"✅ Successfully saved {len(data_rows)} user records to Google Sheet")
         return True
 
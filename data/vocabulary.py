@@ -2,6 +2,7 @@
 # Vocabulary extraction and related helpers 
 
 import pandas as pd
+import numpy as np
 import re
 from utils.notation import Music_notation_link
 
@@ -79,7 +80,186 @@ def standardize_hlc_value(value):
     value = re.sub(r'\s*-\s*', '-', value)
     return value
 
-def isVocabulary(Songs, Vocabulary, dfH, dfTH, Tune_finder_of_known_songs):
+# A song drops out of the choir vocabulary after this many years without being sung
+VOCABULARY_WINDOW_YEARS = 3
+
+def vocabulary_cutoff(today=None):
+    """Returns the earliest date a song must have been sung on to count as known."""
+    today = pd.Timestamp(today) if today is not None else pd.Timestamp.today()
+    return (today.normalize() - pd.DateOffset(years=VOCABULARY_WINDOW_YEARS)).date()
+
+class VocabularyEngine:
+    """
+    Time-windowed view of the song history.
+    Built once per history DataFrame: every (song, date) occurrence is kept in
+    date-sorted arrays, and each song gets its first/last sung date, so window
+    queries are vectorized comparisons instead of row scans.
+    """
+
+    CATEGORIES = ('H', 'L', 'C')
+
+    def __init__(self, df):
+        self.source = df
+        events = self._extract_events(df)
+
+        # Occurrence arrays, sorted by date for binary-searched windows
+        events = events.sort_values('Date', kind='stable')
+        self._event_dates = events['Date'].to_numpy(dtype='datetime64[ns]')
+        self._event_codes = events['Song'].to_numpy(dtype=object)
+
+        # Per-song arrays, ordered by category then number
+        grouped = events.groupby('Song')['Date']
+        per_song = pd.DataFrame({'first': grouped.min(), 'last': grouped.max()})
+        per_song['category'] = per_song.index.str[0]
+        per_song['number'] = per_song.index.str[2:].astype(int)
+        per_song = per_song.sort_values(['category', 'number'])
+
+        self.codes = per_song.index.to_numpy(dtype=object)
+        self.categories = per_song['category'].to_numpy(dtype=object)
+        self.numbers = per_song['number'].to_numpy(dtype=int)
+        self.first_sung = per_song['first'].to_numpy(dtype='datetime64[ns]')
+        self.last_sung = per_song['last'].to_numpy(dtype='datetime64[ns]')
+        self._position = {code: i for i, code in enumerate(self.codes)}
+
+    @staticmethod
+    def _extract_events(df):
+        """Returns a (Song, Date) frame with one row per standardized song occurrence."""
+        empty = pd.DataFrame({'Song': pd.Series(dtype=object), 'Date': pd.Series(dtype='datetime64[ns]')})
+        if df is None or df.empty or 'Date' not in df.columns:
+            return empty
+        song_columns = [col for col in df.columns if col != 'Date']
+        if not song_columns:
+            return empty
+        melted = (df[song_columns].astype(str)
+                  .assign(Date=pd.to_datetime(df['Date'], errors='coerce'))
+                  .melt(id_vars='Date', value_name='Song'))
+        parts = (melted['Song'].str.upper()
+                 .str.replace(r'\s+', '', regex=True)
+                 .str.extract(r'^([HLC])-*(\d+)$'))
+        valid = parts[0].notna() & melted['Date'].notna()
+        valid &= pd.to_numeric(parts[1], errors='coerce').fillna(0) != 0  # H-0 etc. are placeholders
+        parts = parts[valid]
+        return pd.DataFrame({
+            'Song': parts[0] + '-' + parts[1].astype(int).astype(str),
+            'Date': melted.loc[valid, 'Date'],
+        })
+
+    @staticmethod
+    def _to_datetime64(value):
+        return pd.Timestamp(value).to_datetime64()
+
+    @staticmethod
+    def _song_code(song):
+        code = standardize_hlc_value(song)
+        match = re.match(r'^([HLC])-(\d+)$', code)
+        return f"{match.group(1)}-{int(match.group(2))}" if match else code
+
+    def _category_mask(self, category):
+        if category is None:
+            return np.ones(len(self.codes), dtype=bool)
+        return self.categories == category.upper()
+
+    def sung_between(self, start=None, end=None, category=None):
+        """
+        Returns the set of song codes sung between start and end (inclusive).
+        Either bound may be None for an open window.
+        """
+        lo = 0 if start is None else np.searchsorted(self._event_dates, self._to_datetime64(start), side='left')
+        hi = len(self._event_dates) if end is None else np.searchsorted(self._event_dates, self._to_datetime64(end), side='right')
+        codes = set(self._event_codes[lo:hi])
+        if category is not None:
+            prefix = category.upper()
+            codes = {code for code in codes if code[0] == prefix}
+        return codes
+
+    def not_sung_since(self, since, category=None):
+        """
+        Returns known song codes (sung at least once) whose last sung date is
+        before `since`, ordered by category and number.
+        """
+        mask = self._category_mask(category) & (self.last_sung < self._to_datetime64(since))
+        return self.codes[mask].tolist()
+
+    def known_codes(self, category=None, since=None):
+        """Returns the song codes in the vocabulary, optionally only those sung on or after `since`."""
+        mask = self._category_mask(category)
+        if since is not None:
+            mask &= self.last_sung >= self._to_datetime64(since)
+        return self.codes[mask].tolist()
+
+    def known_numbers(self, category, since=None):
+        """Returns the song numbers of a category in the vocabulary as a set of ints."""
+        mask = self._category_mask(category)
+        if since is not None:
+            mask &= self.last_sung >= self._to_datetime64(since)
+        return set(self.numbers[mask].tolist())
+
+    def is_known(self, song, since=None):
+        i = self._position.get(self._song_code(song))
+        if i is None:
+            return False
+        return since is None or self.last_sung[i] >= self._to_datetime64(since)
+
+    def last_sung_date(self, song):
+        """Returns the last sung date of a song as a datetime.date, or None if never sung."""
+        i = self._position.get(self._song_code(song))
+        if i is None:
+            return None
+        return pd.Timestamp(self.last_sung[i]).date()
+
+_vocabulary_engine = None
+
+def get_vocabulary_engine(df):
+    """
+    Returns the shared VocabularyEngine for the given history DataFrame,
+    rebuilding it only when the DataFrame has been reloaded.
+    """
+    global _vocabulary_engine
+    if _vocabulary_engine is None or _vocabulary_engine.source is not df:
+        _vocabulary_engine = VocabularyEngine(df)
+    return _vocabulary_engine
+
+UNUSED_CATEGORY_NAMES = {'H': 'Hymns', 'L': 'Lyrics', 'C': 'Conventions'}
+
+def find_unused_songs(engine, since, categories=('H', 'L', 'C')):
+    """
+    Returns {category name: [song codes]} for vocabulary songs not sung on or after `since`.
+    The recent-window song set is computed once and subtracted from each category's vocabulary.
+    """
+    recent = engine.sung_between(since)
+    return {
+        UNUSED_CATEGORY_NAMES[category]: [code for code in engine.known_codes(category) if code not in recent]
+        for category in categories
+    }
+
+def unused_songs_to_excel(unused_songs, index_finder):
+    """
+    Writes an unused-songs report to an in-memory Excel workbook.
+    One sheet per category, plus an "All" sheet when several categories are included.
+    Returns a BytesIO positioned at the start.
+    """
+    import io
+    frames = {
+        category_name: pd.DataFrame({
+            'Song Code': songs,
+            'Malayalam Index': [index_finder(song) for song in songs],
+        })
+        for category_name, songs in unused_songs.items()
+    }
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        if len(frames) > 1:
+            combined = pd.concat(
+                [frame.assign(Category=name) for name, frame in frames.items()],
+                ignore_index=True
+            )[['Category', 'Song Code', 'Malayalam Index']]
+            combined.to_excel(writer, sheet_name="All", index=False)
+        for category_name, frame in frames.items():
+            frame.to_excel(writer, sheet_name=category_name, index=False)
+    output.seek(0)
+    return output
+
+def isVocabulary(Songs, Vocabulary, dfH, dfTH, Tune_finder_of_known_songs, engine=None):
     songs_std = standardize_hlc_value(Songs)
     song = songs_std
     prefix_mapping = {
@@ -94,16 +274,19 @@ def isVocabulary(Songs, Vocabulary, dfH, dfTH, Tune_finder_of_known_songs):
                 song_number = int(number_str)
             except ValueError:
                 return f"Invalid song number: {song}"
-            def to_int(x):
-                x = x.strip()
-                return int(x) if x.isdigit() and int(x) != 0 else None
-            valid_numbers = (Vocabulary[col]
-                             .dropna()
-                             .apply(to_int)
-                             .dropna()
-                             .astype(int)
-                             .values)
-            in_vocab = song_number in valid_numbers
+            if engine is not None:
+                in_vocab = song_number != 0 and engine.is_known(f"{prefix}-{song_number}", since=vocabulary_cutoff())
+            else:
+                def to_int(x):
+                    x = x.strip()
+                    return int(x) if x.isdigit() and int(x) != 0 else None
+                valid_numbers = (Vocabulary[col]
+                                 .dropna()
+                                 .apply(to_int)
+                                 .dropna()
+                                 .astype(int)
+                                 .values)
+                in_vocab = song_number in valid_numbers
             notation_block = ""
             if songs_std.startswith('H'):
                 notation_block = Music_notation_link(songs_std, dfH, dfTH, Tune_finder_of_known_songs)
@@ -0,0 +1,167 @@
+# data/webhook_receiver.py
+# HTTP endpoint for Google Drive push notifications, served inside the bot's event loop
+
+import asyncio
+import logging
+from typing import Dict, Optional
+from data.sync_metrics import get_sync_metrics
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed"}
+MAX_HEADERS = 100
+MAX_BODY = 64 * 1024
+READ_TIMEOUT = 10
+
+
+class DriveWebhookReceiver:
+    """
+    Receives Drive `files.watch` notifications and forwards them to the
+    HybridChangeDetector.
+
+    Drive POSTs an empty body; everything is in the X-Goog-* headers.
+    A notification is accepted only if its channel id and token match a
+    channel the detector registered. Bursts for the same file (Drive often
+    sends several per save) are coalesced: the detector is notified once,
+    `debounce` seconds after the first one.
+
+    GET `metrics_path` returns the sync metrics in Prometheus text format.
+    """
+
+    def __init__(self, detector, host: str = "0.0.0.0", port: int = 8080,
+                 path: str = "/drive-webhook", debounce: float = 5.0, metrics_path: str = "/metrics"):
+        self.detector = detector
+        self.host = host
+        self.port = port
+        self.path = path
+        self.metrics_path = metrics_path
+        self.debounce = debounce
+        self._server = None
+        self._pending: Dict[str, asyncio.Task] = {}
+        self.stats = {'accepted': 0, 'rejected': 0, 'coalesced': 0, 'dispatched': 0}
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logger.info(f"🔔 Drive webhook receiver listening on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._pending.values():
+            task.cancel()
+        self._pending.clear()
+
+    def handle_request(self, method: str, path: str, headers: Dict[str, str]) -> int:
+        """
+        Validates one notification and schedules the detector callback.
+        `headers` must have lower-case names. Returns the HTTP status.
+        """
+        if path != self.path:
+            return 404
+        if method != "POST":
+            return 405
+
+        channel_id = headers.get("x-goog-channel-id", "")
+        token = headers.get("x-goog-channel-token", "")
+        file_id = self.detector.resolve_channel(channel_id, token)
+        if file_id is None:
+            self.stats['rejected'] += 1
+            logger.warning(f"⚠️ Rejected webhook for unknown channel {channel_id[:8]}...")
+            return 403
+
+        self.stats['accepted'] += 1
+        state = headers.get("x-goog-resource-state", "")
+        if state == "sync":
+            return 200  # Handshake sent when the channel is created
+
+        self._schedule(file_id)
+        return 200
+
+    def _schedule(self, file_id: str):
+        if file_id in self._pending:
+            self.stats['coalesced'] += 1
+            return
+        self._pending[file_id] = asyncio.get_event_loop().create_task(self._dispatch(file_id))
+
+    async def _dispatch(self, file_id: str):
+        try:
+            await asyncio.sleep(self.debounce)
+        finally:
+            self._pending.pop(file_id, None)
+        self.stats['dispatched'] += 1
+        try:
+            await self.detector.handle_webhook_notification(file_id)
+        except Exception as e:
+            logger.error(f"❌ Error handling webhook for {file_id[:8]}...: {e}")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        status = 400
+        body = b""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if len(headers) >= MAX_HEADERS:
+                    raise ValueError("too many headers")
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length") or 0)
+            if length > MAX_BODY:
+                raise ValueError("body too large")
+            if length:
+                await asyncio.wait_for(reader.readexactly(length), READ_TIMEOUT)  # Drive sends no body
+
+            path = target.split("?", 1)[0]
+            if method == "GET" and path == self.metrics_path:
+                status, body = 200, get_sync_metrics().render_prometheus().encode()
+            else:
+                status = self.handle_request(method, path, headers)
+        except (ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            status = 400
+        except Exception as e:
+            logger.error(f"❌ Webhook receiver error: {e}")
+            status = 400
+
+        try:
+            content_type = "Content-Type: text/plain; version=0.0.4\r\n" if body else ""
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n{content_type}Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+_receiver: Optional[DriveWebhookReceiver] = None
+
+
+def get_webhook_receiver(detector=None) -> Optional[DriveWebhookReceiver]:
+    """
+    Returns the webhook receiver, creating it for `detector` on first call.
+    The receiver path is taken from WEBHOOK_URL so the public URL and the
+    local route stay in sync.
+    """
+    global _receiver
+    if _receiver is None and detector is not None:
+        from urllib.parse import urlparse
+        config = get_config()
+        _receiver = DriveWebhookReceiver(
+            detector,
+            host=config.WEBHOOK_HOST,
+            port=config.WEBHOOK_PORT,
+            path=urlparse(config.WEBHOOK_URL or "").path or "/drive-webhook",
+            debounce=config.WEBHOOK_DEBOUNCE,
+            metrics_path=config.METRICS_PATH,
+        )
+    return _receiver
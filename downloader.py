@@ -1099,6 +1099,38 @@ class AudioDownloader:
         else:
             return 'Unknown'
     
+    def extract_track_id(self, url: str) -> Optional[str]:
+        """
+        The platform's own track id (YouTube video id, Spotify track id,
+        SoundCloud artist/track path), ignoring query parameters such as si= or t=.
+        """
+        import urllib.parse as urlparse
+        parsed = urlparse.urlparse(url)
+        platform = self.detect_platform(url)
+        if platform == 'YouTube':
+            video_ids = urlparse.parse_qs(parsed.query).get('v')
+            if video_ids:
+                return video_ids[0]
+            match = re.search(r'(?:youtu\.be/|/shorts/|/embed/|/live/)([\w-]+)', url)
+            return match.group(1) if match else None
+        if platform == 'Spotify':
+            match = re.search(r'track/([a-zA-Z0-9]+)', url)
+            return match.group(1) if match else None
+        if platform == 'SoundCloud':
+            path = parsed.path.strip('/').lower()
+            return path or None
+        return None
+
+    def get_track_key(self, url: str, quality: str) -> Optional[str]:
+        """Stable content key for a single-track download: platform, track id and quality"""
+        url = self._validate_and_clean_url(url)
+        if not url:
+            return None
+        track_id = self.extract_track_id(url)
+        if not track_id:
+            return None  # without the platform's id, links to the same track would not match
+        return f"track:{self.detect_platform(url)}:{track_id}:{quality}"
+
     def is_supported_url(self, url: str) -> bool:
         """Check if URL is supported"""
         supported_domains = [
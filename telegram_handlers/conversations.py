@@ -4,6 +4,7 @@ import pandas as pd
 import streamlit as st
 from telegram import Update, ReplyKeyboardRemove, ReplyKeyboardMarkup, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CallbackContext, ConversationHandler, ContextTypes
+from telegram.helpers import escape_markdown
 from config import get_config
 from logging_utils import setup_loggers
 import logging
@@ -13,11 +14,11 @@ logger = logging.getLogger(__name__)
 from PyPDF2 import PdfMerger
 import tempfile
 # Import isVocabulary from the appropriate module
-from data.vocabulary import ChoirVocabulary, isVocabulary, standardize_hlc_value
+from data.vocabulary import ChoirVocabulary, isVocabulary, standardize_hlc_value, get_vocabulary_engine, vocabulary_cutoff
 from utils.search import find_best_match, search_index
-from utils.notation import Music_notation_link, getNotation
+from utils.notation import Music_notation_link, getNotation, get_tune_page_index
 from data.datasets import Tunenofinder, Tune_finder_of_known_songs, Datefinder, IndexFinder, Hymn_Tune_no_Finder, get_all_data
-from telegram_handlers.utils import get_wordproject_url_from_input, extract_bible_chapter_text, clean_bible_text
+from telegram_handlers.utils import get_wordproject_url_from_input, extract_bible_chapter_text, clean_bible_text, send_cached_media
 from data.drive import save_game_score, get_user_best_score, get_user_best_scores_all_difficulties, get_leaderboard, get_combined_leaderboard
 from data.udb import get_user_bible_language, get_user_game_language, get_user_download_preference, get_user_download_quality, track_user_fast
 import re
@@ -25,6 +26,10 @@ import os
 import random
 import requests
 from data.drive import get_drive_service, append_download_to_google_doc, get_docs_service
+from data.file_cache import get_notation_cache, prefetch_popular_notations
+from data.google_async import execute_request, run_blocking
+from data.folder_index import get_folder_index, get_hymn_sheet_index, parse_lyric_number, parse_page_number, start_folder_index_sync
+from data.telegram_file_cache import drive_content_key, get_telegram_file_cache
 from googleapiclient.http import MediaIoBaseDownload
 from datetime import datetime
 import io
@@ -40,7 +45,6 @@ from rapidfuzz import process, fuzz
 
 DOWNLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tmp')
 HYMN_FOLDER_URL = f'https://drive.google.com/drive/folders/{get_config().H_SHEET_MUSIC}'
-drive_service = get_drive_service()
 file_map = {}
 bot_logger, user_logger = setup_loggers()
 
@@ -226,51 +230,15 @@ def extract_lyrics_folder_id(folder_url):
     raise ValueError("Invalid folder URL")
 
 def fetch_lyrics_file_map(folder_url):
+    """Brings the persisted lyric notation index up to date and returns its live map"""
     folder_id = extract_lyrics_folder_id(folder_url)
-    lyrics_file_map = {}
-    page_token = None
-    while True:
-        response = drive_service.files().list(
-            q=f"'{folder_id}' in parents and mimeType = 'application/pdf' and trashed = false",
-            fields="nextPageToken, files(id, name)",
-            pageToken=page_token
-        ).execute()
-        for file in response.get('files', []):
-            filename = file['name']
-            match = re.match(r'L-(\d+)\.pdf$', filename)
-            if match:
-                lyric_no = int(match.group(1))
-                lyrics_file_map[lyric_no] = file['id']
-        page_token = response.get('nextPageToken', None)
-        if page_token is None:
-            break
-    return lyrics_file_map
+    return get_folder_index(folder_id, parse_lyric_number, "lyric notation").sync()
 
 def download_lyrics_pdf(file_id, filename):
-    """Download PDF file from Google Drive using proper API"""
+    """Copy a lyrics PDF out of the local notation cache, downloading it from Drive on a miss"""
     try:
         save_path = os.path.join(LYRICS_DOWNLOAD_DIR, filename)
-
-        # Use Google Drive API for proper download
-        request = drive_service.files().get_media(fileId=file_id)
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-
-        # Write the downloaded content to file
-        file_data.seek(0)
-        with open(save_path, 'wb') as f:
-            f.write(file_data.read())
-
-        # Verify the file was downloaded correctly
-        if os.path.exists(save_path) and os.path.getsize(save_path) > 0:
-            return save_path
-        else:
-            print(f"Failed to download or verify PDF: {filename}")
-            return None
+        return get_notation_cache().copy_to(file_id, save_path, get_drive_service(), validator=validate_pdf_file)
 
     except Exception as e:
         print(f"Error downloading PDF {filename}: {str(e)}")
@@ -302,22 +270,22 @@ def get_lyrics_pdf_by_lyric_number(lyric_number, lyrics_file_map):
     if lyric_number in lyrics_file_map:
         file_id = lyrics_file_map[lyric_number]
         filename = f"L-{lyric_number}.pdf"
+        # The notation cache validates PDFs when they are downloaded
         pdf_path = download_lyrics_pdf(file_id, filename)
-
-        # Validate the downloaded PDF
-        if pdf_path and validate_pdf_file(pdf_path):
-            return pdf_path
-        else:
+        if pdf_path is None:
             print(f"Invalid PDF downloaded for L-{lyric_number}")
-            # Clean up invalid file
-            if pdf_path and os.path.exists(pdf_path):
-                os.remove(pdf_path)
-            return None
+        return pdf_path
     else:
         return None
 
+def get_lyrics_content_key(lyric_number, lyrics_file_map):
+    """Content key of the current version of a lyrics PDF, for Telegram file_id reuse"""
+    file_id = lyrics_file_map.get(int(lyric_number))
+    return drive_content_key(file_id, get_notation_cache().checksum_for(file_id)) if file_id else None
+
 os.makedirs(LYRICS_DOWNLOAD_DIR, exist_ok=True)
-lyrics_file_map = fetch_lyrics_file_map(LYRICS_FOLDER_URL)
+# Loaded from disk; kept current by the background folder index sync started below
+lyrics_file_map = get_folder_index(LYRICS_FOLDER_ID, parse_lyric_number, "lyric notation").file_map
 
 # --- /notation command (interactive only, no arguments supported) ---
 async def notation(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -367,10 +335,18 @@ async def notation_code_input(update: Update, context: ContextTypes.DEFAULT_TYPE
         downloading_msg = await update.message.reply_text("⏳ Downloading music sheet... Please wait.")
 
         try:
-            # First, try to get from main lyrics database
-            pdf_path = get_lyrics_pdf_by_lyric_number(lyric_number, lyrics_file_map)
+            # First, try to get from main lyrics database (reusing an earlier upload when possible)
+            content_key = get_lyrics_content_key(lyric_number, lyrics_file_map)
+            sent_from_cache = await send_cached_media(
+                update.message.reply_document, 'document', content_key,
+                filename=f"L-{lyric_number}.pdf",
+                caption=f"Here is the notation for Lyric L-{lyric_number}."
+            )
+            pdf_path = None if sent_from_cache else await run_blocking(get_lyrics_pdf_by_lyric_number, lyric_number, lyrics_file_map)
 
-            if pdf_path and os.path.exists(pdf_path):
+            if sent_from_cache:
+                await downloading_msg.delete()
+            elif pdf_path and os.path.exists(pdf_path):
                 # Found in main database
                 await downloading_msg.delete()
                 
@@ -379,12 +355,11 @@ async def notation_code_input(update: Update, context: ContextTypes.DEFAULT_TYPE
                 if file_size > 50 * 1024 * 1024:  # 50MB limit for Telegram
                     await update.message.reply_text(f"❌ PDF file for L-{lyric_number} is too large to send via Telegram.")
                 else:
-                    with open(pdf_path, 'rb') as pdf_file:
-                        await update.message.reply_document(
-                            document=pdf_file,
-                            filename=f"L-{lyric_number}.pdf",
-                            caption=f"Here is the notation for Lyric L-{lyric_number}."
-                        )
+                    await send_cached_media(
+                        update.message.reply_document, 'document', content_key, pdf_path,
+                        filename=f"L-{lyric_number}.pdf",
+                        caption=f"Here is the notation for Lyric L-{lyric_number}."
+                    )
                     # Clean up the downloaded file after sending
                     try:
                         os.remove(pdf_path)
@@ -395,14 +370,14 @@ async def notation_code_input(update: Update, context: ContextTypes.DEFAULT_TYPE
                 await downloading_msg.edit_text("⏳ Not found in main database. Searching uploaded files...")
                 
                 from data.sheet_upload import search_uploaded_file_by_lyric, download_uploaded_file
-                found, file_id, filename = search_uploaded_file_by_lyric(lyric_number)
+                found, file_id, filename = await run_blocking(search_uploaded_file_by_lyric, lyric_number)
                 
                 if found:
                     # Found in upload folder - download and send it
                     await downloading_msg.edit_text(f"✅ Found in uploads: {filename}\n⏳ Downloading...")
                     
                     # Download from upload folder
-                    upload_pdf_path = download_uploaded_file(file_id, filename, DOWNLOAD_DIR)
+                    upload_pdf_path = await run_blocking(download_uploaded_file, file_id, filename, DOWNLOAD_DIR)
                     
                     if upload_pdf_path and os.path.exists(upload_pdf_path):
                         await downloading_msg.delete()
@@ -458,7 +433,7 @@ async def notation_code_input(update: Update, context: ContextTypes.DEFAULT_TYPE
         
         try:
             from data.sheet_upload import search_uploaded_file_by_text, download_uploaded_file
-            matching_files = search_uploaded_file_by_text(search_text)
+            matching_files = await run_blocking(search_uploaded_file_by_text, search_text)
             
             if matching_files:
                 if len(matching_files) == 1:
@@ -466,7 +441,7 @@ async def notation_code_input(update: Update, context: ContextTypes.DEFAULT_TYPE
                     file_id, filename = matching_files[0]
                     await searching_msg.edit_text(f"✅ Found: {filename}\n⏳ Downloading...")
                     
-                    upload_pdf_path = download_uploaded_file(file_id, filename, DOWNLOAD_DIR)
+                    upload_pdf_path = await run_blocking(download_uploaded_file, file_id, filename, DOWNLOAD_DIR)
                     
                     if upload_pdf_path and os.path.exists(upload_pdf_path):
                         await searching_msg.delete()
@@ -580,11 +555,6 @@ print("Reached Telegram Bot code")
 ASK_HYMN_NO = range(1)
 
 
-# Function to send notation images
-def normalize_tune(tune):
-     return re.sub(r'[^a-z0-9]', '', tune.lower())
-
-
 # === EXTRACT FOLDER ID ===
 def extract_folder_id(folder_url):
      match = re.search(r'/folders/([a-zA-Z0-9_-]+)', folder_url)
@@ -594,78 +564,20 @@ def extract_folder_id(folder_url):
  
  # === FETCH ALL IMAGE FILES ===
 def get_image_files_from_folder(folder_url):
+     """Brings the persisted hymn notation index up to date and returns its live map"""
      try:
          folder_id = extract_folder_id(folder_url)
-         drive_service = get_drive_service()
-         file_map = {}
-         page_token = None
-         max_retries = 3
-         retry_count = 0
-
-         while True:
-             try:
-                 response = drive_service.files().list(
-                     q=f"'{folder_id}' in parents and mimeType='application/pdf' and trashed = false",
-                     fields="nextPageToken, files(id, name)",
-                     pageToken=page_token,
-                     pageSize=100  # Limit page size to avoid large responses
-                 ).execute()
-
-                 # Reset retry count on successful request
-                 retry_count = 0
-
-                 for file in response.get('files', []):
-                     try:
-                         page_num = int(file['name'].split('.')[0])
-                         file_map[page_num] = file['id']
-                     except ValueError:
-                         continue  # Skip files that don't start with a number
-
-                 page_token = response.get('nextPageToken', None)
-                 if page_token is None:
-                     break
-
-             except Exception as e:
-                 retry_count += 1
-                 if retry_count >= max_retries:
-                     print(f"❌ Failed to load images after {max_retries} retries: {e}")
-                     break
-                 print(f"⚠️ Retry {retry_count}/{max_retries} for loading images: {e}")
-                 import time
-                 time.sleep(2 ** retry_count)  # Exponential backoff
-
-         return file_map
-
+         return get_folder_index(folder_id, parse_page_number, "hymn notation").sync()
      except Exception as e:
-         print(f"❌ Error initializing image file loading: {e}")
-         return {}
+         print(f"❌ Error syncing hymn notation index: {e}")
+         return get_hymn_sheet_index().file_map
  
  # === DOWNLOAD IMAGE ===
 def download_image(file_id, filename):
-    """Download PDF file from Google Drive using proper API"""
+    """Copy a notation PDF out of the local notation cache, downloading it from Drive on a miss"""
     try:
         save_path = os.path.join(DOWNLOAD_DIR, filename)
-
-        # Use Google Drive API for proper download
-        request = drive_service.files().get_media(fileId=file_id)
-        file_data = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_data, request)
-
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-
-        # Write the downloaded content to file
-        file_data.seek(0)
-        with open(save_path, 'wb') as f:
-            f.write(file_data.read())
-
-        # Verify the file was downloaded correctly
-        if os.path.exists(save_path) and os.path.getsize(save_path) > 0:
-            return save_path
-        else:
-            print(f"Failed to download or verify PDF: {filename}")
-            return None
+        return get_notation_cache().copy_to(file_id, save_path, get_drive_service(), validator=validate_pdf_file)
 
     except Exception as e:
         print(f"Error downloading PDF {filename}: {str(e)}")
@@ -677,32 +589,24 @@ def get_image_by_page(page_number, file_map):
      if page_number in file_map:
          file_id = file_map[page_number]
          filename = f"{page_number}.pdf"
+         # The notation cache validates PDFs when they are downloaded
          downloaded_path = download_image(file_id, filename)
-
-         # Validate the downloaded PDF
-         if downloaded_path and validate_pdf_file(downloaded_path):
-             return downloaded_path
-         else:
+         if downloaded_path is None:
              print(f"Failed to download or verify PDF for page {page_number}")
-             # Clean up invalid file
-             if downloaded_path and os.path.exists(downloaded_path):
-                 os.remove(downloaded_path)
-             return None
+         return downloaded_path
      else:
          print(f"Page {page_number} not found in file map")
          return None
  
  # === MAIN EXECUTION ===
 os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-# Load file_map at startup with error handling
-try:
-    print("Loading hymn image files from Google Drive...")
-    file_map = get_image_files_from_folder(HYMN_FOLDER_URL)
-    print(f"Successfully loaded {len(file_map)} hymn images")
-except Exception as e:
-    print(f"❌ Error loading hymn images: {e}")
-    print("⚠️ Bot will continue without notation images")
-    file_map = {}  # Empty dict allows bot to continue
+# Load file_map from the persisted index; listing Drive no longer blocks startup
+file_map = get_hymn_sheet_index().file_map
+print(f"Loaded {len(file_map)} hymn images from the local index")
+
+# Sync both notation indexes in the background, then warm the notation cache
+# with the most requested pages
+start_folder_index_sync(on_first_sync=lambda: prefetch_popular_notations(validator=validate_pdf_file))
 
 
 
@@ -729,26 +633,23 @@ def Music_notation_downloader(hymnno, file_map):
         bot_logger.error(f"Error getting tunes for hymn {hymnno}: {e}")
         return {"error": "Hymn not found"}
 
+    index = get_tune_page_index(dfH, dfTH)
     for tune_name in tune_names:
         # Check if the exact tune is present for this hymn
-        tune_matches = dfTH[(dfTH["Hymn no"] == hymnno) & (dfTH["Tune Index"].str.contains(tune_name, na=False))]
+        row = index.hymn_tune_row(hymnno, tune_name)
 
-        if not tune_matches.empty:
-            page_str = str(tune_matches["Page no"].values[0]).split(',')[0]
+        if row is not None:
+            page_str = str(row[1]).split(',')[0]
             image_path = get_image_by_page(page_str, file_map)
             results[tune_name] = image_path or "Page not found"
         else:
             # Search in entire dataset for the tune
-            found = False
-            for idx, row in dfTH.iterrows():
-                tune_indices = [ti.strip() for ti in str(row["Tune Index"]).split(',')]
-                if tune_name in tune_indices:
-                    page_str = str(row["Page no"]).split(',')[0]
-                    image_path = get_image_by_page(page_str, file_map)
-                    results[tune_name] = image_path or "Page not found"
-                    found = True
-                    break
-            if not found:
+            pages = index.tune_pages(tune_name)
+            if pages:
+                page_str = str(pages[0]).split(',')[0]
+                image_path = get_image_by_page(page_str, file_map)
+                results[tune_name] = image_path or "Page not found"
+            else:
                 results[tune_name] = "Notation not found"
 
     return results
@@ -826,41 +727,37 @@ async def send_notation_image(update: Update, context: ContextTypes.DEFAULT_TYPE
     chat_id = update.effective_chat.id
     Song_id = standardize_hlc_value(song_id)
     hymnno = int(Song_id.replace("H-", "").strip())
-    normalized_target = normalize_tune(tune_name)
 
-    matched_row = None
-
-    # === 1. Try to find it in the same hymn number
+    # === 1. Find the tune in the same hymn number, falling back to any hymn
     data = get_all_data()
-    dfTH = data["dfTH"]
-    subset_df = dfTH[dfTH["Hymn no"] == hymnno]
-    for _, row in subset_df.iterrows():
-        tune_list = [normalize_tune(t.strip()) for t in str(row["Tune Index"]).split(",")]
-        if normalized_target in tune_list:
-            matched_row = row
-            break
-
-    # === 2. Global fallback if not found
-    if matched_row is None:
-        for _, row in dfTH.iterrows():
-            tune_list = [normalize_tune(t.strip()) for t in str(row["Tune Index"]).split(",")]
-            if normalized_target in tune_list:
-                matched_row = row
-                break
+    raw_page_value = get_tune_page_index(data["dfH"], data["dfTH"]).normalized_tune_page(hymnno, tune_name)
 
-    # === 3. If still not found
-    if matched_row is None:
+    # === 2. If still not found
+    if raw_page_value is None:
         await context.bot.send_message(chat_id=chat_id, text=f"❌ Could not find notation page for '{tune_name}' in {song_id}.")
         return
 
-    # === 4. Parse page numbers
-    raw_page_value = str(matched_row["Page no"])
-    page_numbers = [p.strip() for p in raw_page_value.split(",") if p.strip().isdigit()]
+    # === 3. Parse page numbers
+    page_numbers = [p.strip() for p in str(raw_page_value).split(",") if p.strip().isdigit()]
 
     if not page_numbers:
         await context.bot.send_message(chat_id=chat_id, text=f"❌ Invalid or missing page number for {tune_name} ({song_id})")
         return
 
+    # Reuse an earlier upload of the same page versions, skipping download and upload
+    notation_cache = get_notation_cache()
+    page_keys = [drive_content_key(file_map.get(int(page)), notation_cache.checksum_for(file_map.get(int(page)))) for page in page_numbers]
+    content_key = "|".join(page_keys) if all(page_keys) else None
+    if len(page_numbers) == 1:
+        cached_send_kwargs = dict(filename=f"{song_id}_{tune_name}.pdf", caption=f"Notation for {song_id} ({tune_name})")
+    else:
+        cached_send_kwargs = dict(
+            filename=f"{song_id}_{tune_name}_complete.pdf",
+            caption=f"Complete notation for {song_id} ({tune_name}) - {len(page_numbers)} pages"
+        )
+    if await send_cached_media(context.bot.send_document, 'document', content_key, chat_id=chat_id, **cached_send_kwargs):
+        return
+
     # List to store paths of downloaded PDFs
     pdf_files = []
     
@@ -871,7 +768,7 @@ async def send_notation_image(update: Update, context: ContextTypes.DEFAULT_TYPE
 
         if not os.path.exists(file_path):
             # Try to download the PDF from Google Drive
-            downloaded_path = get_image_by_page(page, file_map)
+            downloaded_path = await run_blocking(get_image_by_page, page, file_map)
             if downloaded_path and os.path.exists(downloaded_path):
                 pdf_files.append(downloaded_path)
             else:
@@ -892,23 +789,17 @@ async def send_notation_image(update: Update, context: ContextTypes.DEFAULT_TYPE
             if file_size > 50 * 1024 * 1024:  # 50MB limit for Telegram
                 await context.bot.send_message(chat_id=chat_id, text=f"❌ PDF file for {song_id} ({tune_name}) is too large to send via Telegram.")
             else:
-                with open(pdf_files[0], 'rb') as pdf_file:
-                    await context.bot.send_document(
-                        chat_id=chat_id,
-                        document=pdf_file,
-                        filename=f"{song_id}_{tune_name}.pdf",
-                        caption=f"Notation for {song_id} ({tune_name})"
-                    )
+                await send_cached_media(
+                    context.bot.send_document, 'document', content_key, pdf_files[0],
+                    chat_id=chat_id, **cached_send_kwargs
+                )
         else:
             # If there are multiple pages, merge them
             merger = PdfMerger()
             try:
+                # Pages come from download_image, which only returns validated PDFs
                 for pdf in pdf_files:
-                    # Validate each PDF before merging
-                    if validate_pdf_file(pdf):
-                        merger.append(pdf)
-                    else:
-                        print(f"Skipping invalid PDF: {pdf}")
+                    merger.append(pdf)
 
                 # Create a temporary file for the merged PDF
                 with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
@@ -920,14 +811,15 @@ async def send_notation_image(update: Update, context: ContextTypes.DEFAULT_TYPE
                     if merged_size > 50 * 1024 * 1024:  # 50MB limit
                         await context.bot.send_message(chat_id=chat_id, text=f"❌ Merged PDF for {song_id} ({tune_name}) is too large to send via Telegram.")
                     else:
-                        # Send the merged PDF
-                        with open(tmp_file.name, 'rb') as merged_pdf:
-                            await context.bot.send_document(
-                                chat_id=chat_id,
-                                document=merged_pdf,
-                                filename=f"{song_id}_{tune_name}_complete.pdf",
-                                caption=f"Complete notation for {song_id} ({tune_name}) - {len(pdf_files)} pages"
-                            )
+                        # Send the merged PDF (only cached when every page made it in)
+                        await send_cached_media(
+                            context.bot.send_document, 'document',
+                            content_key if len(pdf_files) == len(page_numbers) else None,
+                            tmp_file.name,
+                            chat_id=chat_id,
+                            filename=f"{song_id}_{tune_name}_complete.pdf",
+                            caption=f"Complete notation for {song_id} ({tune_name}) - {len(pdf_files)} pages"
+                        )
 
                     # Clean up the temporary file
                     os.unlink(tmp_file.name)
@@ -1041,7 +933,7 @@ async def handle_upload_notation_callback(update: Update, context: ContextTypes.
         from data.sheet_upload import download_uploaded_file
         
         # Download the file
-        upload_pdf_path = download_uploaded_file(file_id, filename, DOWNLOAD_DIR)
+        upload_pdf_path = await run_blocking(download_uploaded_file, file_id, filename, DOWNLOAD_DIR)
         
         if upload_pdf_path and os.path.exists(upload_pdf_path):
             # Verify file size before sending
@@ -1417,7 +1309,7 @@ async def start_download_process(update: Update, context: CallbackContext) -> in
         download_request_entry = f"{timestamp} - {user.full_name} (@{user.username}, ID: {user.id}, ChatID: {chat_id}) requested download:\nPlatform: {platform} | Quality: {quality} | URL: {url}\n\n"
 
         if yfile_id:
-            append_download_to_google_doc(yfile_id, download_request_entry)
+            await run_blocking(append_download_to_google_doc, yfile_id, download_request_entry)
 
         # Initialize downloader
         downloader = AudioDownloader()
@@ -1525,6 +1417,9 @@ async def start_download_process(update: Update, context: CallbackContext) -> in
     return ConversationHandler.END
 
 
+# Stored with a downloaded track's file_id so cached resends keep the title/artist caption
+AUDIO_SEND_FIELDS = ('caption', 'title', 'performer')
+
 async def background_download_task(downloader, url, quality, chat_id, download_playlist, update, context, user, platform):
     """Background task to handle downloads without blocking other commands"""
     try:
@@ -1548,6 +1443,27 @@ async def background_download_task(downloader, url, quality, chat_id, download_p
         except Exception as net_e:
             bot_logger.error(f"Background task: Network connectivity issue: {net_e}")
 
+        # Map quality for display
+        quality_map = {"high": "🔥 High (320kbps)", "medium": "🎵 Medium (192kbps)", "low": "💾 Low (128kbps)"}
+        quality_text = quality_map.get(quality, quality)
+
+        # Reuse an earlier upload of the same track and quality, skipping download and upload
+        track_key = None if download_playlist else downloader.get_track_key(url, quality)
+        if await send_cached_media(
+            context.bot.send_audio, 'audio', track_key,
+            remember=AUDIO_SEND_FIELDS,
+            chat_id=int(chat_id),
+            caption=f"🎯 **Quality:** {quality_text}\n🌐 **Platform:** {platform}",
+            parse_mode="Markdown"
+        ):
+            await context.bot.send_message(
+                chat_id=int(chat_id),
+                text="✅ **Download completed successfully!**\n\n🎵 Your audio file has been sent above.",
+                parse_mode="Markdown"
+            )
+            bot_logger.info(f"Background download served from Telegram file cache for user {user.full_name}: {url}")
+            return
+
         # Perform the download
         bot_logger.info("Background task: Starting download_audio call...")
         result = await downloader.download_audio(url, quality, chat_id=chat_id, download_playlist=download_playlist)
@@ -1556,25 +1472,21 @@ async def background_download_task(downloader, url, quality, chat_id, download_p
         if result:
             file_path, file_info = result
 
-            # Map quality for display
-            quality_map = {"high": "🔥 High (320kbps)", "medium": "🎵 Medium (192kbps)", "low": "💾 Low (128kbps)"}
-            quality_text = quality_map.get(quality, quality)
-
             # Send the audio file
-            with open(file_path, 'rb') as audio_file:
-                caption = f"🎵 **{file_info.get('title', 'Unknown Title')}**\n" \
-                        f"👤 **Artist:** {file_info.get('artist', 'Unknown Artist')}\n" \
-                        f"🎯 **Quality:** {quality_text}\n" \
-                        f"🌐 **Platform:** {file_info.get('platform', platform)}"
-
-                await context.bot.send_audio(
-                    chat_id=int(chat_id),
-                    audio=audio_file,
-                    caption=caption,
-                    parse_mode="Markdown",
-                    title=file_info.get('title', 'Unknown Title'),
-                    performer=file_info.get('artist', 'Unknown Artist')
-                )
+            caption = f"🎵 **{file_info.get('title', 'Unknown Title')}**\n" \
+                    f"👤 **Artist:** {file_info.get('artist', 'Unknown Artist')}\n" \
+                    f"🎯 **Quality:** {quality_text}\n" \
+                    f"🌐 **Platform:** {file_info.get('platform', platform)}"
+
+            await send_cached_media(
+                context.bot.send_audio, 'audio', track_key, str(file_path),
+                remember=AUDIO_SEND_FIELDS,
+                chat_id=int(chat_id),
+                caption=caption,
+                parse_mode="Markdown",
+                title=file_info.get('title', 'Unknown Title'),
+                performer=file_info.get('artist', 'Unknown Artist')
+            )
 
             # Clean up the file
             file_path.unlink(missing_ok=True)
@@ -2216,7 +2128,7 @@ async def bible_game_difficulty_handler(update: Update, context: ContextTypes.DE
         current_difficulty = context.user_data.get('current_difficulty')
 
         if total > 0 and current_difficulty:
-            save_game_score(user.full_name or user.username or "Unknown", user.id, score, current_difficulty)
+            await run_blocking(save_game_score, user.full_name or user.username or "Unknown", user.id, score, current_difficulty)
 
         await update.message.reply_text("Bible game cancelled. Type /games to play again!", reply_markup=ReplyKeyboardRemove())
         return ConversationHandler.END
@@ -2318,7 +2230,7 @@ async def bible_game_difficulty_handler(update: Update, context: ContextTypes.DE
         # Save score to database if user answered at least one question
         if total > 0:
             current_difficulty = context.user_data.get('current_difficulty', 'Easy')
-            save_success = save_game_score(user.full_name or user.username or "Unknown", user.id, score, current_difficulty)
+            save_success = await run_blocking(save_game_score, user.full_name or user.username or "Unknown", user.id, score, current_difficulty)
             save_status = "✅ Score saved!" if save_success else "⚠️ Could not save score."
         else:
             save_status = ""
@@ -2407,7 +2319,7 @@ async def bible_game_question_handler(update: Update, context: ContextTypes.DEFA
         current_difficulty = context.user_data.get('current_difficulty')
 
         if total > 0 and current_difficulty:
-            save_game_score(user.full_name or user.username or "Unknown", user.id, score, current_difficulty)
+            await run_blocking(save_game_score, user.full_name or user.username or "Unknown", user.id, score, current_difficulty)
 
         await update.message.reply_text("Bible game cancelled. Type /games to play again!", reply_markup=ReplyKeyboardRemove())
         return ConversationHandler.END
@@ -2917,14 +2829,14 @@ async def process_theme_selection(theme_input, update, context):
     dfL = data["dfL"]
     df = data["df"]
     dfC = data["dfC"]
-    # Use cached vocabularies for better performance
-    _, Hymn_Vocabulary, Lyric_Vocabulary, _ = get_vocabulary_cache()
+    # Use the shared vocabulary engine for the known/unknown split
+    vocabulary_engine = get_vocabulary_engine(df)
     if theme_type == "hymns":
         all_themes = dfH["Themes"].dropna().str.split(",").explode().str.strip().unique()
         theme_embeddings, theme_texts = get_theme_embeddings("hymns", all_themes)
         matched_themes = find_similar_themes(theme_input, theme_texts, theme_embeddings, threshold=0.7)
         filtered_df = dfH[dfH["Themes"].apply(lambda x: any(t in str(x) for t in matched_themes))]
-        known = Hymn_Vocabulary.values
+        known = vocabulary_engine.known_numbers('H', since=vocabulary_cutoff())
         prefix = "H-"
         index_col = "Hymn Index"
         no_col = "Hymn no"
@@ -2934,7 +2846,7 @@ async def process_theme_selection(theme_input, update, context):
         theme_embeddings, theme_texts = get_theme_embeddings("lyrics", all_themes)
         matched_themes = find_similar_themes(theme_input, theme_texts, theme_embeddings, threshold=0.7)
         filtered_df = dfL[dfL["Themes"].apply(lambda x: any(t in str(x) for t in matched_themes))]
-        known = Lyric_Vocabulary.values
+        known = vocabulary_engine.known_numbers('L', since=vocabulary_cutoff())
         prefix = "L-"
         index_col = "Lyric Index"
         no_col = "Lyric no"
@@ -3039,27 +2951,20 @@ async def handle_year_filter(update: Update, context: CallbackContext) -> int:
         tune_col = None
         prefix = "L-"
 
-    def get_last_sung_date(song_code):
-        result = Datefinder(songs=song_code, first=True)
-        if result and len(result) >= 10:
-            try:
-                return datetime.strptime(result[-10:], "%d/%m/%Y")
-            except:
-                return None
-        return None
+    # Songs sung since the start of the year, from the shared vocabulary engine
+    sung_this_year = get_vocabulary_engine(data["df"]).sung_between(datetime(s_year, 1, 1).date())
 
     def group_by_year(item_list):
         sung, not_sung = [], []
         for item in item_list:
             song_code = f"{prefix}{item}"
-            date_obj = get_last_sung_date(song_code)
             # Retrieve index (and tune if hymns) from DataFrame
             index = df[df[no_col] == item][index_col].values[0]
             if theme_type == "hymns":
                 tune = df[df[no_col] == item][tune_col].values[0]
             else:
                 tune = None
-            if date_obj and date_obj.year == s_year:
+            if song_code in sung_this_year:
                 if theme_type == "hymns":
                     sung.append(f"{song_code} - {index}  -{tune}")
                 else:
@@ -3113,12 +3018,12 @@ async def periodic_log_upload():
 
             # Upload logs to Google Drive
             try:
-                upload_log_to_google_doc(st.secrets["BFILE_ID"], "bot_log.txt")
-                upload_log_to_google_doc(st.secrets["UFILE_ID"], "user_log.txt")
+                await run_blocking(upload_log_to_google_doc, st.secrets["BFILE_ID"], "bot_log.txt")
+                await run_blocking(upload_log_to_google_doc, st.secrets["UFILE_ID"], "user_log.txt")
 
                 # Also upload downloader log if it exists
                 if os.path.exists("downloader_log.txt"):
-                    upload_log_to_google_doc(st.secrets["BFILE_ID"], "downloader_log.txt")
+                    await run_blocking(upload_log_to_google_doc, st.secrets["BFILE_ID"], "downloader_log.txt")
                     bot_logger.info("Downloader log uploaded to BFILE_ID")
 
                 # Note: Download logs are directly appended to YFILE_ID Google Doc, no file upload needed
@@ -3171,8 +3076,7 @@ async def handle_song_code(update: Update, context: CallbackContext) -> None:
             # from data.vocabulary import isVocabulary
             if not can_access:
                 # If notation is restricted, show song info without notation
-                Vocabulary = ChoirVocabulary(df, dfH, dfL, dfC)[0]
-                song_info = isVocabulary(user_input, Vocabulary, dfH, dfTH, Tune_finder_of_known_songs)
+                song_info = isVocabulary(user_input, None, dfH, dfTH, Tune_finder_of_known_songs, engine=get_vocabulary_engine(df))
                 # Remove notation block from song_info if present
                 if '🎶 Tune:' in song_info:
                     song_info = song_info.split('🎶 Tune:')[0].strip()
@@ -3190,8 +3094,7 @@ async def handle_song_code(update: Update, context: CallbackContext) -> None:
             # Continue with normal flow if feature check fails
 
     # Get Name/Index info
-    Vocabulary = ChoirVocabulary(df, dfH, dfL, dfC)[0]
-    song_info = isVocabulary(user_input, Vocabulary, dfH, dfTH, Tune_finder_of_known_songs)
+    song_info = isVocabulary(user_input, None, dfH, dfTH, Tune_finder_of_known_songs, engine=get_vocabulary_engine(df))
     if 'was not found' not in song_info:
         response_parts.append(f"🎵 <b>Song Info:</b> {song_info}")
         last_sung = Datefinder(user_input, song_type, first=True)
@@ -3282,9 +3185,9 @@ async def process_comment(update: Update, context: CallbackContext) -> int:
             logging.error("Invalid admin ID in environment variables.")
 
     # Append comment to Google Doc
-    try:
+    def append_comment():
         docs_service = get_docs_service()
-        doc = docs_service.documents().get(documentId=comfile_id).execute()
+        doc = execute_request(docs_service.documents().get(documentId=comfile_id))
         end_index = doc.get("body").get("content")[-1].get("endIndex", 1)
         requests = [{
             "insertText": {
@@ -3292,10 +3195,13 @@ async def process_comment(update: Update, context: CallbackContext) -> int:
                 "text": comment_entry
             }
         }]
-        docs_service.documents().batchUpdate(
+        execute_request(docs_service.documents().batchUpdate(
             documentId=comfile_id,
             body={"requests": requests}
-        ).execute()
+        ))
+
+    try:
+        await run_blocking(append_comment)
         print("✅ Comment successfully send.")
     except Exception as e:
         logging.error(f"❌ Failed to comment: {e}")
@@ -3433,7 +3339,7 @@ async def organist_roster_start(update: Update, context: ContextTypes.DEFAULT_TY
     user_logger.info(f"User {user.id} ({user.first_name}) started /rooster command")
     
     # Get summary statistics
-    summary = get_roster_summary()
+    summary = await run_blocking(get_roster_summary)
     
     # Create main menu keyboard
     keyboard = [
@@ -3503,49 +3409,42 @@ async def rooster_menu_handler(update: Update, context: ContextTypes.DEFAULT_TYP
 
 async def view_full_roster(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Display the full roster table including unassigned songs"""
-    from data.organist_roster import get_full_roster_table, get_unassigned_songs
+    from data.organist_roster import get_roster_model
     
     user = update.effective_user
     
-    # Get the full roster
-    roster_table = get_full_roster_table()
+    # Get the full roster (table lines are rendered once per roster version)
+    model = await run_blocking(get_roster_model)
+    table_lines = model.table_lines
     
-    if not roster_table:
+    if not table_lines:
         await update.message.reply_text(
             "❌ Could not load roster data.",
             reply_markup=ReplyKeyboardRemove()
         )
         return ConversationHandler.END
     
-    # Format table
-    table_lines = []
-    for i, (song, organist) in enumerate(roster_table, 1):
-        table_lines.append(f"{i}. {song} → {organist}")
-    
     table_text = "\n".join(table_lines)
     
     # Get unassigned songs
-    unassigned_songs = get_unassigned_songs()
+    unassigned_lines = model.unassigned_lines
     
     message = (
-        f"📋 *Full Roster Table* ({len(roster_table)} entries)\n\n"
+        f"📋 *Full Roster Table* ({len(table_lines)} entries)\n\n"
         f"{table_text}"
     )
     
     # Split message if too long
     if len(message) > 4000:
         await update.message.reply_text(
-            f"📋 *Full Roster Table* ({len(roster_table)} entries)\n\n",
+            f"📋 *Full Roster Table* ({len(table_lines)} entries)\n\n",
             parse_mode=ParseMode.MARKDOWN,
             reply_markup=ReplyKeyboardRemove()
         )
         # Send in chunks
         chunk_size = 40
-        for i in range(0, len(roster_table), chunk_size):
-            chunk = roster_table[i:i+chunk_size]
-            chunk_lines = [f"{i+j+1}. {song} → {organist}" for j, (song, organist) in enumerate(chunk)]
-            chunk_text = "\n".join(chunk_lines)
-            await update.message.reply_text(chunk_text)
+        for i in range(0, len(table_lines), chunk_size):
+            await update.message.reply_text("\n".join(table_lines[i:i+chunk_size]))
     else:
         await update.message.reply_text(
             message,
@@ -3554,14 +3453,14 @@ async def view_full_roster(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         )
     
     # Show unassigned songs if any
-    if unassigned_songs:
-        unassigned_text = "\n".join([f"{i+1}. {song}" for i, song in enumerate(unassigned_songs)])
+    if unassigned_lines:
+        unassigned_text = "\n".join(unassigned_lines)
         await update.message.reply_text(
-            f"🎹 *Unassigned Songs* ({len(unassigned_songs)} total)\n\n{unassigned_text}",
+            f"🎹 *Unassigned Songs* ({len(unassigned_lines)} total)\n\n{unassigned_text}",
             parse_mode=ParseMode.MARKDOWN
         )
     
-    user_logger.info(f"User {user.id} viewed full roster table ({len(roster_table)} entries)")
+    user_logger.info(f"User {user.id} viewed full roster table ({len(table_lines)} entries)")
     return ConversationHandler.END
 
 
@@ -3572,7 +3471,7 @@ async def filter_by_organist_start(update: Update, context: ContextTypes.DEFAULT
     user = update.effective_user
     
     # Get organist list
-    organists = get_unique_organists()
+    organists = await run_blocking(get_unique_organists)
     
     if not organists:
         await update.message.reply_text(
@@ -3612,7 +3511,7 @@ async def filter_by_organist_start(update: Update, context: ContextTypes.DEFAULT
 
 async def filter_organist_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle organist selection and show their songs"""
-    from data.organist_roster import get_songs_by_organist, get_unassigned_songs
+    from data.organist_roster import get_roster_model
     
     user = update.effective_user
     selection = update.message.text.strip()
@@ -3630,7 +3529,7 @@ async def filter_organist_selected(update: Update, context: ContextTypes.DEFAULT
     
     # Handle unassigned songs
     if selection == "🎹 Unassigned Songs":
-        songs = get_unassigned_songs()
+        songs = (await run_blocking(get_roster_model)).unassigned_lines
         
         if not songs:
             await update.message.reply_text(
@@ -3640,7 +3539,7 @@ async def filter_organist_selected(update: Update, context: ContextTypes.DEFAULT
             return ConversationHandler.END
         
         # Format songs list
-        songs_text = "\n".join([f"{i+1}. {song}" for i, song in enumerate(songs)])
+        songs_text = "\n".join(songs)
         
         message = (
             f"🎹 *Unassigned Songs* ({len(songs)} total)\n\n"
@@ -3657,9 +3556,7 @@ async def filter_organist_selected(update: Update, context: ContextTypes.DEFAULT
             # Send songs in chunks
             chunk_size = 30
             for i in range(0, len(songs), chunk_size):
-                chunk = songs[i:i+chunk_size]
-                chunk_text = "\n".join([f"{i+j+1}. {song}" for j, song in enumerate(chunk)])
-                await update.message.reply_text(chunk_text)
+                await update.message.reply_text("\n".join(songs[i:i+chunk_size]))
         else:
             await update.message.reply_text(
                 message,
@@ -3672,7 +3569,7 @@ async def filter_organist_selected(update: Update, context: ContextTypes.DEFAULT
     
     # Handle specific organist selection
     organist_name = selection
-    songs = get_songs_by_organist(organist_name)
+    songs = (await run_blocking(get_roster_model)).organist_lines.get(organist_name, [])
     
     if not songs:
         await update.message.reply_text(
@@ -3682,7 +3579,7 @@ async def filter_organist_selected(update: Update, context: ContextTypes.DEFAULT
         return ConversationHandler.END
     
     # Format songs list
-    songs_text = "\n".join([f"{i+1}. {song}" for i, song in enumerate(songs)])
+    songs_text = "\n".join(songs)
     
     message = (
         f"🎵 *Songs for {organist_name}* ({len(songs)} total)\n\n"
@@ -3699,9 +3596,7 @@ async def filter_organist_selected(update: Update, context: ContextTypes.DEFAULT
         # Send songs in chunks
         chunk_size = 30
         for i in range(0, len(songs), chunk_size):
-            chunk = songs[i:i+chunk_size]
-            chunk_text = "\n".join([f"{i+j+1}. {song}" for j, song in enumerate(chunk)])
-            await update.message.reply_text(chunk_text)
+            await update.message.reply_text("\n".join(songs[i:i+chunk_size]))
     else:
         await update.message.reply_text(
             message,
@@ -3720,7 +3615,7 @@ async def filter_by_type_start(update: Update, context: ContextTypes.DEFAULT_TYP
     user = update.effective_user
     user_logger.info(f"User {user.id} ({user.first_name}) started Filter by Type")
 
-    available_types = get_unique_types()
+    available_types = await run_blocking(get_unique_types)
 
     if not available_types:
         await update.message.reply_text(
@@ -3768,7 +3663,7 @@ def _build_type_keyboard(available_types: list, selected_types: set, include_org
 
 async def filter_type_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle type toggle presses and the Show Results action"""
-    from data.organist_roster import get_full_roster_table_filtered
+    from data.organist_roster import get_roster_model
 
     user = update.effective_user
     selection = update.message.text.strip()
@@ -3800,7 +3695,8 @@ async def filter_type_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
             return FILTER_TYPE_SELECT
 
         # Fetch filtered roster
-        roster_table = get_full_roster_table_filtered(include_types=list(selected_types))
+        model = await run_blocking(get_roster_model)
+        roster_table = model.filtered_entries(include_types=list(selected_types))
 
         if not roster_table:
             await update.message.reply_text(
@@ -3818,24 +3714,8 @@ async def filter_type_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
             f"({len(roster_table)} entries)\n\n"
         )
 
-        # Group entries under their type heading for readability
-        from collections import defaultdict as _defaultdict
-        groups = _defaultdict(list)
-        for song, organist, rtype in roster_table:
-            groups[rtype].append((song, organist))
-
-        # Display groups in sheet order (not alphabetical)
-        lines = []
-        for rtype in available_types:
-            if rtype not in groups:
-                continue
-            lines.append(f"*{rtype}*")
-            for i, (song, organist) in enumerate(groups[rtype], 1):
-                if include_organist:
-                    lines.append(f"  {i}. {song} → {organist}")
-                else:
-                    lines.append(f"  {i}. {song}")
-            lines.append("")
+        # Entries grouped under their type heading, in sheet order (not alphabetical)
+        lines = model.render_types([t for t in available_types if t in selected_types], include_organist)
 
         body = "\n".join(lines).strip()
         full_message = header + body
@@ -3931,7 +3811,7 @@ async def assign_songs_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return ConversationHandler.END
     
     # Get songs from 'Songs for Sunday' sheet
-    success, songs, message = get_songs_for_assignment()
+    success, songs, message = await run_blocking(get_songs_for_assignment)
     
     if not success:
         await update.message.reply_text(
@@ -3962,6 +3842,7 @@ async def assign_songs_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
             row.append(songs[i + 1])
         keyboard.append(row)
     
+    keyboard.append(["⚡ Auto-Assign All"])
     keyboard.append(["⬅️ Back to Menu", "❌ Cancel"])
     
     reply_markup = ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
@@ -3969,7 +3850,8 @@ async def assign_songs_menu(update: Update, context: ContextTypes.DEFAULT_TYPE)
     message = (
         "🎵 *Assign Songs to Organists*\n\n"
         f"📋 Found {len(songs)} songs for this Sunday:\n\n"
-        "👉 Select a song to assign to an organist:"
+        "👉 Select a song to assign to an organist, or *⚡ Auto-Assign All* "
+        "to get a balanced roster for the next service:"
     )
     
     await update.message.reply_text(
@@ -4052,7 +3934,7 @@ async def view_special_songs(update: Update, context: ContextTypes.DEFAULT_TYPE)
     """Display current special songs (Vestry and Doxology)"""
     from data.organist_roster import get_special_songs
     
-    success, songs, message = get_special_songs()
+    success, songs, message = await run_blocking(get_special_songs)
     
     if not success:
         await update.message.reply_text(
@@ -4112,9 +3994,9 @@ async def show_available_special_songs(update: Update, context: ContextTypes.DEF
     
     # Get available songs based on type
     if song_type == 'Vestry':
-        success, songs, message = get_available_vestry_songs()
+        success, songs, message = await run_blocking(get_available_vestry_songs)
     else:  # Doxology
-        success, songs, message = get_available_doxology_songs()
+        success, songs, message = await run_blocking(get_available_doxology_songs)
     
     if not success:
         await update.message.reply_text(
@@ -4215,7 +4097,7 @@ async def special_song_selected(update: Update, context: ContextTypes.DEFAULT_TY
     context.user_data['selected_special_song_name'] = song_name
     
     # Get organist list
-    organists = get_unique_organists()
+    organists = await run_blocking(get_unique_organists)
     
     if not organists:
         await update.message.reply_text(
@@ -4295,7 +4177,7 @@ async def special_organist_selected(update: Update, context: ContextTypes.DEFAUL
     )
     
     # Update the special song
-    success, message = update_special_song(song_type, song_code, song_name, organist)
+    success, message = await run_blocking(update_special_song, song_type, song_code, song_name, organist)
     
     # Delete the progress message
     try:
@@ -4350,7 +4232,7 @@ async def update_sunday_songs(update: Update, context: ContextTypes.DEFAULT_TYPE
     
     try:
         # Call the update function
-        success, message, date_used = update_songs_for_sunday()
+        success, message, date_used = await run_blocking(update_songs_for_sunday)
         
         if success:
             response = (
@@ -4458,7 +4340,7 @@ async def assign_songs_start(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return ConversationHandler.END
     
     # Get songs from 'Songs for Sunday' sheet
-    success, songs, message = get_songs_for_assignment()
+    success, songs, message = await run_blocking(get_songs_for_assignment)
     
     if not success:
         await update.message.reply_text(
@@ -4536,6 +4418,13 @@ async def assign_song_selected(update: Update, context: ContextTypes.DEFAULT_TYP
         )
         return ASSIGN_SONG_SELECT
     
+    # Handle automatic roster proposal
+    if selected_song == "⚡ Auto-Assign All":
+        return await auto_assign_roster(update, context)
+    
+    if selected_song == "✅ Apply Roster":
+        return await apply_proposed_roster(update, context)
+    
     # Handle "Done" choice
     if selected_song == "✅ Done":
         await update.message.reply_text(
@@ -4565,7 +4454,7 @@ async def assign_song_selected(update: Update, context: ContextTypes.DEFAULT_TYP
     context.user_data['selected_song'] = selected_song.upper()
     
     # Get organist list
-    organists = get_unique_organists()
+    organists = await run_blocking(get_unique_organists)
     
     if not organists:
         await update.message.reply_text(
@@ -4608,6 +4497,89 @@ async def assign_song_selected(update: Update, context: ContextTypes.DEFAULT_TYP
     return ASSIGN_ORGANIST_SELECT
 
 
+async def auto_assign_roster(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Propose organists for every song of the next service and ask to apply them"""
+    from data.roster_optimizer import propose_roster
+    
+    status_msg = await update.message.reply_text(
+        "⏳ Working out a balanced roster...",
+        reply_markup=ReplyKeyboardRemove()
+    )
+    success, proposal, message = await run_blocking(propose_roster)
+    
+    try:
+        await status_msg.delete()
+    except Exception as e:
+        user_logger.warning(f"Could not delete status message: {e}")
+    
+    if not success:
+        await update.message.reply_text(
+            f"❌ Could not propose a roster.\n\n{message}",
+            reply_markup=ReplyKeyboardRemove()
+        )
+        return ConversationHandler.END
+    
+    context.user_data['roster_proposal'] = proposal
+    
+    service_date = proposal['date']
+    lines = [
+        f"{i}. {escape_markdown(str(song))} → {escape_markdown(organist)}"
+        for i, (song, organist) in enumerate(proposal['assignments'], 1)
+    ]
+    loads = ", ".join(
+        f"{escape_markdown(name)} {count}" for name, count in sorted(proposal['service_load'].items(), key=lambda item: (-item[1], item[0]))
+    )
+    keyboard = [["✅ Apply Roster"], ["⬅️ Back to Menu", "❌ Cancel"]]
+    reply_markup = ReplyKeyboardMarkup(keyboard, one_time_keyboard=True, resize_keyboard=True)
+    
+    await update.message.reply_text(
+        f"⚡ *Proposed Roster* — {service_date.strftime('%d/%m/%Y')} ({service_date.strftime('%A')})\n\n"
+        + "\n".join(lines)
+        + f"\n\n👥 Songs per organist: {loads}\n\n"
+        "Press *✅ Apply Roster* to save it to 'Songs for Sunday'.",
+        reply_markup=reply_markup,
+        parse_mode=ParseMode.MARKDOWN
+    )
+    
+    user_logger.info(
+        f"User {update.effective_user.id} got a roster proposal for {service_date} "
+        f"({len(lines)} songs, solved in {proposal['solve_ms']:.1f} ms)"
+    )
+    return ASSIGN_SONG_SELECT
+
+
+async def apply_proposed_roster(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    """Write the roster proposed by auto_assign_roster in one batched update"""
+    from data.organist_roster import apply_roster_assignments
+    
+    proposal = context.user_data.pop('roster_proposal', None)
+    if not proposal:
+        await update.message.reply_text(
+            "❌ No roster proposal to apply. Choose *⚡ Auto-Assign All* first.",
+            reply_markup=ReplyKeyboardRemove(),
+            parse_mode=ParseMode.MARKDOWN
+        )
+        return ConversationHandler.END
+    
+    status_msg = await update.message.reply_text(
+        "⏳ Saving roster...",
+        reply_markup=ReplyKeyboardRemove()
+    )
+    success, message = await run_blocking(apply_roster_assignments, proposal['assignments'])
+    
+    if success:
+        await status_msg.edit_text(
+            f"✅ *Roster Saved!*\n\n📅 Date: {proposal['date'].strftime('%d/%m/%Y')}\n{message}",
+            parse_mode=ParseMode.MARKDOWN
+        )
+        user_logger.info(f"User {update.effective_user.id} applied roster for {proposal['date']}")
+    else:
+        await status_msg.edit_text(f"❌ *Update Failed*\n\n{message}", parse_mode=ParseMode.MARKDOWN)
+        user_logger.error(f"User {update.effective_user.id} failed to apply roster: {message}")
+    
+    return ConversationHandler.END
+
+
 async def assign_organist_selected(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle organist selection - assign song and confirm"""
     from data.organist_roster import assign_song_to_organist
@@ -4654,7 +4626,7 @@ async def assign_organist_selected(update: Update, context: ContextTypes.DEFAULT
     )
     
     # Assign the song
-    success, message = assign_song_to_organist(selected_song, selected_organist)
+    success, message = await run_blocking(assign_song_to_organist, selected_song, selected_organist)
     
     if success:
         # Get song name for display
@@ -4913,65 +4885,17 @@ async def unused_category_selected(update: Update, context: ContextTypes.DEFAULT
     try:
         # Get unused songs using the COMPUTED vocabulary (songs actually sung)
         from data.datasets import get_all_data
-        from data.vocabulary import ChoirVocabulary
+        from data.vocabulary import get_vocabulary_engine, find_unused_songs, unused_songs_to_excel
         
         data = get_all_data()
         df = data["df"]
-        dfH = data["dfH"]
-        dfL = data["dfL"]
-        dfC = data["dfC"]
         
         if df is None or df.empty:
             await status_msg.edit_text("❌ Database is empty or unavailable.")
             return ConversationHandler.END
         
-        # Get the computed vocabulary (songs that have actually been sung)
-        Vocabulary, Hymn_Vocabulary, Lyric_Vocabulary, Convention_Vocabulary = ChoirVocabulary(df, dfH, dfL, dfC)
-        
-        # Ensure Date column is datetime
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.date
-        df = df.dropna(subset=['Date'])
-        
-        # Filter to only rows after cutoff date
-        recent_df = df[df['Date'] >= cutoff_date]
-        
-        # Get vocabulary for each requested category and check against recent data
-        unused_songs = {}
-        
-        for category in categories:
-            if category == 'H':
-                # Use computed hymn vocabulary (songs actually sung in history)
-                all_songs = [f"H-{int(num)}" for num in Hymn_Vocabulary if pd.notna(num)]
-                category_name = "Hymns"
-            elif category == 'L':
-                # Use computed lyric vocabulary (songs actually sung in history)
-                all_songs = [f"L-{int(num)}" for num in Lyric_Vocabulary if pd.notna(num)]
-                category_name = "Lyrics"
-            elif category == 'C':
-                # Use computed convention vocabulary (songs actually sung in history)
-                all_songs = [f"C-{int(num)}" for num in Convention_Vocabulary if pd.notna(num)]
-                category_name = "Conventions"
-            
-            # Check each song in vocabulary against recent database
-            unused = []
-            for song_code in all_songs:
-                # Check if song appears anywhere in the recent dataframe
-                # Standardize both the song code and dataframe values for comparison
-                found = False
-                for col in recent_df.columns:
-                    if col != 'Date':
-                        # Standardize each cell value before comparison
-                        standardized_values = recent_df[col].astype(str).apply(lambda x: standardize_hlc_value(x))
-                        if (standardized_values == song_code).any():
-                            found = True
-                            break
-                
-                if not found:
-                    unused.append(song_code)
-            
-            # Sort by number
-            unused = sorted(unused, key=lambda x: int(x.split('-')[1]))
-            unused_songs[category_name] = unused
+        # Vocabulary minus the songs sung since the cutoff, in one pass per category
+        unused_songs = find_unused_songs(get_vocabulary_engine(df), cutoff_date, categories)
         
         # Create response
         total_unused = sum(len(songs) for songs in unused_songs.values())
@@ -5026,42 +4950,30 @@ async def unused_category_selected(update: Update, context: ContextTypes.DEFAULT
                 for msg in category_messages:
                     await update.message.reply_text(msg, parse_mode=ParseMode.MARKDOWN)
         
-        # If too many songs, also offer CSV export
+        # If too many songs, also offer Excel export
         if total_unused > 50:
-            # Create CSV file with Malayalam index
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv', encoding='utf-8') as f:
-                f.write("Category,Song Code,Malayalam Index\n")
-                for category_name, songs in unused_songs.items():
-                    for song in songs:
-                        index = IndexFinder(song)
-                        f.write(f"{category_name},{song},{index}\n")
-                temp_file = f.name
+            excel_file = unused_songs_to_excel(unused_songs, IndexFinder)
             
             # Send file - use try/except for edit
             try:
                 await status_msg.edit_text(
                     f"✅ Found {total_unused} unused songs!\n\n"
-                    f"Sending as CSV file...",
+                    f"Sending as Excel file...",
                     parse_mode=ParseMode.MARKDOWN
                 )
             except Exception:
                 # If edit fails, send new message
                 await update.message.reply_text(
                     f"✅ Found {total_unused} unused songs!\n\n"
-                    f"Sending as CSV file...",
+                    f"Sending as Excel file...",
                     parse_mode=ParseMode.MARKDOWN
                 )
             
-            with open(temp_file, 'rb') as f:
-                await update.message.reply_document(
-                    document=f,
-                    filename=f"unused_songs_{duration_label.replace(' ', '_')}.csv",
-                    caption=f"📋 Unused {category_label} (not sung in {duration_label})"
-                )
-            
-            # Clean up
-            os.remove(temp_file)
+            await update.message.reply_document(
+                document=excel_file,
+                filename=f"unused_songs_{duration_label.replace(' ', '_')}.xlsx",
+                caption=f"📋 Unused {category_label} (not sung in {duration_label})"
+            )
         
         user_logger.info(f"User {update.effective_user.id} generated unused songs report: {category_label}, {duration_label}, {total_unused} songs")
         
@@ -5290,7 +5202,8 @@ async def upload_complete(update: Update, context: ContextTypes.DEFAULT_TYPE, st
         from data.sheet_upload import upload_file_to_drive
         
         # Upload to Drive
-        success, message_text = upload_file_to_drive(
+        success, message_text = await run_blocking(
+            upload_file_to_drive,
             file_path=file_path,
             original_filename=file_name,
             uploader_name=user.full_name or user.first_name or f"User{user.id}",
@@ -8,8 +8,9 @@ from config import get_config
 from logging_utils import setup_loggers
 from data.datasets import load_datasets, yrDataPreprocessing, dfcleaning, standardize_song_columns, get_all_data, Tune_finder_of_known_songs, Datefinder, IndexFinder
 from data.drive import upload_log_to_google_doc
+from data.google_async import run_blocking
 from data.vocabulary import standardize_hlc_value, isVocabulary, ChoirVocabulary
-from data.udb import track_user_interaction, user_exists, get_user_by_id, save_user_database, track_user_fast, save_if_pending, get_user_bible_language, get_user_show_tunes_in_date
+from data.udb import track_user_interaction, user_exists, get_user_by_id, track_user_fast, save_if_pending, get_user_bible_language, get_user_show_tunes_in_date
 from telegram_handlers.utils import get_wordproject_url_from_input, extract_bible_chapter_text, clean_bible_text
 import pandas as pd
 from datetime import date, timezone, timedelta
@@ -67,17 +68,7 @@ async def start(update: Update, context: CallbackContext) -> None:
         if tracking_success:
             if is_new_user:
                 user_logger.info(f"Added new user {user.id} to database")
-                
-                # For new users, immediately save to Database
-                try:
-                    from data.udb import save_user_database
-                    save_success = save_user_database()
-                    if save_success:
-                        user_logger.info(f"Successfully saved new user {user.id} to Database")
-                    else:
-                        user_logger.warning(f"Failed to save new user {user.id} to Database")
-                except Exception as save_error:
-                    user_logger.error(f"Error saving new user {user.id} to Database: {save_error}")
+                # Journaled locally; the background flusher writes it to the sheet
 
                 # Notify admin about new user (async, don't wait)
                 asyncio.create_task(context.bot.send_message(
@@ -248,7 +239,7 @@ async def help_command(update: Update, context: CallbackContext) -> None:
 async def refresh_command(update: Update, context: CallbackContext) -> None:
     # Move imports here to avoid circular import
     import telegram_handlers.conversations as conversations
-    from telegram_handlers.conversations import fetch_lyrics_file_map, LYRICS_FOLDER_URL
+    from data.folder_index import sync_all_folder_indexes
     from data.udb import save_if_pending, load_user_database
 
     user = update.effective_user
@@ -293,30 +284,27 @@ async def refresh_command(update: Update, context: CallbackContext) -> None:
         # Save any pending user database changes before refresh
         msg2 = await update.message.reply_text("💾 Saving pending database changes...")
         progress_messages.append(msg2.message_id)
-        save_success = save_if_pending()
+        save_success = await run_blocking(save_if_pending, force=True)
         if save_success:
             user_logger.info("User database changes saved during refresh")
 
         # Reload datasets
         msg3 = await update.message.reply_text("📊 Reloading datasets...")
         progress_messages.append(msg3.message_id)
-        dfH, dfL, dfC, year_data, df, dfTH, dfTD = load_datasets()
+        dfH, dfL, dfC, year_data, df, dfTH, dfTD = await run_blocking(load_datasets)
         yrDataPreprocessing()
         dfcleaning()
         standardize_song_columns()  # Now modifies global df in-place
 
-        # Refresh lyrics_file_map
-        msg4 = await update.message.reply_text("🎵 Refreshing lyrics file map...")
+        # Apply notation folder changes since the last sync (maps update in place)
+        msg4 = await update.message.reply_text("🎵 Refreshing notation file maps...")
         progress_messages.append(msg4.message_id)
-        conversations.lyrics_file_map = fetch_lyrics_file_map(LYRICS_FOLDER_URL)
+        await run_blocking(sync_all_folder_indexes)
 
         # Reload user database to get latest changes from Google Drive
         msg5 = await update.message.reply_text("👥 Reloading database...")
         progress_messages.append(msg5.message_id)
-        global user_db
-        from data.udb import user_db
-        user_db = None  # Clear cache
-        load_user_database()  # Reload from Google Drive
+        await run_blocking(load_user_database, from_sheet=True)  # Pull manual sheet edits into the local store
 
         # Clear theme caches to ensure fresh data
         msg6 = await update.message.reply_text("🎯 Refreshing theme components...")
@@ -331,7 +319,7 @@ async def refresh_command(update: Update, context: CallbackContext) -> None:
         msg6a = await update.message.reply_text("📋 Reloading organist roster...")
         progress_messages.append(msg6a.message_id)
         from data.organist_roster import reload_organist_roster
-        roster_reloaded = reload_organist_roster()
+        roster_reloaded = await run_blocking(reload_organist_roster)
         if roster_reloaded:
             user_logger.info("Organist roster reloaded successfully")
         else:
@@ -340,8 +328,8 @@ async def refresh_command(update: Update, context: CallbackContext) -> None:
         # Upload logs
         msg7 = await update.message.reply_text("📝 .......")
         progress_messages.append(msg7.message_id)
-        upload_log_to_google_doc(config.BFILE_ID, "bot_log.txt")
-        upload_log_to_google_doc(config.UFILE_ID, "user_log.txt")
+        await run_blocking(upload_log_to_google_doc, config.BFILE_ID, "bot_log.txt")
+        await run_blocking(upload_log_to_google_doc, config.UFILE_ID, "user_log.txt")
 
         # Send final success message
         await update.message.reply_text("✅ All components refreshed successfully!")
@@ -436,6 +424,13 @@ async def sync_status_command(update: Update, context: CallbackContext) -> None:
         syncing = [f for f, is_syncing in status['sync_in_progress'].items() if is_syncing]
         if syncing:
             status_text += f"\n⏳ **Currently Syncing:** {', '.join(syncing)}\n"
+
+        queue = status.get('reload_queue', {})
+        if queue:
+            status_text += (
+                f"\n**Reload Queue:** {queue['queue_depth']} pending"
+                f" ({queue['events']} changes → {queue['reloads']} reloads, {queue['coalesced']} merged)\n"
+            )
         
         await update.message.reply_text(status_text, parse_mode="Markdown")
         
@@ -605,13 +600,38 @@ async def sync_info_command(update: Update, context: CallbackContext) -> None:
                     info_text += f"• {file_name}: {sync_time}\n"
             info_text += "\n"
         
-        # Performance summary
+        # Measured pipeline performance (rolling window)
+        metrics = status.get('metrics', {})
+        histograms = metrics.get('histograms', {})
+        counters = metrics.get('counters', {})
+
+        def _pct(name, scale=1.0, unit="s"):
+            snap = histograms.get(name, {})
+            if not snap.get('samples'):
+                return "n/a"
+            return (f"p50 {snap['p50'] * scale:.1f}{unit} · p90 {snap['p90'] * scale:.1f}{unit}"
+                    f" · max {snap['max'] * scale:.1f}{unit} ({snap['samples']})")
+
+        info_text += f"**⚡ Performance (measured)**\n"
+        for source in ('polling', 'changes'):
+            if f"sync_detection_latency_seconds[{source}]" in histograms:
+                info_text += f"• Edit → detected ({source}): {_pct(f'sync_detection_latency_seconds[{source}]')}\n"
         info_text += (
-            f"**⚡ Performance**\n"
-            f"• Memory: ~1MB (cache files)\n"
-            f"• CPU: Negligible (~0%)\n"
-            f"• Network: ~{monitored * 5}KB per check\n\n"
+            f"• Detected → reloaded: {_pct('sync_reload_latency_seconds')}\n"
+            f"• Reload wall time: {_pct('sync_reload_wall_seconds')}\n"
+            f"• Reload CPU time: {_pct('sync_reload_cpu_seconds')}\n"
+            f"• Reload download: {_pct('sync_reload_bytes', 1 / 1024 / 1024, 'MB')}\n"
+            f"• Downloaded total: {counters.get('sync_bytes_downloaded_total', 0) / 1024 / 1024:.1f}MB\n"
         )
+        api_calls = {k[len('sync_api_calls_total['):-1]: v for k, v in counters.items()
+                     if k.startswith('sync_api_calls_total[')}
+        if api_calls:
+            info_text += "• API calls: " + ", ".join(f"{kind} {int(n):,}" for kind, n in sorted(api_calls.items())) + "\n"
+        staleness = metrics.get('staleness', {})
+        if staleness:
+            oldest_name, oldest_age = max(staleness.items(), key=lambda item: item[1])
+            info_text += f"• Stalest data: {oldest_name} ({oldest_age / 60:.0f} min old)\n"
+        info_text += "\n"
         
         # Quick recommendations
         info_text += f"**💡 Quick Actions**\n"
@@ -1105,10 +1125,9 @@ async def check_song_input(update: Update, context: CallbackContext) -> int:
         return ENTER_SONG
 
     # Prepare arguments for isVocabulary
-    from data.vocabulary import ChoirVocabulary
+    from data.vocabulary import get_vocabulary_engine
     from data.datasets import df, dfH, dfL, dfC, dfTH, Tune_finder_of_known_songs
-    Vocabulary = ChoirVocabulary(df, dfH, dfL, dfC)[0]
-    result = isVocabulary(user_input, Vocabulary, dfH, dfTH, Tune_finder_of_known_songs)
+    result = isVocabulary(user_input, None, dfH, dfTH, Tune_finder_of_known_songs, engine=get_vocabulary_engine(df))
 
     # Fetch song name
     song_name = None
@@ -1375,10 +1394,9 @@ async def handle_song_code(update: Update, context: CallbackContext) -> None:
         )
         return
 
-    from data.vocabulary import ChoirVocabulary
+    from data.vocabulary import get_vocabulary_engine
     from data.datasets import df, dfH, dfL, dfC, dfTH, Tune_finder_of_known_songs
-    Vocabulary = ChoirVocabulary(df, dfH, dfL, dfC)[0]
-    result = isVocabulary(user_input, Vocabulary, dfH, dfTH, Tune_finder_of_known_songs)
+    result = isVocabulary(user_input, None, dfH, dfTH, Tune_finder_of_known_songs, engine=get_vocabulary_engine(df))
 
     # Fetch song name
     song_name = None
@@ -1791,7 +1809,7 @@ async def admin_save_database(update: Update, context: CallbackContext) -> None:
         await update.message.reply_text("💾 Saving user database to Google Drive...")
 
         # Use save_if_pending for efficiency
-        success = save_if_pending()
+        success = await run_blocking(save_if_pending, force=True)
 
         if success:
             await update.message.reply_text("✅ User database saved successfully to Google Drive!")
@@ -1919,7 +1937,7 @@ async def admin_add_authorized_user(update: Update, context: CallbackContext) ->
             return
 
         # Add user to authorized list
-        success = set_user_authorization(target_user_id, authorized=True)
+        success = await run_blocking(set_user_authorization, target_user_id, authorized=True)
 
         if success:
             name = user_info.get('name', 'Unknown')
@@ -1990,7 +2008,7 @@ async def admin_remove_authorized_user(update: Update, context: CallbackContext)
             return
 
         # Remove user from authorized list
-        success = set_user_authorization(target_user_id, authorized=False)
+        success = await run_blocking(set_user_authorization, target_user_id, authorized=False)
 
         if success:
             # Get user info if available
@@ -3128,9 +3146,10 @@ async def admin_debug_features(update: Update, context: CallbackContext) -> None
 
         feature_controller = get_feature_controller()
 
-        # Force reload from Google Drive (bypass cache)
-        feature_controller._cache = None
+        # Read straight from Google Drive (bypasses the local store)
         df = feature_controller._load_from_drive()
+        if df is None:
+            df = feature_controller._create_default_dataframe()
 
         debug_text = "🔍 **Feature Loading Debug Results**\n\n"
         debug_text += f"**Data Source:** Google Drive\n"
@@ -3294,7 +3313,7 @@ async def admin_add_missing_features(update: Update, context: CallbackContext) -
         feature_controller = get_feature_controller()
 
         # Get current data
-        df = feature_controller._load_from_drive()
+        df = feature_controller._load()
         existing_features = df['feature_name'].tolist() if 'feature_name' in df.columns else []
 
         # Define new features to add
@@ -3478,8 +3497,8 @@ async def admin_add_missing_features(update: Update, context: CallbackContext) -
         new_rows_df = pd.DataFrame(features_to_add)
         updated_df = pd.concat([df, new_rows_df], ignore_index=True)
 
-        # Save to Google Drive
-        if feature_controller._save_to_drive(updated_df):
+        # Save locally (replicated to Google Drive in the background)
+        if feature_controller._save(updated_df):
             # Clear cache to force reload
             feature_controller._cache = None
 
@@ -3686,8 +3705,8 @@ async def admin_restore_all_features(update: Update, context: CallbackContext) -
         # Create complete DataFrame
         complete_df = pd.DataFrame(all_features_data)
 
-        # Save to Google Drive (replace entire sheet)
-        if feature_controller._save_to_drive(complete_df):
+        # Save locally, replacing the entire table (replicated to Google Drive in the background)
+        if feature_controller._save(complete_df):
             # Clear cache to force reload
             feature_controller._cache = None
 
@@ -3888,8 +3907,8 @@ async def execute_theme_search(update: Update, context: CallbackContext, theme_q
     Searches for songs by theme across hymns or lyrics.
     """
     from data.datasets import get_all_data, IndexFinder
-    from data.vocabulary import ChoirVocabulary
-    from telegram_handlers.conversations import get_theme_model, get_theme_embeddings, find_similar_themes, get_vocabulary_cache
+    from data.vocabulary import get_vocabulary_engine, vocabulary_cutoff
+    from telegram_handlers.conversations import get_theme_model, get_theme_embeddings, find_similar_themes
     from sklearn.metrics.pairwise import cosine_similarity
     
     theme_query = theme_query.strip()
@@ -3908,7 +3927,7 @@ async def execute_theme_search(update: Update, context: CallbackContext, theme_q
         return
     
     # Get vocabulary
-    _, Hymn_Vocabulary, Lyric_Vocabulary, _ = get_vocabulary_cache()
+    vocabulary_engine = get_vocabulary_engine(data.get('df'))
     
     # Determine which type to search (default to both)
     search_hymns = theme_type is None or theme_type.lower() in ['hymns', 'hymn', 'h']
@@ -3924,7 +3943,7 @@ async def execute_theme_search(update: Update, context: CallbackContext, theme_q
         
         if matched_themes:
             filtered_df = dfH[dfH["Themes"].apply(lambda x: any(t in str(x) for t in matched_themes))]
-            known = Hymn_Vocabulary.values
+            known = vocabulary_engine.known_numbers('H', since=vocabulary_cutoff())
             
             # Get songs that are in vocabulary (known songs)
             hymn_results = []
@@ -3947,7 +3966,7 @@ async def execute_theme_search(update: Update, context: CallbackContext, theme_q
         
         if matched_themes:
             filtered_df = dfL[dfL["Themes"].apply(lambda x: any(t in str(x) for t in matched_themes))]
-            known = Lyric_Vocabulary.values
+            known = vocabulary_engine.known_numbers('L', since=vocabulary_cutoff())
             
             # Get songs that are in vocabulary (known songs)
             lyric_results = []
@@ -4026,7 +4045,7 @@ async def execute_notation(update: Update, context: CallbackContext, song_code:
             from telegram_handlers.conversations import Music_notation_downloader, file_map
             import os
             
-            notation_results = Music_notation_downloader(hymn_no, file_map)
+            notation_results = await run_blocking(Music_notation_downloader, hymn_no, file_map)
             
             # Check if there was an error loading data
             if "error" in notation_results:
@@ -4138,7 +4157,8 @@ async def execute_notation(update: Update, context: CallbackContext, song_code:
     
     # Handle lyrics - ALREADY checks database first
     elif song_code.startswith("L-"):
-        from telegram_handlers.conversations import get_lyrics_pdf_by_lyric_number, lyrics_file_map, DOWNLOAD_DIR
+        from telegram_handlers.conversations import get_lyrics_pdf_by_lyric_number, get_lyrics_content_key, lyrics_file_map, DOWNLOAD_DIR
+        from telegram_handlers.utils import send_cached_media
         from data.sheet_upload import search_uploaded_file_by_lyric, download_uploaded_file
         import os
         
@@ -4146,10 +4166,18 @@ async def execute_notation(update: Update, context: CallbackContext, song_code:
         downloading_msg = await update.message.reply_text("⏳ Downloading music sheet... Please wait.")
 
         try:
-            # First, try to get from main lyrics database
-            pdf_path = get_lyrics_pdf_by_lyric_number(lyric_number, lyrics_file_map)
+            # First, try to get from main lyrics database (reusing an earlier upload when possible)
+            content_key = get_lyrics_content_key(lyric_number, lyrics_file_map)
+            sent_from_cache = await send_cached_media(
+                update.message.reply_document, 'document', content_key,
+                filename=f"{song_code}.pdf",
+                caption=f"🎵 Here is the notation for {song_code}."
+            )
+            pdf_path = None if sent_from_cache else await run_blocking(get_lyrics_pdf_by_lyric_number, lyric_number, lyrics_file_map)
 
-            if pdf_path and os.path.exists(pdf_path):
+            if sent_from_cache:
+                await downloading_msg.delete()
+            elif pdf_path and os.path.exists(pdf_path):
                 # Found in main database
                 await downloading_msg.delete()
                 
@@ -4158,12 +4186,11 @@ async def execute_notation(update: Update, context: CallbackContext, song_code:
                 if file_size > 50 * 1024 * 1024:  # 50MB limit for Telegram
                     await update.message.reply_text(f"❌ PDF file for {song_code} is too large to send via Telegram.")
                 else:
-                    with open(pdf_path, 'rb') as pdf_file:
-                        await update.message.reply_document(
-                            document=pdf_file,
-                            filename=f"{song_code}.pdf",
-                            caption=f"🎵 Here is the notation for {song_code}."
-                        )
+                    await send_cached_media(
+                        update.message.reply_document, 'document', content_key, pdf_path,
+                        filename=f"{song_code}.pdf",
+                        caption=f"🎵 Here is the notation for {song_code}."
+                    )
                     # Clean up the downloaded file after sending
                     try:
                         os.remove(pdf_path)
@@ -4173,14 +4200,14 @@ async def execute_notation(update: Update, context: CallbackContext, song_code:
                 # Not found in main database - search in upload folder
                 await downloading_msg.edit_text("⏳ Not found in main database. Searching uploaded files...")
                 
-                found, file_id, filename = search_uploaded_file_by_lyric(lyric_number)
+                found, file_id, filename = await run_blocking(search_uploaded_file_by_lyric, lyric_number)
                 
                 if found:
                     # Found in upload folder - download and send it
                     await downloading_msg.edit_text(f"✅ Found in uploads: {filename}\n⏳ Downloading...")
                     
                     # Download from upload folder
-                    upload_pdf_path = download_uploaded_file(file_id, filename, DOWNLOAD_DIR)
+                    upload_pdf_path = await run_blocking(download_uploaded_file, file_id, filename, DOWNLOAD_DIR)
                     
                     if upload_pdf_path and os.path.exists(upload_pdf_path):
                         await downloading_msg.delete()
@@ -4438,7 +4465,7 @@ async def list_uploads_command(update: Update, context: CallbackContext) -> None
         
         status_msg = await update.message.reply_text("📂 Loading uploaded files...")
         
-        file_list = list_uploaded_files(limit=10)
+        file_list = await run_blocking(list_uploaded_files, limit=10)
         
         await status_msg.edit_text(file_list, parse_mode="Markdown", disable_web_page_preview=True)
         user_logger.info(f"User {user.id} ({user.full_name}) listed uploaded files")
@@ -4588,7 +4615,7 @@ async def update_notation_status_command(update: Update, context: CallbackContex
         # Get all available lyric numbers from BOTH sources in just 2 fast API calls
         await status_msg.edit_text("🔄 Scanning notation database and upload folder...")
         from data.sheet_upload import get_all_available_lyric_numbers
-        all_available, from_uploads, from_notation_db = get_all_available_lyric_numbers()
+        all_available, from_uploads, from_notation_db = await run_blocking(get_all_available_lyric_numbers)
         
         if not all_available:
             msg = "📁 No lyric files found in either notation database or upload folder.\n\n"
@@ -4786,6 +4813,23 @@ async def midi_command(update: Update, context: CallbackContext) -> None:
                 )
                 return
             
+            from telegram_handlers.utils import send_cached_media
+
+            # The same MIDI file was converted before: resend the stored video
+            video_key = f"midi:{document.file_unique_id}"
+            if await send_cached_media(
+                update.message.reply_video, 'video', video_key,
+                caption=(
+                    f"🎹 <b>Synthesia Video Generated!</b>\n\n"
+                    f"📄 File: {document.file_name}\n\n"
+                    f"Enjoy your piano visualization! 🎵"
+                ),
+                parse_mode="HTML",
+                supports_streaming=True
+            ):
+                user_logger.info(f"Sent cached MIDI video for user {user.id}: {document.file_name}")
+                return
+
             # Send processing message
             status_msg = await update.message.reply_text(
                 "🎹 Processing your MIDI file...\n"
@@ -4875,19 +4919,18 @@ async def midi_command(update: Update, context: CallbackContext) -> None:
                     )
                     return
                 
-                # Send the video
-                with open(output_video_path, 'rb') as video_file:
-                    await update.message.reply_video(
-                        video=video_file,
-                        caption=(
-                            f"🎹 <b>Synthesia Video Generated!</b>\n\n"
-                            f"📄 File: {document.file_name}\n"
-                            f"📊 Video Size: {video_size / (1024*1024):.2f} MB\n\n"
-                            f"Enjoy your piano visualization! 🎵"
-                        ),
-                        parse_mode="HTML",
-                        supports_streaming=True
-                    )
+                # Send the video and remember its file_id for repeat conversions
+                await send_cached_media(
+                    update.message.reply_video, 'video', video_key, output_video_path,
+                    caption=(
+                        f"🎹 <b>Synthesia Video Generated!</b>\n\n"
+                        f"📄 File: {document.file_name}\n"
+                        f"📊 Video Size: {video_size / (1024*1024):.2f} MB\n\n"
+                        f"Enjoy your piano visualization! 🎵"
+                    ),
+                    parse_mode="HTML",
+                    supports_streaming=True
+                )
                 
                 await status_msg.edit_text(
                     "✅ <b>Complete!</b>\n\n"
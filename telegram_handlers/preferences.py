@@ -12,7 +12,7 @@ from data.udb import (
     get_user_show_tunes_in_date, update_user_show_tunes_in_date,
     get_user_upload_skip_filename, update_user_upload_skip_filename,
     get_user_upload_skip_description, update_user_upload_skip_description,
-    track_user_fast, save_if_pending
+    track_user_fast
 )
 from config import get_config
 from logging_utils import setup_loggers
@@ -283,7 +283,6 @@ async def bible_language_handler(update: Update, context: CallbackContext) -> in
     if user_input == "🇮🇳 Malayalam":
         success = update_user_bible_language(user.id, 'malayalam')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Bible language set to *Malayalam*.\n\n"
                 "All Bible verses will now be displayed in Malayalam by default.",
@@ -301,7 +300,6 @@ async def bible_language_handler(update: Update, context: CallbackContext) -> in
     elif user_input == "🇺🇸 English":
         success = update_user_bible_language(user.id, 'english')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Bible language set to *English*.\n\n"
                 "All Bible verses will now be displayed in English by default.",
@@ -341,7 +339,6 @@ async def game_language_handler(update: Update, context: CallbackContext) -> int
     if user_input == "🇮🇳 Malayalam":
         success = update_user_game_language(user.id, 'malayalam')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Bible game language set to *Malayalam*.\n\n"
                 "All Bible games will now use Malayalam by default.",
@@ -359,7 +356,6 @@ async def game_language_handler(update: Update, context: CallbackContext) -> int
     elif user_input == "🇺🇸 English":
         success = update_user_game_language(user.id, 'english')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Bible game language set to *English*.\n\n"
                 "All Bible games will now use English by default.",
@@ -399,7 +395,6 @@ async def download_preference_handler(update: Update, context: CallbackContext)
     if user_input == "🎵 Single Video Only":
         success = update_user_download_preference(user.id, 'single')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Download behavior set to *Single Video Only*.\n\n"
                 "When you share playlist links, only the specific video will be downloaded automatically. "
@@ -418,7 +413,6 @@ async def download_preference_handler(update: Update, context: CallbackContext)
     elif user_input == "❓ Ask Every Time":
         success = update_user_download_preference(user.id, 'ask')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Download behavior set to *Ask Every Time*.\n\n"
                 "When you share playlist links, you'll be asked whether to download the single video or entire playlist.",
@@ -458,7 +452,6 @@ async def download_quality_handler(update: Update, context: CallbackContext) ->
     if user_input == "🔥 High Quality":
         success = update_user_download_quality(user.id, 'high')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Download quality set to *High Quality (320kbps)*.\n\n"
                 "All downloads will use the highest quality audio. "
@@ -477,7 +470,6 @@ async def download_quality_handler(update: Update, context: CallbackContext) ->
     elif user_input == "🎵 Medium Quality":
         success = update_user_download_quality(user.id, 'medium')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Download quality set to *Medium Quality (192kbps)*.\n\n"
                 "All downloads will use balanced quality. "
@@ -496,7 +488,6 @@ async def download_quality_handler(update: Update, context: CallbackContext) ->
     elif user_input == "💾 Low Quality":
         success = update_user_download_quality(user.id, 'low')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Download quality set to *Low Quality (128kbps)*.\n\n"
                 "All downloads will use lower quality audio. "
@@ -515,7 +506,6 @@ async def download_quality_handler(update: Update, context: CallbackContext) ->
     elif user_input == "❓ Ask Every Time":
         success = update_user_download_quality(user.id, 'ask')
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Download quality set to *Ask Every Time*.\n\n"
                 "You'll be asked to choose the quality for each download.",
@@ -559,7 +549,6 @@ async def search_limit_handler(update: Update, context: CallbackContext) -> int:
         if 1 <= limit <= 50:
             success = update_user_preference(user.id, 'search_results_limit', limit)
             if success:
-                save_if_pending()
                 await update.message.reply_text(
                     f"✅ Search results limit set to *{limit}*.\n\n"
                     f"Search commands will now show up to {limit} results.",
@@ -594,7 +583,6 @@ async def tune_display_handler(update: Update, context: CallbackContext) -> int:
     if user_input == "✅ Show Tunes":
         success = update_user_show_tunes_in_date(user.id, True)
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Tune display set to *Show Tunes*.\n\n"
                 "When you use the `/date` command, tune names will be displayed along with song information.",
@@ -612,7 +600,6 @@ async def tune_display_handler(update: Update, context: CallbackContext) -> int:
     elif user_input == "❌ Hide Tunes":
         success = update_user_show_tunes_in_date(user.id, False)
         if success:
-            save_if_pending()  # Save changes immediately
             await update.message.reply_text(
                 "✅ Tune display set to *Hide Tunes*.\n\n"
                 "When you use the `/date` command, only song codes and titles will be displayed.",
@@ -651,7 +638,6 @@ async def upload_preference_handler(update: Update, context: CallbackContext) ->
     if user_input == "Ask All":
         update_user_upload_skip_filename(user.id, False)
         update_user_upload_skip_description(user.id, False)
-        save_if_pending()
         await update.message.reply_text(
             "✅ Upload preference set to *Ask All*.\n\n"
             "The bot will ask for both filename and description when you upload.",
@@ -664,7 +650,6 @@ async def upload_preference_handler(update: Update, context: CallbackContext) ->
     elif user_input == "Skip Filename":
         update_user_upload_skip_filename(user.id, True)
         update_user_upload_skip_description(user.id, False)
-        save_if_pending()
         await update.message.reply_text(
             "✅ Upload preference set to *Skip Filename*.\n\n"
             "The bot will use the original filename and ask for description.",
@@ -677,7 +662,6 @@ async def upload_preference_handler(update: Update, context: CallbackContext) ->
     elif user_input == "Skip Description":
         update_user_upload_skip_filename(user.id, False)
         update_user_upload_skip_description(user.id, True)
-        save_if_pending()
         await update.message.reply_text(
             "✅ Upload preference set to *Skip Description*.\n\n"
             "The bot will ask for filename but skip description.",
@@ -690,7 +674,6 @@ async def upload_preference_handler(update: Update, context: CallbackContext) ->
     elif user_input == "Skip Both":
         update_user_upload_skip_filename(user.id, True)
         update_user_upload_skip_description(user.id, True)
-        save_if_pending()
         await update.message.reply_text(
             "✅ Upload preference set to *Skip Both*.\n\n"
             "The bot will use original filename and skip description prompt.",
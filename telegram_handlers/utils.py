@@ -5,6 +5,35 @@ import requests
 from bs4 import BeautifulSoup
 import re
 from rapidfuzz import fuzz
+from telegram.error import BadRequest
+from data.telegram_file_cache import get_telegram_file_cache
+
+async def send_cached_media(send, media_kwarg, key, file_path=None, remember=(), **kwargs):
+    """
+    Sends media through a Telegram send method (e.g. update.message.reply_document),
+    reusing the file_id cached for `key` when there is one. Otherwise uploads
+    file_path and records the returned file_id under `key`.
+    media_kwarg is the media parameter name: 'document', 'audio' or 'video'.
+    `remember` names send arguments (e.g. 'caption', 'title') stored with the
+    file_id on upload and passed again when the cached file_id is reused.
+    Returns the sent Message, or None if nothing is cached and no file_path was given.
+    """
+    cache = get_telegram_file_cache()
+    file_id, stored = cache.get_entry(key)
+    if file_id:
+        try:
+            return await send(**{media_kwarg: file_id}, **{**kwargs, **stored})
+        except BadRequest:
+            # file_id no longer valid for this bot; fall back to uploading
+            cache.discard(key)
+    if file_path is None:
+        return None
+    with open(file_path, 'rb') as media_file:
+        message = await send(**{media_kwarg: media_file}, **kwargs)
+    media = getattr(message, media_kwarg, None)
+    if key and media is not None:
+        cache.set(key, media.file_id, {name: kwargs[name] for name in remember if name in kwargs})
+    return message
 
 def send_long_message(update, message_parts, parse_mode="Markdown", max_length=3500):
     """
@@ -0,0 +1,84 @@
+# tests/test_udb.py
+# Regression tests for loading the user database from the sheet
+
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from googleapiclient.errors import HttpError
+
+import data.udb as udb
+from data.local_store import LocalStore
+
+
+class UserDatabaseTest(unittest.TestCase):
+    """Loads and saves the user database against a temporary local store."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.local = LocalStore(os.path.join(self.tmp.name, "local.db"))
+        self.config = types.SimpleNamespace(U_DATABASE="sheet-id", AUTHORIZED_USERS=[], ADMIN_ID=None)
+        patches = [
+            mock.patch.object(udb, "get_local_store", return_value=self.local),
+            mock.patch.object(udb, "get_config", return_value=self.config),
+            mock.patch.object(udb, "user_store", None),
+            mock.patch.object(udb, "_sheet_unread", False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+        # Seed the local store as a successful sheet load would
+        sheet = udb.ensure_user_database_structure(udb.create_empty_user_database())
+        for user_id in (1, 2, 3):
+            sheet.loc[len(sheet), "user_id"] = user_id
+        with mock.patch.object(udb, "fetch_drive_file", return_value=(sheet, ("v", 1))):
+            udb.load_user_database(from_sheet=True)
+        self.assertEqual(len(self.local.load_users()[1]), 3)
+
+    def assert_users_kept(self):
+        self.assertEqual(len(self.local.load_users()[1]), 3)
+        self.assertEqual(len(udb.user_store), 3)
+        self.assertEqual(udb._synced_columns, udb.user_store.columns)
+
+    # A /refresh whose sheet read fails must keep the local users
+
+    def test_unreadable_sheet(self):
+        with mock.patch.object(udb, "fetch_drive_file", return_value=(None, ("v", 2))):
+            udb.load_user_database(from_sheet=True)
+        self.assert_users_kept()
+
+    def test_drive_error(self):
+        error = HttpError(types.SimpleNamespace(status=500, reason="error"), b"")
+        with mock.patch.object(udb, "fetch_drive_file", side_effect=error):
+            udb.load_user_database(from_sheet=True)
+        self.assert_users_kept()
+
+    def test_no_sheet_read_yet_blocks_rewrite(self):
+        self.local.replace_users(udb.USER_COLUMNS, [])
+        self.local.set_meta('user_sheet_sync', None)
+        with mock.patch.object(udb, "fetch_drive_file", side_effect=RuntimeError("offline")), \
+                mock.patch.object(udb, "_rewrite_user_sheet") as rewrite:
+            udb.load_user_database(from_sheet=True)
+            udb.add_or_update_user({"user_id": 4, "username": "new"})
+            self.assertFalse(udb.save_user_database())
+        rewrite.assert_not_called()
+
+    def test_edit_during_save_stays_dirty(self):
+        udb.update_user_preference(1, "notes", "first")
+
+        def write_cells(dirty):
+            udb.update_user_preference(1, "notes", "second")  # edited while the save is in flight
+            return True
+
+        with mock.patch.object(udb, "_write_dirty_cells", side_effect=write_cells):
+            self.assertTrue(udb.save_user_database())
+        self.assertEqual(self.local.load_users()[2], {1: {"notes"}})
+        self.assertEqual(udb._dirty_cells, {1: {"notes"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -41,6 +41,168 @@ def parse_page_list(page_str):
             pages.append(int(p))
     return pages
 
+def normalize_tune(tune):
+    return re.sub(r'[^a-z0-9]', '', tune.lower())
+
+def _first_page(raw):
+    return str(raw).split(',')[0].strip()
+
+class TunePageIndex:
+    """
+    (hymn, tune) -> page resolution table, built once per dfH/dfTH version.
+    dfTH rows are bucketed by hymn number and by individual tune name so that
+    notation lookups are dictionary lookups instead of DataFrame scans.
+    """
+
+    NEIGHBOR_OFFSETS = [1, -1, 2, -2, 3, -3, 4, -4, 5, -5]
+
+    def __init__(self, dfH, dfTH):
+        self.dfH = dfH
+        self.dfTH = dfTH
+        self.has_probable_result = dfTH is not None and 'Propabible_Pages_Result' in dfTH.columns
+        self.has_propabible_pages = dfH is not None and 'Propabible_Pages' in dfH.columns
+        self._rows_by_hymn = {}      # hymn no -> [(tune index, page no, probable result)]
+        self._pages_by_tune = {}     # tune name -> [page no, ...] in dfTH order
+        self._rows_by_normalized = {}  # normalized tune name -> [(hymn no, page no)]
+        self._propabible_pages = {}  # hymn no -> [pages] from dfH
+        self._resolved = {}
+
+        if dfTH is not None and not dfTH.empty and 'Hymn no' in dfTH.columns and 'Tune Index' in dfTH.columns:
+            count = len(dfTH)
+            pages = dfTH['Page no'].tolist() if 'Page no' in dfTH.columns else [None] * count
+            results = dfTH['Propabible_Pages_Result'].tolist() if self.has_probable_result else [None] * count
+            for hymn_no, tune, page, result in zip(dfTH['Hymn no'].tolist(), dfTH['Tune Index'].tolist(), pages, results):
+                hymn_no = self._hymn_key(hymn_no)
+                if pd.isna(tune):
+                    continue
+                tune = str(tune)
+                if hymn_no is not None:
+                    self._rows_by_hymn.setdefault(hymn_no, []).append((tune, page, result))
+                for name in tune.split(','):
+                    name = name.strip()
+                    self._pages_by_tune.setdefault(name, []).append(page)
+                    self._rows_by_normalized.setdefault(normalize_tune(name), []).append((hymn_no, page))
+
+        if self.has_propabible_pages:
+            for i, page_str in enumerate(dfH['Propabible_Pages'].tolist()):
+                pages = parse_page_list(page_str)
+                if pages:
+                    self._propabible_pages[i + 1] = pages
+
+    @staticmethod
+    def _hymn_key(hymn_no):
+        try:
+            return int(hymn_no) if not pd.isna(hymn_no) else None
+        except (TypeError, ValueError):
+            return None
+
+    def hymn_tunes(self, hymn_no):
+        """Returns the Tune Index values listed in dfTH for a hymn."""
+        return [tune for tune, _, _ in self._rows_by_hymn.get(hymn_no, [])]
+
+    def hymn_tune_row(self, hymn_no, tune_name, exact=False, case=True):
+        """
+        Returns the first (tune index, page no, probable result) row of a hymn whose
+        Tune Index equals (exact) or contains tune_name, or None.
+        """
+        needle = tune_name if case else tune_name.lower()
+        for row in self._rows_by_hymn.get(hymn_no, []):
+            tune = row[0] if case else row[0].lower()
+            if (tune == needle) if exact else (needle in tune):
+                return row
+        return None
+
+    def tune_pages(self, tune_name):
+        """Returns the raw Page no values of every dfTH row listing tune_name, in dfTH order."""
+        return self._pages_by_tune.get(tune_name, [])
+
+    def normalized_tune_page(self, hymn_no, tune_name):
+        """
+        Returns the raw Page no of the row listing tune_name (punctuation/case-insensitive),
+        preferring rows of the same hymn, or None if the tune is not in dfTH.
+        """
+        rows = self._rows_by_normalized.get(normalize_tune(tune_name), [])
+        for row_hymn, page in rows:
+            if row_hymn == hymn_no:
+                return page
+        return rows[0][1] if rows else None
+
+    def propabible_pages(self, hymn_no):
+        return self._propabible_pages.get(hymn_no, [])
+
+    def _valid_row_page(self, tune_name, hymn_no, field):
+        row = self.hymn_tune_row(hymn_no, tune_name, case=False)
+        if row is None:
+            return None
+        page_no = _first_page(row[field])
+        if page_no.lower() not in ['nan', 'none', ''] and page_no.isdigit():
+            return int(page_no)
+        return None
+
+    def resolve(self, tune_name, hymn_no):
+        """
+        Resolves a tune of a hymn to (page_number, source), or (None, None).
+        Same priority order as find_tune_page_number; results are memoized.
+        """
+        key = (tune_name.strip(), int(hymn_no))
+        if key not in self._resolved:
+            self._resolved[key] = self._resolve(*key)
+        return self._resolved[key]
+
+    def _resolve(self, tune_name, hymn_no):
+        # 1. Page no in dfTH
+        page_no = self._valid_row_page(tune_name, hymn_no, 1)
+        if page_no:
+            return page_no, "dfTH_page_no"
+
+        # 2. Propabible_Pages_Result in dfTH
+        if self.has_probable_result:
+            page_no = self._valid_row_page(tune_name, hymn_no, 2)
+            if page_no:
+                return page_no, "dfTH_propabible_result"
+
+        # 3. Propabible_Pages in dfH
+        pages = self.propabible_pages(hymn_no)
+        if pages:
+            return pages[0], "dfH_propabible"
+
+        # 4. Neighbouring hymns
+        for offset in self.NEIGHBOR_OFFSETS:
+            neighbor_hymn = hymn_no + offset
+            if neighbor_hymn <= 0:
+                continue
+            page_no = self._valid_row_page(tune_name, neighbor_hymn, 1)
+            if page_no:
+                return page_no, f"neighbor_H{neighbor_hymn}_dfTH"
+            if self.has_probable_result:
+                page_no = self._valid_row_page(tune_name, neighbor_hymn, 2)
+                if page_no:
+                    return page_no, f"neighbor_H{neighbor_hymn}_propabible"
+            pages = self.propabible_pages(neighbor_hymn)
+            if pages:
+                return pages[0], f"neighbor_H{neighbor_hymn}_propabible"
+
+        return None, None
+
+_tune_page_index = None
+
+def get_tune_page_index(dfH, dfTH):
+    """
+    Returns the shared TunePageIndex, rebuilding it only when dfH or dfTH has been
+    reloaded or invalidated.
+    """
+    global _tune_page_index
+    if (_tune_page_index is None
+            or _tune_page_index.dfH is not dfH
+            or _tune_page_index.dfTH is not dfTH):
+        _tune_page_index = TunePageIndex(dfH, dfTH)
+    return _tune_page_index
+
+def invalidate_tune_page_index():
+    """Drops the cached TunePageIndex after dfTH has been edited in place."""
+    global _tune_page_index
+    _tune_page_index = None
+
 def Music_notation_link(hymnno, dfH, dfTH, Tune_finder_of_known_songs):
     hymnno = str(hymnno).upper().replace('H-', '').replace('H', '').strip()
     results = []
@@ -50,34 +212,27 @@ def Music_notation_link(hymnno, dfH, dfTH, Tune_finder_of_known_songs):
         return "Invalid Number"
     t = dfH["Tunes"][hymnno - 1]
     t = t.split(',')
+    index = get_tune_page_index(dfH, dfTH)
     for hymn_name in t:
         hymn_name = hymn_name.strip()
-        tune = dfTH[dfTH["Hymn no"] == hymnno]["Tune Index"]
-        tune = tune.tolist()
-        if hymn_name in tune:
-            mask = (dfTH["Hymn no"] == hymnno) & (dfTH["Tune Index"] == hymn_name)
-            page_no = dfTH[mask]['Page no']
-            if not page_no.empty:
-                page = str(page_no.values[0]).split(',')[0]
+        row = index.hymn_tune_row(hymnno, hymn_name, exact=True)
+        if row is not None:
+            page = _first_page(row[1])
+            # Check for NaN or invalid page numbers
+            if page.lower() not in ['nan', 'none', ''] and page.replace('.', '').replace(',', '').replace(' ', '').isdigit():
+                link = getNotation(page)
+                results.append(f'<a href="{link}">{hymn_name}</a>')
+            else:
+                results.append(f'{hymn_name}: Page number not available')
+        else:
+            for page_no in index.tune_pages(hymn_name):
+                page_number = _first_page(page_no)
                 # Check for NaN or invalid page numbers
-                if page.lower() not in ['nan', 'none', ''] and page.strip().replace('.', '').replace(',', '').replace(' ', '').isdigit():
-                    link = getNotation(page)
+                if page_number.lower() not in ['nan', 'none', ''] and page_number.replace('.', '').replace(',', '').replace(' ', '').isdigit():
+                    link = getNotation(page_number)
                     results.append(f'<a href="{link}">{hymn_name}</a>')
                 else:
                     results.append(f'{hymn_name}: Page number not available')
-            else:
-                results.append(f'{hymn_name}: Page not found')
-        else:
-            for idx, i in enumerate(dfTH['Tune Index']):
-                i_list = str(i).split(',')
-                if hymn_name in i_list:
-                    page_number = str(dfTH['Page no'].iloc[idx]).split(',')[0]
-                    # Check for NaN or invalid page numbers
-                    if page_number.lower() not in ['nan', 'none', ''] and page_number.strip().replace('.', '').replace(',', '').replace(' ', '').isdigit():
-                        link = getNotation(page_number)
-                        results.append(f'<a href="{link}">{hymn_name}</a>')
-                    else:
-                        results.append(f'{hymn_name}: Page number not available')
     if not results:
         return f"{Tune_finder_of_known_songs(f'H-{hymnno}')}: Notation not found"
     return "\n".join(results)
@@ -101,93 +256,11 @@ def find_tune_page_number(tune_name, hymn_no, dfH, dfTH):
     Returns: (page_number, source) or (None, None) if not found
     """
     try:
-        hymn_no = int(hymn_no)
-        tune_name = tune_name.strip()
-
-        # 1. Check Page no in dfTH first
-        page_no = check_tune_in_dfth_page_no(tune_name, hymn_no, dfTH)
-        if page_no:
-            return page_no, "dfTH_page_no"
-
-        # 2. Check Propabible_Pages_Result in dfTH
-        if 'Propabible_Pages_Result' in dfTH.columns:
-            page_no = check_tune_in_dfth_propabible_result(tune_name, hymn_no, dfTH)
-            if page_no:
-                return page_no, "dfTH_propabible_result"
-
-        # 3. Check Propabible_Pages in dfH
-        if 'Propabible_Pages' in dfH.columns:
-            pages = get_propabible_pages(hymn_no, dfH)
-            if pages:
-                return pages[0], "dfH_propabible"  # Return first page for now
-
-        # 4. Check neighboring hymns
-        for offset in [1, -1, 2, -2, 3, -3, 4, -4, 5, -5]:
-            neighbor_hymn = hymn_no + offset
-            if neighbor_hymn > 0:  # Ensure positive hymn number
-                # Check dfTH Page no for neighbor
-                page_no = check_tune_in_dfth_page_no(tune_name, neighbor_hymn, dfTH)
-                if page_no:
-                    return page_no, f"neighbor_H{neighbor_hymn}_dfTH"
-
-                # Check dfTH Propabible_Pages_Result for neighbor
-                if 'Propabible_Pages_Result' in dfTH.columns:
-                    page_no = check_tune_in_dfth_propabible_result(tune_name, neighbor_hymn, dfTH)
-                    if page_no:
-                        return page_no, f"neighbor_H{neighbor_hymn}_propabible"
-
-                # Check dfH Propabible_Pages for neighbor
-                if 'Propabible_Pages' in dfH.columns:
-                    pages = get_propabible_pages(neighbor_hymn, dfH)
-                    if pages:
-                        return pages[0], f"neighbor_H{neighbor_hymn}_propabible"
-
-        return None, None
-
+        return get_tune_page_index(dfH, dfTH).resolve(tune_name, hymn_no)
     except Exception as e:
         print(f"Error in find_tune_page_number: {e}")
         return None, None
 
-def check_tune_in_dfth_page_no(tune_name, hymn_no, dfTH):
-    """Check if tune exists in dfTH with a valid Page no"""
-    if dfTH is None or dfTH.empty:
-        return None
-
-    try:
-        # Find rows matching hymn number and tune
-        import re
-        escaped_tune_name = re.escape(tune_name)
-        mask = (dfTH["Hymn no"] == hymn_no) & (dfTH["Tune Index"].str.contains(escaped_tune_name, case=False, na=False, regex=True))
-        matching_rows = dfTH[mask]
-
-        if not matching_rows.empty:
-            page_no = str(matching_rows.iloc[0]["Page no"]).split(',')[0].strip()
-            if page_no.lower() not in ['nan', 'none', ''] and page_no.isdigit():
-                return int(page_no)
-    except Exception:
-        pass
-    return None
-
-def check_tune_in_dfth_propabible_result(tune_name, hymn_no, dfTH):
-    """Check if tune exists in dfTH Propabible_Pages_Result column"""
-    if dfTH is None or dfTH.empty or 'Propabible_Pages_Result' not in dfTH.columns:
-        return None
-
-    try:
-        # Find rows matching hymn number and tune
-        import re
-        escaped_tune_name = re.escape(tune_name)
-        mask = (dfTH["Hymn no"] == hymn_no) & (dfTH["Tune Index"].str.contains(escaped_tune_name, case=False, na=False, regex=True))
-        matching_rows = dfTH[mask]
-
-        if not matching_rows.empty:
-            page_no = str(matching_rows.iloc[0]["Propabible_Pages_Result"]).split(',')[0].strip()
-            if page_no.lower() not in ['nan', 'none', ''] and page_no.isdigit():
-                return int(page_no)
-    except Exception:
-        pass
-    return None
-
 def get_propabible_pages(hymn_no, dfH):
     """Get Propabible_Pages for a hymn from dfH"""
     if dfH is None or dfH.empty or 'Propabible_Pages' not in dfH.columns:
@@ -236,6 +309,7 @@ def save_confirmed_page_result(tune_name, hymn_no, page_no, source):
                 # Otherwise update the Page no column
                 dfTH.loc[matching_indices[0], 'Page no'] = str(page_no)
                 print(f"Saved page {page_no} for tune '{tune_name}' in H-{hymn_no} to Page no")
+            invalidate_tune_page_index()
             return True
     except Exception as e:
         print(f"Error saving confirmed page result: {e}")
@@ -267,6 +341,7 @@ def save_corrected_page_to_dfth(tune_name, hymn_no, page_no):
             # Update the first matching row with the corrected page number in Propabible_Pages_Result
             dfTH.loc[matching_indices[0], 'Propabible_Pages_Result'] = str(page_no)
             print(f"Corrected page number for '{tune_name}' in H-{hymn_no} to page {page_no} in Propabible_Pages_Result")
+            invalidate_tune_page_index()
 
             # TODO: Save to Google Drive to persist the change
             # This would require updating the Google Sheets file